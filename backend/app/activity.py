@@ -0,0 +1,137 @@
+"""
+Madza AI Healthcare Platform - Activity Rollups
+Copyright (c) 2025 Madza AI Healthcare Platform. All rights reserved.
+
+PROPRIETARY SOFTWARE - UNAUTHORIZED USE PROHIBITED
+This file contains the time-bucketed activity counts behind the agent status
+and system alerts. Each flush adds its registrations, claim submissions, claim
+AI failures and approve/deny decisions to the current per-minute bucket in the
+same transaction, so "last hour" figures sum at most ~60 rows per metric
+instead of scanning patients and claims. compact() downsamples old minute
+buckets into hourly ones and drops hourly buckets past retention
+(`flask activity compact`).
+
+For licensing information, contact: arpanchowdhury2025@gmail.com
+"""
+
+import os
+from collections import Counter
+from datetime import datetime, timedelta
+from typing import Dict, Optional
+
+from sqlalchemy import event, func, select
+
+from .database import db
+from .models import Patient, Claim, ActivityRollup
+from .statistics import committed_value, upsert_increment
+
+MINUTE = 60
+HOUR = 3600
+
+PATIENTS_REGISTERED = 'patients_registered'
+CLAIMS_SUBMITTED = 'claims_submitted'
+CLAIM_AI_FAILURES = 'claim_ai_failures'
+CLAIMS_APPROVED = 'claims_approved'
+CLAIMS_DENIED = 'claims_denied'
+
+# Claim statuses counted as decisions when a claim enters them
+DECISIONS = {'approved': CLAIMS_APPROVED, 'denied': CLAIMS_DENIED}
+
+# Minute buckets are kept this long before being summed into hourly buckets
+MINUTE_RETENTION = timedelta(hours=float(os.getenv('ACTIVITY_MINUTE_RETENTION_HOURS', '48')))
+# Hourly buckets older than this are deleted
+HOUR_RETENTION = timedelta(days=float(os.getenv('ACTIVITY_HOUR_RETENTION_DAYS', '90')))
+
+_EPOCH = datetime(1970, 1, 1)
+_KEYS = ('resolution', 'bucket_start', 'metric')
+
+
+def bucket_start(moment: datetime, resolution: int) -> datetime:
+    """Start of the bucket of the given width (seconds) containing moment"""
+    seconds = int((moment - _EPOCH).total_seconds())
+    return _EPOCH + timedelta(seconds=seconds - seconds % resolution)
+
+
+def flush_events(session) -> Counter:
+    """Activity counts for the new and changed objects in a flush (call from after_flush)"""
+    events = Counter()
+    for instance in session.new:
+        if isinstance(instance, Patient):
+            events[PATIENTS_REGISTERED] += 1
+        elif isinstance(instance, Claim):
+            events[CLAIMS_SUBMITTED] += 1
+            # Claims are analysed before they are stored, so a missing or failed parse is an AI failure
+            if instance.ai_parse_success is not True:
+                events[CLAIM_AI_FAILURES] += 1
+            if instance.status in DECISIONS:
+                events[DECISIONS[instance.status]] += 1
+    for instance in session.dirty:
+        if not isinstance(instance, Claim) or instance in session.deleted:
+            continue
+        status = instance.status
+        if status in DECISIONS and committed_value(instance, 'status') != status:
+            events[DECISIONS[status]] += 1
+        # A re-analysis (e.g. on refile) that fails to parse
+        if instance.ai_parse_success is False and committed_value(instance, 'ai_parse_success') is not False:
+            events[CLAIM_AI_FAILURES] += 1
+    return events
+
+
+def record(connection, events: Dict[str, float], now: Optional[datetime] = None):
+    """Add events to the current minute bucket"""
+    if not events:
+        return
+    start = bucket_start(now or datetime.utcnow(), MINUTE)
+    rows = [{'resolution': MINUTE, 'bucket_start': start, 'metric': metric, 'value': events[metric]}
+            for metric in sorted(events)]
+    upsert_increment(connection, ActivityRollup.__table__, _KEYS, rows)
+
+
+@event.listens_for(db.session, 'after_flush')
+def _record_flush(session, flush_context):
+    # Written on the flush's own connection, so the counts commit or roll back with the rows
+    record(session.connection(), flush_events(session))
+
+
+def window_totals(window: timedelta, now: Optional[datetime] = None, session=None) -> Dict[str, float]:
+    """Event counts per metric over the trailing window, in one query
+
+    Resolution is one minute for recent windows; once buckets have been
+    downsampled, an hourly bucket only counts if it starts inside the window.
+    """
+    session = session or db.session
+    now = now or datetime.utcnow()
+    since = bucket_start(now - window, MINUTE)
+    rows = session.query(ActivityRollup.metric, func.sum(ActivityRollup.value)).filter(
+        ActivityRollup.resolution.in_((MINUTE, HOUR)),
+        ActivityRollup.bucket_start >= since,
+        ActivityRollup.bucket_start <= now
+    ).group_by(ActivityRollup.metric).all()
+    return {metric: value or 0 for metric, value in rows}
+
+
+def compact(connection, now: Optional[datetime] = None) -> Dict[str, int]:
+    """Sum minute buckets older than MINUTE_RETENTION into hourly buckets and expire old hourly buckets
+
+    Writers only touch the current minute, so this can run alongside them.
+    """
+    table = ActivityRollup.__table__
+    now = now or datetime.utcnow()
+    # Whole hours only, so an hourly bucket is never split between the two resolutions
+    minute_cutoff = bucket_start(now - MINUTE_RETENTION, HOUR)
+    old = connection.execute(
+        select(table.c.bucket_start, table.c.metric, table.c.value)
+        .where(table.c.resolution == MINUTE, table.c.bucket_start < minute_cutoff)
+    ).all()
+    hourly = Counter()
+    for start, metric, value in old:
+        hourly[(bucket_start(start, HOUR), metric)] += value
+    if hourly:
+        rows = [{'resolution': HOUR, 'bucket_start': start, 'metric': metric, 'value': value}
+                for (start, metric), value in sorted(hourly.items())]
+        upsert_increment(connection, table, _KEYS, rows)
+    connection.execute(table.delete().where(table.c.resolution == MINUTE, table.c.bucket_start < minute_cutoff))
+    expired = connection.execute(
+        table.delete().where(table.c.resolution == HOUR, table.c.bucket_start < now - HOUR_RETENTION)
+    ).rowcount
+    return {'downsampled_minutes': len(old), 'hourly_buckets': len(hourly), 'expired_hours': expired}
@@ -0,0 +1,200 @@
+"""
+Madza AI Healthcare Platform - AI Response Cache
+Copyright (c) 2025 Madza AI Healthcare Platform. All rights reserved.
+
+PROPRIETARY SOFTWARE - UNAUTHORIZED USE PROHIBITED
+This file contains the content-addressed response cache used in front of Bedrock
+model invocations. Entries live in an in-process LRU tier with TTL and size
+eviction, and optionally in a persistent SQLite tier that survives restarts.
+
+For licensing information, contact: arpanchowdhury2025@gmail.com
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Any, Optional
+
+
+def normalize_prompt(prompt: str) -> str:
+    """Collapse whitespace so indentation-only differences share a cache entry"""
+    return ' '.join(prompt.split())
+
+
+def make_cache_key(model_id: str, prompt: str, params: Optional[Dict[str, Any]] = None) -> str:
+    """Build a content-addressed key from model, normalized prompt and generation params"""
+    material = json.dumps({
+        'model_id': model_id,
+        'prompt': normalize_prompt(prompt),
+        'params': params or {}
+    }, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(material.encode('utf-8')).hexdigest()
+
+
+class ResponseCache:
+    """Two-tier (memory LRU + optional SQLite) cache for AI model responses"""
+
+    def __init__(self, max_entries: int = 1024, ttl_seconds: float = 3600,
+                 sqlite_path: Optional[str] = None, enabled: bool = True):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.sqlite_path = sqlite_path
+        self.enabled = enabled
+        self._entries = OrderedDict()  # key -> (expires_at, value)
+        self._lock = threading.Lock()
+        self._sqlite_lock = threading.Lock()
+        self._sqlite_conn = None
+        self._stats = {
+            'hits': 0,
+            'memory_hits': 0,
+            'persistent_hits': 0,
+            'misses': 0,
+            'stores': 0,
+            'evictions': 0,
+            'expirations': 0
+        }
+
+    @classmethod
+    def from_env(cls) -> 'ResponseCache':
+        """Create a cache configured from AI_CACHE_* environment variables"""
+        return cls(
+            max_entries=int(os.getenv('AI_CACHE_MAX_ENTRIES', '1024')),
+            ttl_seconds=float(os.getenv('AI_CACHE_TTL_SECONDS', '3600')),
+            sqlite_path=os.getenv('AI_CACHE_SQLITE_PATH') or None,
+            enabled=os.getenv('AI_CACHE_ENABLED', 'true').lower() in ('1', 'true', 'yes')
+        )
+
+    def get(self, key: str) -> Optional[Any]:
+        """Return the cached value for key, or None on a miss"""
+        if not self.enabled:
+            return None
+
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires_at, value = entry
+                if expires_at > now:
+                    self._entries.move_to_end(key)
+                    self._stats['hits'] += 1
+                    self._stats['memory_hits'] += 1
+                    return value
+                del self._entries[key]
+                self._stats['expirations'] += 1
+
+        persisted = self._sqlite_get(key, now)
+        if persisted is not None:
+            expires_at, value = persisted
+            with self._lock:
+                self._store_memory(key, value, expires_at)
+                self._stats['hits'] += 1
+                self._stats['persistent_hits'] += 1
+            return value
+
+        with self._lock:
+            self._stats['misses'] += 1
+        return None
+
+    def set(self, key: str, value: Any, ttl_seconds: Optional[float] = None):
+        """Store value under key in every enabled tier"""
+        if not self.enabled:
+            return
+
+        expires_at = time.time() + (ttl_seconds if ttl_seconds is not None else self.ttl_seconds)
+        with self._lock:
+            self._store_memory(key, value, expires_at)
+            self._stats['stores'] += 1
+        self._sqlite_set(key, value, expires_at)
+
+    def clear(self):
+        """Drop every entry from both tiers"""
+        with self._lock:
+            self._entries.clear()
+        conn = self._get_sqlite_conn()
+        if conn is not None:
+            with self._sqlite_lock:
+                conn.execute('DELETE FROM ai_response_cache')
+                conn.commit()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get hit/miss counters and tier sizes"""
+        with self._lock:
+            stats = dict(self._stats)
+            stats['memory_entries'] = len(self._entries)
+        lookups = stats['hits'] + stats['misses']
+        stats['hit_rate'] = round((stats['hits'] / lookups) * 100, 1) if lookups else 0
+        stats['enabled'] = self.enabled
+        stats['persistent'] = bool(self.sqlite_path)
+        return stats
+
+    def _store_memory(self, key: str, value: Any, expires_at: float):
+        """Insert into the LRU tier, evicting the oldest entries over capacity (lock held)"""
+        self._entries[key] = (expires_at, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self._stats['evictions'] += 1
+
+    def _get_sqlite_conn(self) -> Optional[sqlite3.Connection]:
+        """Lazily open the persistent tier"""
+        if not self.sqlite_path:
+            return None
+        if self._sqlite_conn is None:
+            with self._sqlite_lock:
+                if self._sqlite_conn is None:
+                    conn = sqlite3.connect(self.sqlite_path, check_same_thread=False)
+                    conn.execute(
+                        'CREATE TABLE IF NOT EXISTS ai_response_cache ('
+                        'key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL)'
+                    )
+                    conn.commit()
+                    self._sqlite_conn = conn
+        return self._sqlite_conn
+
+    def _sqlite_get(self, key: str, now: float):
+        conn = self._get_sqlite_conn()
+        if conn is None:
+            return None
+        try:
+            with self._sqlite_lock:
+                row = conn.execute(
+                    'SELECT value, expires_at FROM ai_response_cache WHERE key = ?', (key,)
+                ).fetchone()
+                if row is None:
+                    return None
+                expired = row[1] <= now
+                if expired:
+                    conn.execute('DELETE FROM ai_response_cache WHERE key = ?', (key,))
+                    conn.commit()
+            if expired:
+                # Counters are guarded by _lock; take it after releasing _sqlite_lock so the two never nest
+                with self._lock:
+                    self._stats['expirations'] += 1
+                return None
+            return row[1], json.loads(row[0])
+        except (sqlite3.Error, ValueError) as e:
+            print(f"AI cache persistent read failed: {e}")
+            return None
+
+    def _sqlite_set(self, key: str, value: Any, expires_at: float):
+        conn = self._get_sqlite_conn()
+        if conn is None:
+            return
+        try:
+            encoded = json.dumps(value)
+            with self._sqlite_lock:
+                conn.execute(
+                    'INSERT OR REPLACE INTO ai_response_cache (key, value, expires_at) VALUES (?, ?, ?)',
+                    (key, encoded, expires_at)
+                )
+                conn.commit()
+        except (sqlite3.Error, TypeError, ValueError) as e:
+            print(f"AI cache persistent write failed: {e}")
+
+
+# Shared process-wide cache so every BedrockService instance benefits from it
+response_cache = ResponseCache.from_env()
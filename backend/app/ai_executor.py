@@ -0,0 +1,129 @@
+"""
+Madza AI Healthcare Platform - AI Execution Engine
+Copyright (c) 2025 Madza AI Healthcare Platform. All rights reserved.
+
+PROPRIETARY SOFTWARE - UNAUTHORIZED USE PROHIBITED
+This file contains the bounded-concurrency execution engine used to run Bedrock
+and Lambda AI calls off the request thread. A global limit caps total in-flight
+calls and a per-model limit keeps one model from starving the others.
+
+For licensing information, contact: arpanchowdhury2025@gmail.com
+"""
+
+import os
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, Future
+from typing import Dict, Any, Callable
+
+
+class AIExecutor:
+    """Thread-pool-backed executor with global and per-model concurrency limits
+
+    Calls for a model that already has per_model_concurrency calls in the pool
+    wait in that model's queue rather than in the pool, so they never hold a
+    worker another model could use. A finishing call hands its slot to the
+    next queued call for the same model.
+    """
+
+    def __init__(self, max_concurrency: int = 16, per_model_concurrency: int = 8):
+        self.max_concurrency = max_concurrency
+        self.per_model_concurrency = per_model_concurrency
+        self._pool = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix='ai-exec')
+        self._lock = threading.Lock()
+        self._pending = {}
+        self._scheduled_by_model = {}
+        self._stats = {
+            'submitted': 0,
+            'completed': 0,
+            'failed': 0,
+            'queued': 0,
+            'in_flight': 0,
+            'peak_in_flight': 0
+        }
+        self._in_flight_by_model = {}
+
+    @classmethod
+    def from_env(cls) -> 'AIExecutor':
+        """Create an executor configured from AI_MAX_CONCURRENCY* environment variables"""
+        return cls(
+            max_concurrency=int(os.getenv('AI_MAX_CONCURRENCY', '16')),
+            per_model_concurrency=int(os.getenv('AI_MAX_CONCURRENCY_PER_MODEL', '8'))
+        )
+
+    def submit(self, model_key: str, fn: Callable, *args, **kwargs) -> Future:
+        """Schedule fn(*args, **kwargs) under the limits for model_key and return its future"""
+        future = Future()
+        task = (model_key, future, fn, args, kwargs)
+        with self._lock:
+            self._stats['submitted'] += 1
+            if self._scheduled_by_model.get(model_key, 0) >= self.per_model_concurrency:
+                self._pending.setdefault(model_key, deque()).append(task)
+                self._stats['queued'] += 1
+                return future
+            self._scheduled_by_model[model_key] = self._scheduled_by_model.get(model_key, 0) + 1
+        self._dispatch(task)
+        return future
+
+    def _dispatch(self, task):
+        """Hand a task that holds one of its model's slots to the pool"""
+        try:
+            self._pool.submit(self._run, task)
+        except RuntimeError as e:
+            # Pool shut down; release the slot so queued calls for the model fail the same way
+            task[1].set_exception(e)
+            self._release(task[0])
+
+    def _run(self, task):
+        model_key, future, fn, args, kwargs = task
+        try:
+            if not future.set_running_or_notify_cancel():
+                return
+            with self._lock:
+                self._stats['in_flight'] += 1
+                self._stats['peak_in_flight'] = max(self._stats['peak_in_flight'], self._stats['in_flight'])
+                self._in_flight_by_model[model_key] = self._in_flight_by_model.get(model_key, 0) + 1
+            try:
+                result = fn(*args, **kwargs)
+            except BaseException as e:
+                with self._lock:
+                    self._stats['failed'] += 1
+                future.set_exception(e)
+            else:
+                with self._lock:
+                    self._stats['completed'] += 1
+                future.set_result(result)
+            finally:
+                with self._lock:
+                    self._stats['in_flight'] -= 1
+                    self._in_flight_by_model[model_key] -= 1
+        finally:
+            self._release(model_key)
+
+    def _release(self, model_key: str):
+        """Pass a finished call's model slot to the model's next queued call, if any"""
+        with self._lock:
+            pending = self._pending.get(model_key)
+            if not pending:
+                self._scheduled_by_model[model_key] -= 1
+                return
+            task = pending.popleft()
+            self._stats['queued'] -= 1
+        self._dispatch(task)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get submission counters, queued calls and current in-flight calls per model"""
+        with self._lock:
+            stats = dict(self._stats)
+            stats['in_flight_by_model'] = {k: v for k, v in self._in_flight_by_model.items() if v}
+        stats['max_concurrency'] = self.max_concurrency
+        stats['per_model_concurrency'] = self.per_model_concurrency
+        return stats
+
+    def shutdown(self, wait: bool = True):
+        """Stop accepting work and optionally wait for in-flight calls"""
+        self._pool.shutdown(wait=wait)
+
+
+# Shared process-wide executor so the concurrency limits apply across all callers
+ai_executor = AIExecutor.from_env()
@@ -0,0 +1,135 @@
+"""
+Madza AI Healthcare Platform - AI Output Extractor
+Copyright (c) 2025 Madza AI Healthcare Platform. All rights reserved.
+
+PROPRIETARY SOFTWARE - UNAUTHORIZED USE PROHIBITED
+This file contains the shared extractor for model output. It accepts every
+response shape the Bedrock and Lambda paths return, skips any <reasoning>
+preamble, decodes the JSON document in a single pass and checks it against the
+schema of the AI task that produced it.
+
+For licensing information, contact: arpanchowdhury2025@gmail.com
+"""
+
+import json
+import threading
+from typing import Dict, Any, List, Optional, Tuple
+
+REASONING_END = '</reasoning>'
+
+# Top-level fields each task's JSON must carry, with their expected types
+TASK_SCHEMAS = {
+    'claim_processing': {
+        'validation': dict,
+        'coverageCheck': dict,
+        'fraudRiskAssessment': dict
+    },
+    'claim_batch': {
+        'results': list
+    },
+    'denial_analysis': {
+        'rootCauseAnalysis': str,
+        'resolutionSteps': list
+    },
+    'suggestions': {
+        'root_cause': str,
+        'suggestions': list,
+        'priority': str,
+        'estimated_impact': str
+    },
+    'chatbot': {
+        'response': str,
+        'suggestions': list,
+        'actionData': dict
+    }
+}
+
+_decoder = json.JSONDecoder()
+
+
+def parse_model_text(text: str) -> Any:
+    """Decode the JSON document in model text; raises json.JSONDecodeError if there is none
+
+    The document is decoded in place from the first brace after the reasoning
+    block, without slicing copies of the text. Text that has stray braces in
+    front of the document falls back to the outermost-brace span.
+    """
+    start = 0
+    reasoning_end = text.find(REASONING_END)
+    if reasoning_end != -1:
+        start = reasoning_end + len(REASONING_END)
+
+    first_brace = text.find('{', start)
+    if first_brace == -1:
+        return json.loads(text[start:])
+    try:
+        document, _ = _decoder.raw_decode(text, first_brace)
+        return document
+    except json.JSONDecodeError:
+        last_brace = text.rfind('}')
+        if last_brace <= first_brace:
+            raise
+        return json.loads(text[first_brace:last_brace + 1])
+
+
+def parse_response(response: Any) -> Any:
+    """Decode any _invoke_bedrock / _call_lambda_ai response shape into its JSON document"""
+    if isinstance(response, dict) and 'analysis' in response:
+        analysis = response['analysis']
+        if not isinstance(analysis, str):
+            return analysis
+        return parse_model_text(analysis)
+    if isinstance(response, dict):
+        return response
+    if isinstance(response, str):
+        return parse_model_text(response)
+    return parse_model_text(str(response))
+
+
+class AIExtractor:
+    """Parses model responses once and validates them against per-task schemas"""
+
+    def __init__(self, schemas: Optional[Dict[str, Dict[str, type]]] = None):
+        self.schemas = dict(TASK_SCHEMAS if schemas is None else schemas)
+        self._lock = threading.Lock()
+        self._stats = {}
+
+    def extract(self, response: Any, task: Optional[str] = None) -> Tuple[Optional[Dict[str, Any]], List[str]]:
+        """Return (document, errors) for a model response
+
+        document is None when no JSON object can be decoded. Fields present with
+        the wrong type are dropped from document so callers fall back to their
+        defaults; both missing and mistyped fields are reported in errors.
+        """
+        try:
+            document = parse_response(response)
+        except (json.JSONDecodeError, TypeError) as e:
+            self._count(task, 'parse_failures')
+            return None, [f'No JSON document in response: {e}']
+        if not isinstance(document, dict):
+            self._count(task, 'parse_failures')
+            return None, ['Response JSON is not an object']
+
+        errors = []
+        for field, expected_type in self.schemas.get(task, {}).items():
+            if field not in document:
+                errors.append(f'Missing field: {field}')
+            elif not isinstance(document[field], expected_type):
+                errors.append(f'Field {field} should be {expected_type.__name__}')
+                document = {key: value for key, value in document.items() if key != field}
+        self._count(task, 'schema_errors' if errors else 'parsed')
+        return document, errors
+
+    def _count(self, task: Optional[str], outcome: str):
+        with self._lock:
+            counters = self._stats.setdefault(task or 'untyped', {'parsed': 0, 'schema_errors': 0, 'parse_failures': 0})
+            counters[outcome] += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Per-task counts of clean parses, schema violations and parse failures"""
+        with self._lock:
+            return {task: dict(counters) for task, counters in self._stats.items()}
+
+
+# Shared process-wide extractor so parse-failure counters cover every caller
+ai_extractor = AIExtractor()
@@ -0,0 +1,193 @@
+"""
+Madza AI Healthcare Platform - Claim Archive
+Copyright (c) 2025 Madza AI Healthcare Platform. All rights reserved.
+
+PROPRIETARY SOFTWARE - UNAUTHORIZED USE PROHIBITED
+This file contains the archival job that moves closed claims (approved or
+denied, unchanged for ARCHIVE_AFTER_DAYS) and their EOBs out of the hot tables
+into one SQLite file per month under ARCHIVE_DIR, each row stored as
+zlib-compressed JSON. The archived_claims/archived_eobs index tables record
+which file holds each record, so lookups by id can read archived records back
+(`flask archive claims`).
+
+For licensing information, contact: arpanchowdhury2025@gmail.com
+"""
+
+import json
+import os
+import sqlite3
+import zlib
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import Date, DateTime, select
+from sqlalchemy.orm import attributes, class_mapper
+
+from .database import db
+from .models import Patient, Claim, EOB, ArchivedClaim, ArchivedEOB
+
+CLOSED_STATUSES = ('approved', 'denied')
+
+ARCHIVE_SCHEMA = (
+    'CREATE TABLE IF NOT EXISTS claims (id TEXT PRIMARY KEY, patient_id TEXT NOT NULL, data BLOB NOT NULL)',
+    'CREATE TABLE IF NOT EXISTS eobs (id TEXT PRIMARY KEY, claim_id TEXT NOT NULL, data BLOB NOT NULL)'
+)
+
+
+def _decode(model, data: bytes):
+    """Detached model instance from an archived row, read-only like a loaded object"""
+    row = json.loads(zlib.decompress(data))
+    instance = class_mapper(model).class_manager.new_instance()
+    for column in model.__table__.columns:
+        value = row.get(column.name)
+        if value is not None and isinstance(column.type, DateTime):
+            value = datetime.fromisoformat(value)
+        elif value is not None and isinstance(column.type, Date):
+            value = date.fromisoformat(value)
+        attributes.set_committed_value(instance, column.key, value)
+    return instance
+
+
+class ClaimArchive:
+    """Monthly archive files for closed claims and their EOBs"""
+
+    def __init__(self, directory: str, after_days: float = 365, batch_size: int = 500, compression_level: int = 6):
+        self.directory = directory
+        self.after_days = after_days
+        self.batch_size = batch_size
+        self.compression_level = compression_level
+
+    @classmethod
+    def from_env(cls) -> 'ClaimArchive':
+        default_dir = os.path.join(os.path.abspath(os.path.dirname(__file__)), '..', 'archive')
+        return cls(
+            directory=os.getenv('ARCHIVE_DIR', default_dir),
+            after_days=float(os.getenv('ARCHIVE_AFTER_DAYS', '365')),
+            batch_size=int(os.getenv('ARCHIVE_BATCH_SIZE', '500'))
+        )
+
+    def path(self, partition: str) -> str:
+        return os.path.join(self.directory, f'claims-{partition}.sqlite')
+
+    def archive_closed_claims(self, after_days: Optional[float] = None, dry_run: bool = False,
+                              now: Optional[datetime] = None) -> Dict[str, Any]:
+        """Move closed claims unchanged for after_days, with their EOBs, into the archive files
+
+        Each batch is written to its archive files before it is deleted from the
+        hot tables, so an interrupted run leaves the rows in place and the next
+        run rewrites them. Writes are keyed on id, so archiving a claim again
+        replaces its archived copy and index entry rather than duplicating them.
+        Platform statistics keep counting archived claims.
+        """
+        cutoff = (now or datetime.utcnow()) - timedelta(days=self.after_days if after_days is None else after_days)
+        closed = (Claim.status.in_(CLOSED_STATUSES), Claim.updated_at < cutoff)
+        if dry_run:
+            return {'cutoff': cutoff.isoformat(), 'claims': Claim.query.filter(*closed).count(), 'dry_run': True}
+
+        claims = Claim.__table__
+        eobs = EOB.__table__
+        result = {'cutoff': cutoff.isoformat(), 'claims': 0, 'eobs': 0, 'partitions': set(), 'retried': 0}
+        while True:
+            ids = [claim_id for (claim_id,) in db.session.execute(
+                select(claims.c.id).where(*closed).order_by(claims.c.id).limit(self.batch_size).with_for_update()
+            )]
+            if not ids:
+                break
+            claim_rows = [dict(row) for row in db.session.execute(select(claims).where(claims.c.id.in_(ids))).mappings()]
+            eob_rows = [dict(row) for row in db.session.execute(select(eobs).where(eobs.c.claim_id.in_(ids))).mappings()]
+            partition_of = self._write(claim_rows, eob_rows)
+
+            # By id, so an EOB added after the select stays in the hot table
+            db.session.execute(eobs.delete().where(eobs.c.id.in_([row['id'] for row in eob_rows])))
+            deleted = db.session.execute(claims.delete().where(claims.c.id.in_(ids), *closed)).rowcount
+            if deleted != len(ids):
+                # A claim changed since it was selected; its archived copy is never indexed, so retry the batch
+                db.session.rollback()
+                result['retried'] += 1
+                continue
+            # Upsert on id: a retried batch may already be indexed, and the archive files replace rows by id too
+            db.session.execute(ArchivedClaim.__table__.delete().where(ArchivedClaim.id.in_(ids)))
+            db.session.execute(ArchivedEOB.__table__.delete().where(
+                ArchivedEOB.id.in_([row['id'] for row in eob_rows])))
+            db.session.execute(ArchivedClaim.__table__.insert(), [
+                {'id': row['id'], 'partition': partition_of[row['id']], 'patient_id': row['patient_id'],
+                 'status': row['status'], 'created_at': row['created_at'], 'approved_at': row['approved_at'],
+                 'ai_parse_success': row['ai_parse_success'], 'archived_at': datetime.utcnow()}
+                for row in claim_rows
+            ])
+            if eob_rows:
+                db.session.execute(ArchivedEOB.__table__.insert(), [
+                    {'id': row['id'], 'claim_id': row['claim_id'], 'partition': partition_of[row['claim_id']]}
+                    for row in eob_rows
+                ])
+            db.session.commit()
+            result['claims'] += len(claim_rows)
+            result['eobs'] += len(eob_rows)
+            result['partitions'].update(partition_of.values())
+        result['partitions'] = sorted(result['partitions'])
+        print(f"Archived {result['claims']} claims and {result['eobs']} EOBs into {len(result['partitions'])} partitions")
+        return result
+
+    def _write(self, claim_rows: List[Dict[str, Any]], eob_rows: List[Dict[str, Any]]) -> Dict[str, str]:
+        """Write rows to their monthly files, committed before the hot rows are deleted; returns claim id -> partition"""
+        partitions = defaultdict(lambda: ([], []))
+        claim_partition = {}
+        for row in claim_rows:
+            partition = (row['created_at'] or datetime.utcnow()).strftime('%Y-%m')
+            claim_partition[row['id']] = partition
+            partitions[partition][0].append(row)
+        for row in eob_rows:
+            partitions[claim_partition[row['claim_id']]][1].append(row)
+
+        os.makedirs(self.directory, exist_ok=True)
+        for partition, (claims, eobs) in partitions.items():
+            conn = sqlite3.connect(self.path(partition))
+            try:
+                for statement in ARCHIVE_SCHEMA:
+                    conn.execute(statement)
+                conn.executemany('INSERT OR REPLACE INTO claims (id, patient_id, data) VALUES (?, ?, ?)',
+                                 [(row['id'], row['patient_id'], self._compress(row)) for row in claims])
+                conn.executemany('INSERT OR REPLACE INTO eobs (id, claim_id, data) VALUES (?, ?, ?)',
+                                 [(row['id'], row['claim_id'], self._compress(row)) for row in eobs])
+                conn.commit()
+            finally:
+                conn.close()
+        return claim_partition
+
+    def _compress(self, row: Dict[str, Any]) -> bytes:
+        encoded = json.dumps(row, default=lambda value: value.isoformat()).encode('utf-8')
+        return zlib.compress(encoded, self.compression_level)
+
+    def _read(self, partition: str, table: str, record_id: str) -> Optional[bytes]:
+        path = self.path(partition)
+        if not os.path.exists(path):
+            print(f"Archive file missing for partition {partition}: {path}")
+            return None
+        conn = sqlite3.connect(f'file:{path}?mode=ro', uri=True)
+        try:
+            row = conn.execute(f'SELECT data FROM {table} WHERE id = ?', (record_id,)).fetchone()
+        finally:
+            conn.close()
+        return row[0] if row else None
+
+    def get_claim(self, claim_id: str) -> Optional[Claim]:
+        """Archived claim by id, as a detached Claim (None if it was never archived)"""
+        entry = db.session.get(ArchivedClaim, claim_id)
+        data = entry and self._read(entry.partition, 'claims', claim_id)
+        return _decode(Claim, data) if data else None
+
+    def get_eob(self, eob_id: str) -> Optional[EOB]:
+        """Archived EOB by id, as a detached EOB with its (archived) claim and patient attached"""
+        entry = db.session.get(ArchivedEOB, eob_id)
+        data = entry and self._read(entry.partition, 'eobs', eob_id)
+        if not data:
+            return None
+        eob = _decode(EOB, data)
+        attributes.set_committed_value(eob, 'claim', self.get_claim(eob.claim_id))
+        attributes.set_committed_value(eob, 'patient', db.session.get(Patient, eob.patient_id))
+        return eob
+
+
+# Shared archive used by the services and the `flask archive` command
+claim_archive = ClaimArchive.from_env()
@@ -0,0 +1,187 @@
+"""
+Madza AI Healthcare Platform - Claim Rules Engine
+Copyright (c) 2025 Madza AI Healthcare Platform. All rights reserved.
+
+PROPRIETARY SOFTWARE - UNAUTHORIZED USE PROHIBITED
+This file contains the deterministic rules engine that runs before LLM claim
+adjudication. Trivially decidable claims are approved, denied or sent to review
+without a model call, and the decision is written in the same shape as the
+model's claim analysis so storage and metrics treat both paths alike. The
+engine is opt-in, and the default rules only deny unless auto-approval is
+configured explicitly.
+
+For licensing information, contact: arpanchowdhury2025@gmail.com
+"""
+
+import json
+import os
+import threading
+from typing import Dict, Any, Callable, List, Optional
+
+DECISIONS = ('approve', 'deny', 'review')
+
+DEFAULT_RULES = [
+    {
+        'name': 'non_positive_amount',
+        'decision': 'deny',
+        'reason': 'Claim amount must be greater than zero',
+        'max_amount': 0
+    },
+    {
+        'name': 'unknown_patient',
+        'decision': 'deny',
+        'reason': 'Patient is not registered',
+        'unknown_patient': True
+    }
+]
+
+# Approves without a model call, so it only joins the defaults when CLAIM_RULES_AUTO_APPROVE is set
+AUTO_APPROVE_RULES = [
+    {
+        'name': 'small_routine_claim',
+        'decision': 'approve',
+        'reason': 'Routine claim under the auto-approval threshold',
+        'claim_types': ['routine', 'prescription', 'vision'],
+        'min_amount': 0.01,
+        'max_amount': float(os.getenv('CLAIM_RULES_ROUTINE_MAX_AMOUNT', '250'))
+    }
+]
+
+
+def _env_flag(name: str) -> bool:
+    return os.getenv(name, 'false').lower() in ('1', 'true', 'yes')
+
+
+class ClaimRule:
+    """One rule: every configured condition must hold for the rule to match"""
+
+    def __init__(self, name: str, decision: str, reason: str = '', claim_types: Optional[List[str]] = None,
+                 min_amount: Optional[float] = None, max_amount: Optional[float] = None,
+                 unknown_patient: Optional[bool] = None):
+        if decision not in DECISIONS:
+            raise ValueError(f"Rule {name}: decision must be one of {', '.join(DECISIONS)}")
+        self.name = name
+        self.decision = decision
+        self.reason = reason or name
+        self.claim_types = {t.lower() for t in claim_types} if claim_types else None
+        self.min_amount = min_amount
+        self.max_amount = max_amount
+        self.unknown_patient = unknown_patient
+
+    @classmethod
+    def from_dict(cls, config: Dict[str, Any]) -> 'ClaimRule':
+        return cls(**config)
+
+    def matches(self, claim_data: Dict[str, Any], patient_exists: Callable[[str], bool]) -> bool:
+        if self.claim_types is not None and str(claim_data.get('claim_type', '')).lower() not in self.claim_types:
+            return False
+        if self.min_amount is not None or self.max_amount is not None:
+            try:
+                amount = float(claim_data.get('claim_amount'))
+            except (TypeError, ValueError):
+                return False
+            if self.min_amount is not None and amount < self.min_amount:
+                return False
+            if self.max_amount is not None and amount > self.max_amount:
+                return False
+        if self.unknown_patient is not None:
+            if self.unknown_patient == patient_exists(claim_data.get('patient_id')):
+                return False
+        return True
+
+
+class ClaimRulesEngine:
+    """Ordered rule list evaluated before the model; the first matching rule decides"""
+
+    def __init__(self, rules: List[ClaimRule], enabled: bool = True):
+        self.rules = rules
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._stats = {'evaluated': 0, 'skipped_model': 0, 'approve': 0, 'deny': 0, 'review': 0}
+        self._rule_hits = {}
+
+    @classmethod
+    def from_env(cls) -> 'ClaimRulesEngine':
+        """Load rules from the JSON list at CLAIM_RULES_PATH, or use the defaults
+
+        The engine changes adjudication outcomes, so it is off unless
+        CLAIM_RULES_ENABLED is set. The default rules only deny;
+        CLAIM_RULES_AUTO_APPROVE adds the small routine claim approval.
+        """
+        rules_path = os.getenv('CLAIM_RULES_PATH')
+        if rules_path:
+            with open(rules_path) as rules_file:
+                configs = json.load(rules_file)
+        else:
+            configs = DEFAULT_RULES + (AUTO_APPROVE_RULES if _env_flag('CLAIM_RULES_AUTO_APPROVE') else [])
+        return cls(
+            [ClaimRule.from_dict(config) for config in configs],
+            enabled=_env_flag('CLAIM_RULES_ENABLED')
+        )
+
+    def evaluate(self, claim_data: Dict[str, Any],
+                 patient_exists: Callable[[str], bool]) -> Optional[Dict[str, Any]]:
+        """Return the rule-based claim analysis, or None when the model must decide"""
+        if not self.enabled:
+            return None
+
+        matched = None
+        for rule in self.rules:
+            if rule.matches(claim_data, patient_exists):
+                matched = rule
+                break
+
+        with self._lock:
+            self._stats['evaluated'] += 1
+            if matched:
+                self._stats['skipped_model'] += 1
+                self._stats[matched.decision] += 1
+                self._rule_hits[matched.name] = self._rule_hits.get(matched.name, 0) + 1
+
+        return build_rule_analysis(matched, claim_data) if matched else None
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get decision counters and the fraction of claims that skipped the model"""
+        with self._lock:
+            stats = dict(self._stats)
+            stats['rule_hits'] = dict(self._rule_hits)
+        stats['skip_rate'] = round((stats['skipped_model'] / stats['evaluated']) * 100, 1) if stats['evaluated'] else 0
+        stats['enabled'] = self.enabled
+        return stats
+
+
+def build_rule_analysis(rule: ClaimRule, claim_data: Dict[str, Any]) -> Dict[str, Any]:
+    """Express a rule decision in the same JSON shape as the model's claim analysis"""
+    validation_status, coverage_decision, recommendation, risk_level = {
+        'approve': ('Valid', 'Approved', 'Approve', 'Low'),
+        'deny': ('Invalid', 'Denied', 'Deny', 'Low'),
+        'review': ('Pending', 'Pending Review', 'Manual Review Required', 'Medium')
+    }[rule.decision]
+    return {
+        'claimId': f"CLM-{str(claim_data.get('patient_id', 'UNKNOWN'))[:8]}",
+        'validation': {
+            'status': validation_status,
+            'completeness': 'Complete',
+            'issues': [rule.reason] if rule.decision != 'approve' else []
+        },
+        'coverageCheck': {
+            'policyCoverage': 'Covered' if rule.decision == 'approve' else 'Not Covered',
+            'medicalNecessity': 'Under Review',
+            'coverageDecision': coverage_decision
+        },
+        'fraudRiskAssessment': {
+            'riskLevel': risk_level,
+            'riskFactors': [],
+            'recommendation': recommendation
+        },
+        'nextSteps': [rule.reason],
+        'ruleEngine': {
+            'rule': rule.name,
+            'decision': rule.decision,
+            'reason': rule.reason
+        }
+    }
+
+
+# Shared process-wide engine so skip-rate counters cover every caller
+claim_rules = ClaimRulesEngine.from_env()
@@ -0,0 +1,117 @@
+"""
+Madza AI Healthcare Platform - AWS Client Registry
+Copyright (c) 2025 Madza AI Healthcare Platform. All rights reserved.
+
+PROPRIETARY SOFTWARE - UNAUTHORIZED USE PROHIBITED
+This file contains the process-wide registry of boto3 clients and the pooled HTTP
+session. Clients are built once per (service, region) with a tuned connection
+pool, TCP keep-alive and explicit timeouts, and are shared by every service
+instance and worker thread.
+
+For licensing information, contact: arpanchowdhury2025@gmail.com
+"""
+
+import os
+import threading
+from typing import Dict, Any, Optional
+
+import boto3
+import requests
+from botocore.config import Config
+from requests.adapters import HTTPAdapter
+
+
+class ClientRegistry:
+    """Thread-safe cache of boto3 clients sharing one connection-pool configuration"""
+
+    def __init__(self, max_pool_connections: int = 50, connect_timeout: float = 5.0,
+                 read_timeout: float = 60.0, tcp_keepalive: bool = True, max_attempts: int = 2):
+        self.max_pool_connections = max_pool_connections
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.tcp_keepalive = tcp_keepalive
+        # botocore's own retries stay low; the resilience layer owns backoff
+        self.max_attempts = max_attempts
+        self._clients = {}
+        self._lock = threading.Lock()
+        self._stats = {'created': 0, 'reused': 0}
+
+    @classmethod
+    def from_env(cls) -> 'ClientRegistry':
+        """Create a registry configured from AWS_CLIENT_* environment variables"""
+        return cls(
+            max_pool_connections=int(os.getenv('AWS_CLIENT_MAX_POOL_CONNECTIONS', '50')),
+            connect_timeout=float(os.getenv('AWS_CLIENT_CONNECT_TIMEOUT', '5')),
+            read_timeout=float(os.getenv('AWS_CLIENT_READ_TIMEOUT', '60')),
+            tcp_keepalive=os.getenv('AWS_CLIENT_TCP_KEEPALIVE', 'true').lower() in ('1', 'true', 'yes'),
+            max_attempts=int(os.getenv('AWS_CLIENT_MAX_ATTEMPTS', '2'))
+        )
+
+    def config(self) -> Config:
+        return Config(
+            max_pool_connections=self.max_pool_connections,
+            connect_timeout=self.connect_timeout,
+            read_timeout=self.read_timeout,
+            tcp_keepalive=self.tcp_keepalive,
+            retries={'max_attempts': self.max_attempts, 'mode': 'standard'}
+        )
+
+    def get(self, service_name: str, region_name: Optional[str] = None):
+        """Get the shared client for a service, building it on first use"""
+        region = region_name or os.getenv('AWS_REGION', 'us-east-1')
+        key = (service_name, region)
+        with self._lock:
+            client = self._clients.get(key)
+            if client is not None:
+                self._stats['reused'] += 1
+                return client
+            # Built under the lock so concurrent first calls share one client
+            client = boto3.client(service_name, region_name=region, config=self.config())
+            self._clients[key] = client
+            self._stats['created'] += 1
+            return client
+
+    def clear(self):
+        with self._lock:
+            self._clients.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self._stats)
+            stats['clients'] = sorted(f'{service}@{region}' for service, region in self._clients)
+        stats['max_pool_connections'] = self.max_pool_connections
+        stats['connect_timeout'] = self.connect_timeout
+        stats['read_timeout'] = self.read_timeout
+        stats['tcp_keepalive'] = self.tcp_keepalive
+        return stats
+
+
+# Shared process-wide registry so TLS connections survive across requests
+aws_clients = ClientRegistry.from_env()
+
+
+def get_aws_client(service_name: str, region_name: Optional[str] = None):
+    """Get the shared boto3 client for an AWS service"""
+    return aws_clients.get(service_name, region_name)
+
+
+_http_session = None
+_http_session_lock = threading.Lock()
+
+
+def build_http_session(pool_size: int = 20) -> requests.Session:
+    """Create a keep-alive session whose pool holds pool_size connections per host"""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=0)
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
+
+
+def get_http_session() -> requests.Session:
+    """Get the shared HTTP session, sized by AI_HTTP_POOL_SIZE"""
+    global _http_session
+    with _http_session_lock:
+        if _http_session is None:
+            _http_session = build_http_session(int(os.getenv('AI_HTTP_POOL_SIZE', '20')))
+        return _http_session
@@ -1,9 +1,13 @@
 from flask_sqlalchemy import SQLAlchemy
-from flask_migrate import Migrate
+from flask_migrate import Migrate, upgrade
+from .db_profiles import select_profile
+from .replicas import REPLICA_BIND, RoutingSession, replica_router
 import os
 
-db = SQLAlchemy()
-migrate = Migrate()
+MIGRATIONS_DIR = os.path.join(os.path.abspath(os.path.dirname(__file__)), '..', 'migrations')
+
+db = SQLAlchemy(session_options={'class_': RoutingSession})
+migrate = Migrate(directory=MIGRATIONS_DIR)
 
 def init_db(app):
     """Initialize database with the Flask app"""
@@ -12,8 +16,49 @@ def init_db(app):
     app.config['SQLALCHEMY_DATABASE_URI'] = database_url
     app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
     
+    # Engine tuning for the database in use (DB_ENGINE_PROFILE); explicit engine options win
+    profile = select_profile(database_url)
+    if profile:
+        app.config['SQLALCHEMY_ENGINE_OPTIONS'] = {**profile.engine_options(),
+                                                   **app.config.get('SQLALCHEMY_ENGINE_OPTIONS', {})}
+    
+    # Optional read replica for the views that opt in to replica reads
+    replica_url = os.getenv('DATABASE_REPLICA_URL')
+    replica_profile = None
+    if replica_url:
+        # The replica may run on a different database than the primary, so its profile follows its own URL
+        replica_profile = select_profile(replica_url, 'none' if os.getenv('DB_ENGINE_PROFILE', 'auto').lower() == 'none' else 'auto')
+        replica_options = replica_profile.engine_options() if replica_profile else {}
+        app.config.setdefault('SQLALCHEMY_BINDS', {})[REPLICA_BIND] = {'url': replica_url, **replica_options}
+    
     # Initialize extensions
     db.init_app(app)
     migrate.init_app(app, db)
     
+    if profile:
+        with app.app_context():
+            profile.attach(db.engine)
+            with db.engine.connect() as connection:
+                print(f"Database engine profile '{profile.name}': {profile.effective_settings(connection)}")
+    
+    if replica_url:
+        with app.app_context():
+            replica_engine = db.engines[REPLICA_BIND]
+            if replica_profile:
+                replica_profile.attach(replica_engine)
+            replica_router.init_app(app, replica_engine, db.session)
+        print(f"Read replica configured: {replica_engine.url.render_as_string(hide_password=True)}")
+    
     return db
+
+def apply_migrations():
+    """Upgrade the schema to the latest revision (call inside an app context)
+
+    Off unless DB_AUTO_MIGRATE is set: every import of app.main (each worker,
+    the tests, every flask command) would otherwise race on the same DDL.
+    Deploys run `flask db upgrade` once instead. Revisions are idempotent, so
+    this is safe on databases created by db.create_all() as well as on older
+    databases missing newer columns.
+    """
+    if os.getenv('DB_AUTO_MIGRATE', 'false').lower() in ('1', 'true', 'yes'):
+        upgrade(directory=MIGRATIONS_DIR)
@@ -0,0 +1,157 @@
+"""
+Madza AI Healthcare Platform - Database Engine Profiles
+Copyright (c) 2025 Madza AI Healthcare Platform. All rights reserved.
+
+PROPRIETARY SOFTWARE - UNAUTHORIZED USE PROHIBITED
+This file contains the engine tuning applied by init_db. The SQLite profile
+switches to WAL with a busy timeout so concurrent writers queue instead of
+failing with "database is locked"; the Postgres profile sizes the connection
+pool and sets server-side statement and lock timeouts.
+
+For licensing information, contact: arpanchowdhury2025@gmail.com
+"""
+
+import os
+from typing import Any, Dict, Optional
+
+from sqlalchemy import event, text
+from sqlalchemy.engine import make_url
+
+
+class SQLiteProfile:
+    """PRAGMAs applied to every new SQLite connection"""
+
+    name = 'sqlite'
+
+    def __init__(self, journal_mode: str = 'WAL', synchronous: str = 'NORMAL', mmap_size: int = 256 * 1024 * 1024,
+                 cache_size: int = -64000, busy_timeout: int = 5000):
+        self.journal_mode = journal_mode
+        self.synchronous = synchronous
+        self.mmap_size = mmap_size
+        # Negative values are KiB, so -64000 is a ~64MB page cache per connection
+        self.cache_size = cache_size
+        self.busy_timeout = busy_timeout
+
+    @classmethod
+    def from_env(cls) -> 'SQLiteProfile':
+        return cls(
+            journal_mode=os.getenv('SQLITE_JOURNAL_MODE', 'WAL'),
+            synchronous=os.getenv('SQLITE_SYNCHRONOUS', 'NORMAL'),
+            mmap_size=int(os.getenv('SQLITE_MMAP_SIZE', str(256 * 1024 * 1024))),
+            cache_size=int(os.getenv('SQLITE_CACHE_SIZE', '-64000')),
+            busy_timeout=int(os.getenv('SQLITE_BUSY_TIMEOUT_MS', '5000'))
+        )
+
+    def pragmas(self) -> Dict[str, Any]:
+        # busy_timeout first so the journal_mode switch itself waits for other writers
+        return {
+            'busy_timeout': self.busy_timeout,
+            'journal_mode': self.journal_mode,
+            'synchronous': self.synchronous,
+            'mmap_size': self.mmap_size,
+            'cache_size': self.cache_size
+        }
+
+    def engine_options(self) -> Dict[str, Any]:
+        # The driver's own lock wait, kept in step with busy_timeout
+        return {'connect_args': {'timeout': self.busy_timeout / 1000}}
+
+    def attach(self, engine):
+        event.listen(engine, 'connect', self._on_connect)
+
+    def _on_connect(self, dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for pragma, value in self.pragmas().items():
+                cursor.execute(f'PRAGMA {pragma}={value}')
+        finally:
+            cursor.close()
+
+    def effective_settings(self, connection) -> Dict[str, Any]:
+        """Settings as reported by the database, which may differ from those requested"""
+        return {pragma: connection.execute(text(f'PRAGMA {pragma}')).scalar() for pragma in self.pragmas()}
+
+
+class PostgresProfile:
+    """Pool sizing and server-side timeouts for Postgres"""
+
+    name = 'postgresql'
+
+    def __init__(self, pool_size: int = 10, max_overflow: int = 20, pool_timeout: int = 30,
+                 pool_recycle: int = 1800, pool_pre_ping: bool = True, statement_timeout_ms: int = 30000,
+                 lock_timeout_ms: int = 5000, idle_in_transaction_timeout_ms: int = 60000):
+        self.pool_size = pool_size
+        self.max_overflow = max_overflow
+        self.pool_timeout = pool_timeout
+        self.pool_recycle = pool_recycle
+        self.pool_pre_ping = pool_pre_ping
+        self.statement_timeout_ms = statement_timeout_ms
+        self.lock_timeout_ms = lock_timeout_ms
+        self.idle_in_transaction_timeout_ms = idle_in_transaction_timeout_ms
+
+    @classmethod
+    def from_env(cls) -> 'PostgresProfile':
+        return cls(
+            pool_size=int(os.getenv('DB_POOL_SIZE', '10')),
+            max_overflow=int(os.getenv('DB_MAX_OVERFLOW', '20')),
+            pool_timeout=int(os.getenv('DB_POOL_TIMEOUT', '30')),
+            pool_recycle=int(os.getenv('DB_POOL_RECYCLE', '1800')),
+            pool_pre_ping=os.getenv('DB_POOL_PRE_PING', 'true').lower() in ('1', 'true', 'yes'),
+            statement_timeout_ms=int(os.getenv('DB_STATEMENT_TIMEOUT_MS', '30000')),
+            lock_timeout_ms=int(os.getenv('DB_LOCK_TIMEOUT_MS', '5000')),
+            idle_in_transaction_timeout_ms=int(os.getenv('DB_IDLE_IN_TRANSACTION_TIMEOUT_MS', '60000'))
+        )
+
+    def server_settings(self) -> Dict[str, int]:
+        return {
+            'statement_timeout': self.statement_timeout_ms,
+            'lock_timeout': self.lock_timeout_ms,
+            'idle_in_transaction_session_timeout': self.idle_in_transaction_timeout_ms
+        }
+
+    def engine_options(self) -> Dict[str, Any]:
+        options = ' '.join(f'-c {name}={value}' for name, value in self.server_settings().items())
+        return {
+            'pool_size': self.pool_size,
+            'max_overflow': self.max_overflow,
+            'pool_timeout': self.pool_timeout,
+            'pool_recycle': self.pool_recycle,
+            'pool_pre_ping': self.pool_pre_ping,
+            'connect_args': {'options': options}
+        }
+
+    def attach(self, engine):
+        pass  # Everything is set through engine options and the connection startup packet
+
+    def effective_settings(self, connection) -> Dict[str, Any]:
+        """Settings as reported by the server, plus the pool configuration"""
+        settings = {name: connection.execute(text(f'SHOW {name}')).scalar() for name in self.server_settings()}
+        pool = connection.engine.pool
+        settings.update({
+            'pool_size': pool.size(),
+            'max_overflow': self.max_overflow,
+            'pool_timeout': self.pool_timeout,
+            'pool_recycle': self.pool_recycle,
+            'pool_pre_ping': self.pool_pre_ping
+        })
+        return settings
+
+
+PROFILES = {'sqlite': SQLiteProfile, 'postgresql': PostgresProfile}
+
+
+def select_profile(database_url: str, name: Optional[str] = None):
+    """Profile for database_url; name is DB_ENGINE_PROFILE: auto (default), none, sqlite or postgresql"""
+    name = (name or os.getenv('DB_ENGINE_PROFILE', 'auto')).lower()
+    if name == 'none':
+        return None
+    backend = make_url(database_url).get_backend_name()
+    if name == 'auto':
+        # Other databases keep SQLAlchemy's defaults
+        profile = PROFILES.get(backend)
+        return profile.from_env() if profile else None
+    if name not in PROFILES:
+        raise ValueError(f'Unknown DB_ENGINE_PROFILE: {name}')
+    if name != backend:
+        raise ValueError(f'DB_ENGINE_PROFILE={name} does not match the {backend} database URL')
+    return PROFILES[name].from_env()
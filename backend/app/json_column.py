@@ -0,0 +1,127 @@
+"""
+Madza AI Healthcare Platform - JSON Column Type
+Copyright (c) 2025 Madza AI Healthcare Platform. All rights reserved.
+
+PROPRIETARY SOFTWARE - UNAUTHORIZED USE PROHIBITED
+This file contains the column type used for the AI analysis, suggestion and
+denial-reason documents. It is JSONB on Postgres and JSON text on SQLite (read
+with the JSON1 functions), while model attributes always hold the JSON text so
+list responses can splice it unchanged. Decoded documents are cached per
+instance and invalidated when the stored text changes.
+
+For licensing information, contact: arpanchowdhury2025@gmail.com
+"""
+
+import json
+from typing import Any, Callable
+
+from sqlalchemy import Text, literal
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.functions import FunctionElement
+from sqlalchemy.types import TypeDecorator
+
+
+class JSONText(TypeDecorator):
+    """JSON document stored natively where the database supports it, exposed as JSON text"""
+
+    impl = Text
+    cache_ok = True
+
+    def load_dialect_impl(self, dialect):
+        if dialect.name == 'postgresql':
+            return dialect.type_descriptor(JSONB(none_as_null=True))
+        return dialect.type_descriptor(Text())
+
+    def process_bind_param(self, value, dialect):
+        # JSONB encodes Python values itself, so hand it the document rather than the text
+        if dialect.name == 'postgresql' and isinstance(value, str):
+            return json.loads(value)
+        return value
+
+    def column_expression(self, colexpr):
+        # Selected as text on Postgres, so the driver never decodes JSONB only for us to re-encode it
+        return json_as_text(colexpr, type_=self)
+
+    def process_result_value(self, value, dialect):
+        # Only documents read without column_expression (e.g. raw textual SQL) arrive decoded
+        if value is not None and not isinstance(value, str):
+            return json.dumps(value)
+        return value
+
+
+class json_as_text(FunctionElement):
+    """A JSONText column as selected: cast to text on Postgres, unchanged elsewhere"""
+
+    name = 'json_as_text'
+    inherit_cache = True
+
+    def __init__(self, column, type_):
+        self.type = type_
+        super().__init__(column)
+
+
+@compiles(json_as_text)
+def _compile_json_as_text(element, compiler, **kw):
+    return compiler.process(list(element.clauses)[0], **kw)
+
+
+@compiles(json_as_text, 'postgresql')
+def _compile_json_as_text_postgresql(element, compiler, **kw):
+    return f'CAST({compiler.process(list(element.clauses)[0], **kw)} AS TEXT)'
+
+
+class json_field(FunctionElement):
+    """Value at a key path inside a JSONText column, for filters and aggregates
+
+    json_field(Claim.ai_analysis, 'validation', 'status') compiles to
+    json_extract(...) on SQLite and jsonb_extract_path_text(...) on Postgres.
+    """
+
+    type = Text()
+    name = 'json_field'
+    inherit_cache = True
+
+    def __init__(self, column, *path: str):
+        if not path or any('"' in key for key in path):
+            raise ValueError('json_field needs one or more keys without double quotes')
+        sqlite_path = '$' + ''.join(f'."{key}"' for key in path)
+        super().__init__(column, literal(sqlite_path), *[literal(key) for key in path])
+
+
+@compiles(json_field)
+def _compile_json_field(element, compiler, **kw):
+    column, sqlite_path = list(element.clauses)[:2]
+    return f'json_extract({compiler.process(column, **kw)}, {compiler.process(sqlite_path, **kw)})'
+
+
+@compiles(json_field, 'postgresql')
+def _compile_json_field_postgresql(element, compiler, **kw):
+    column, _, *path = list(element.clauses)
+    keys = ', '.join(compiler.process(key, **kw) for key in path)
+    return f'jsonb_extract_path_text({compiler.process(column, **kw)}, {keys})'
+
+
+def cached_json(instance, name: str, default: Callable[[], Any]) -> Any:
+    """Decode instance.<name> once per stored text and cache it on the instance
+
+    The cache entry is keyed on the text object itself, so set_*(), direct
+    assignment and reloads from the database all invalidate it. The returned
+    document is shared between calls and must be treated as read-only.
+    """
+    raw = getattr(instance, name)
+    if not raw:
+        return default()
+    cache = instance.__dict__.setdefault('_json_cache', {})
+    hit = cache.get(name)
+    if hit is not None and hit[0] is raw:
+        return hit[1]
+    value = json.loads(raw)
+    cache[name] = (raw, value)
+    return value
+
+
+def store_json(instance, name: str, value: Any):
+    """Set instance.<name> to the JSON text of value (None when empty) and drop its cached decode"""
+    setattr(instance, name, json.dumps(value) if value else None)
+    instance.__dict__.get('_json_cache', {}).pop(name, None)
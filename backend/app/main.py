@@ -9,13 +9,26 @@ It provides RESTful APIs for patient management, claim processing, and AI integr
 For licensing information, contact: arpanchowdhury2025@gmail.com
 """
 
-from flask import Flask, request, jsonify, send_file
+from flask import Flask, Response, request, jsonify, send_file, stream_with_context
 from flask_cors import CORS
-from app.services import BedrockService, PatientService, ClaimService
+from app.services import BedrockService, PatientService, ClaimService, EOBService
 from app.models import Patient, Claim, EOB
-from app.database import init_db, db
+from app.database import init_db, db, apply_migrations
+from app.replicas import replica_router
+from app.pagination import ListQueryError, parse_datetime, parse_fields, parse_limit
 from app.pdf_generator import pdf_generator
+from app.serialization import json_serializer
+from app.statistics import rebuild as rebuild_statistics
+from app.activity import compact as compact_activity
+from app.archive import claim_archive
+import csv
+import io
+import json
+import math
 import os
+import uuid
+import click
+from datetime import datetime
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -29,16 +42,21 @@ init_db(app)
 # Initialize services
 bedrock_service = BedrockService()
 patient_service = PatientService()
-claim_service = ClaimService()
+claim_service = ClaimService(bedrock_service)
+eob_service = EOBService()
 
-# Create database tables
+# Create database tables and bring existing ones up to the latest schema
 with app.app_context():
     db.create_all()
+    apply_migrations()
 
 @app.route('/api/health', methods=['GET'])
 def health_check():
     """Health check endpoint"""
-    return jsonify({"status": "healthy", "message": "Madza AI Backend is running"})
+    health = {"status": "healthy", "message": "Madza AI Backend is running"}
+    if replica_router.engine is not None:
+        health["read_replica"] = replica_router.get_stats()
+    return jsonify(health)
 
 @app.route('/api/patient/register', methods=['POST'])
 def register_patient():
@@ -82,6 +100,105 @@ def register_patient():
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
+# Registration fields and the patient columns they fill; CSV headers may use either name
+PATIENT_FIELDS = {
+    'firstName': 'first_name',
+    'lastName': 'last_name',
+    'email': 'email',
+    'phone': 'phone',
+    'dateOfBirth': 'date_of_birth',
+    'insuranceId': 'insurance_id',
+    'insuranceProvider': 'insurance_provider'
+}
+CSV_MIMETYPES = ('text/csv', 'application/csv')
+
+def _bulk_patient_rows():
+    """Rows of a bulk registration body: a JSON array (or {"patients": [...]}) or CSV with a header line"""
+    if request.mimetype in CSV_MIMETYPES:
+        reader = csv.DictReader(io.StringIO(request.get_data(as_text=True)))
+        columns = {column: field for field, column in PATIENT_FIELDS.items()}
+        return [{columns.get(key.strip(), key.strip()): (value or '').strip()
+                 for key, value in row.items() if key is not None} for row in reader]
+    data = request.get_json()
+    return data.get('patients') if isinstance(data, dict) else data
+
+def _validate_patient_row(row):
+    """Patient column values for a registration row, or an error message"""
+    if not isinstance(row, dict):
+        return None, "Row must be an object"
+    values = {}
+    for field, column in PATIENT_FIELDS.items():
+        value = row.get(field)
+        if value is None or not str(value).strip():
+            return None, f"Missing required field: {field}"
+        value = str(value).strip()
+        max_length = Patient.__table__.c[column].type.length
+        if len(value) > max_length:
+            return None, f"{field} exceeds {max_length} characters"
+        values[column] = value
+    try:
+        datetime.strptime(values['date_of_birth'], '%Y-%m-%d')
+    except ValueError:
+        return None, "dateOfBirth must be YYYY-MM-DD"
+    return values, None
+
+@app.route('/api/patients/bulk', methods=['POST'])
+def register_patients_bulk():
+    """Register many patients: validate every row, analyse the valid ones in parallel, insert them in one transaction"""
+    try:
+        rows = _bulk_patient_rows()
+        if not isinstance(rows, list) or not rows:
+            return jsonify({"error": "Request must contain a non-empty 'patients' array or CSV rows"}), 400
+        
+        max_rows = int(os.getenv('PATIENT_BULK_MAX_ROWS', '20000'))
+        if len(rows) > max_rows:
+            return jsonify({"error": f"Bulk registration exceeds maximum of {max_rows} patients"}), 400
+        
+        # Validate every row before any AI call, including emails repeated in the upload or already registered
+        report = [None] * len(rows)
+        valid = {}
+        seen_emails = set()
+        for index, row in enumerate(rows):
+            values, error = _validate_patient_row(row)
+            if error is None and values['email'] in seen_emails:
+                error = "Duplicate email in upload"
+            if error:
+                report[index] = {"index": index, "success": False, "error": error}
+            else:
+                seen_emails.add(values['email'])
+                valid[index] = values
+        registered = patient_service.existing_emails(seen_emails)
+        for index in [index for index, values in valid.items() if values['email'] in registered]:
+            report[index] = {"index": index, "success": False, "error": "Email already registered"}
+            del valid[index]
+        
+        if not valid:
+            return jsonify({"error": "No valid patients to register", "results": report}), 400
+        
+        indexes = list(valid)
+        results = bedrock_service.process_patient_registrations([rows[index] for index in indexes])
+        to_insert = []
+        for index, result in zip(indexes, results):
+            if result['success']:
+                ai_analysis = result.get('ai_analysis') or {}
+                to_insert.append((index, {**valid[index], 'ai_analysis': json.dumps(ai_analysis) if ai_analysis else None}))
+            else:
+                report[index] = {"index": index, "success": False, "error": result.get('error', 'Registration failed')}
+        
+        patient_ids = patient_service.create_patients([values for _, values in to_insert]) if to_insert else []
+        for (index, _), patient_id in zip(to_insert, patient_ids):
+            report[index] = {"index": index, "success": True, "patient_id": patient_id}
+        
+        return jsonify({
+            "success": True,
+            "processed": len(patient_ids),
+            "failed": len(rows) - len(patient_ids),
+            "results": report
+        }), 201
+            
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
 @app.route('/api/patient/<patient_id>', methods=['GET'])
 def get_patient(patient_id):
     """Get patient information"""
@@ -94,6 +211,106 @@ def get_patient(patient_id):
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
+CLAIM_REQUIRED_FIELDS = ['patient_id', 'claim_amount', 'claim_type', 'description']
+
+def _validate_claim_row(claim_data):
+    """Claim data with claim_amount as a number, or an error message"""
+    if not isinstance(claim_data, dict):
+        return None, "Claim must be an object"
+    for field in CLAIM_REQUIRED_FIELDS:
+        if field not in claim_data:
+            return None, f"Missing required field: {field}"
+    amount = claim_data['claim_amount']
+    try:
+        if isinstance(amount, bool):
+            raise ValueError
+        amount = float(amount)
+    except (TypeError, ValueError):
+        return None, "claim_amount must be a number"
+    if not math.isfinite(amount) or amount <= 0:
+        return None, "claim_amount must be a positive number"
+    for field in ('patient_id', 'claim_type', 'description'):
+        value = claim_data[field]
+        if not isinstance(value, str) or not value.strip():
+            return None, f"{field} must be a non-empty string"
+        max_length = Claim.__table__.c[field].type.length
+        if max_length and len(value) > max_length:
+            return None, f"{field} exceeds {max_length} characters"
+    return {**claim_data, 'claim_amount': amount}, None
+
+def _build_claim(data, result):
+    """Build an unsaved Claim from request data and its AI processing result"""
+    # Store claim data
+    claim = Claim(
+        patient_id=data['patient_id'],
+        claim_amount=data['claim_amount'],
+        claim_type=data['claim_type'],
+        description=data['description'],
+        status=result.get('status', 'pending'),
+        ai_analysis=result.get('ai_analysis', {}),
+        approval_required=result.get('approval_required', False)
+    )
+    claim.set_decision_fields(result.get('parsed_analysis'))
+
+    # Set appropriate timestamps based on status
+    from datetime import datetime
+    if result.get('status') == 'approved':
+        claim.approved_at = datetime.utcnow()
+    elif result.get('status') == 'denied':
+        claim.denied_at = datetime.utcnow()
+        # The AI processing result carries the analysis already parsed
+        parsed_analysis = result.get('parsed_analysis')
+        issues = (parsed_analysis.get('validation') or {}).get('issues') if isinstance(parsed_analysis, dict) else None
+        claim.denial_reason = issues[0] if isinstance(issues, list) and issues else 'AI analysis indicates denial'
+
+    return claim
+
+def _build_eob(claim, eob_result):
+    """Build an unsaved EOB for a claim (whose id must be set) from its generate_eob result"""
+    eob = EOB(
+        claim_id=claim.id,
+        patient_id=claim.patient_id,
+        eob_amount=eob_result['eob_amount'],
+        status=eob_result['status'],
+        eob_date=eob_result['eob_date'],
+        insurance_company=eob_result['insurance_company'],
+        ai_analysis=eob_result.get('ai_analysis'),
+        denial_reasons=eob_result.get('denial_reasons'),
+        refile_required=eob_result.get('refile_required', False)
+    )
+    eob.id = str(uuid.uuid4())
+    eob.pdf_url = f"/api/eobs/{eob.id}/pdf"
+    return eob
+
+def _store_processed_claim(data, result):
+    """Persist a claim from its AI processing result and return the API response payload"""
+    claim = _build_claim(data, result)
+    claim_id = claim_service.create_claim(claim)
+
+    # If claim was automatically approved, generate EOB
+    if result.get('status') == 'approved':
+        try:
+            eob_result = bedrock_service.generate_eob(claim)
+            if eob_result['success']:
+                db.session.add(_build_eob(claim, eob_result))
+                db.session.commit()
+
+                print(f"EOB generated for automatically approved claim {claim_id}")
+        except Exception as eob_error:
+            print(f"Error generating EOB for automatically approved claim {claim_id}: {eob_error}")
+
+    return {
+        "success": True,
+        "claim_id": claim_id,
+        "status": claim.status,
+        "approval_required": claim.approval_required,
+        "ai_analysis": result.get('ai_analysis', {}),
+        "next_steps": result.get('next_steps', []),
+        "approved_at": claim.approved_at.isoformat() if claim.approved_at else None,
+        "denied_at": claim.denied_at.isoformat() if claim.denied_at else None,
+        "denial_reason": claim.denial_reason
+    }
+
 @app.route('/api/claims/process', methods=['POST'])
 def process_claim():
     """Process insurance claim using multi-step AI agent"""
@@ -110,93 +327,106 @@ def process_claim():
         result = bedrock_service.process_claim(data)
         
         if result['success']:
-            # Store claim data
-            claim = Claim(
-                patient_id=data['patient_id'],
-                claim_amount=data['claim_amount'],
-                claim_type=data['claim_type'],
-                description=data['description'],
-                status=result.get('status', 'pending'),
-                ai_analysis=result.get('ai_analysis', {}),
-                approval_required=result.get('approval_required', False)
-            )
-            
-            # Set appropriate timestamps based on status
-            from datetime import datetime
-            if result.get('status') == 'approved':
-                claim.approved_at = datetime.utcnow()
-            elif result.get('status') == 'denied':
-                claim.denied_at = datetime.utcnow()
-                # Extract denial reason from AI analysis if available
-                try:
-                    ai_analysis = result.get('ai_analysis', {})
-                    if isinstance(ai_analysis, dict) and 'analysis' in ai_analysis:
-                        analysis_text = ai_analysis['analysis']
-                        if '<reasoning>' in analysis_text:
-                            reasoning_end = analysis_text.find('</reasoning>')
-                            if reasoning_end != -1:
-                                json_string = analysis_text[reasoning_end + 11:].strip()
-                                first_brace = json_string.find('{')
-                                last_brace = json_string.rfind('}')
-                                if first_brace != -1 and last_brace != -1 and last_brace > first_brace:
-                                    json_string = json_string[first_brace:last_brace + 1]
-                                    import json
-                                    parsed_analysis = json.loads(json_string)
-                                    if isinstance(parsed_analysis, dict):
-                                        validation = parsed_analysis.get('validation', {})
-                                        issues = validation.get('issues', [])
-                                        if issues:
-                                            claim.denial_reason = issues[0]
-                                        else:
-                                            claim.denial_reason = 'AI analysis indicates denial'
-                except:
-                    claim.denial_reason = 'AI analysis indicates denial'
-            
-            claim_id = claim_service.create_claim(claim)
+            return jsonify(_store_processed_claim(data, result)), 201
+        else:
+            return jsonify({"error": result.get('error', 'Claim processing failed')}), 400
             
-            # If claim was automatically approved, generate EOB
-            if result.get('status') == 'approved':
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@app.route('/api/claims/process/stream', methods=['POST'])
+def process_claim_stream():
+    """Process insurance claim and stream progress as Server-Sent Events"""
+    data = request.get_json()
+    
+    # Validate required fields
+    required_fields = ['patient_id', 'claim_amount', 'claim_type', 'description']
+    for field in required_fields:
+        if field not in data:
+            return jsonify({"error": f"Missing required field: {field}"}), 400
+    
+    def generate():
+        for event, payload in bedrock_service.process_claim_stream(data):
+            if event == 'decision':
                 try:
-                    eob_result = bedrock_service.generate_eob(claim)
-                    if eob_result['success']:
-                        # Create EOB record
-                        eob = EOB(
-                            claim_id=claim_id,
-                            patient_id=claim.patient_id,
-                            eob_amount=eob_result['eob_amount'],
-                            status=eob_result['status'],
-                            eob_date=eob_result['eob_date'],
-                            insurance_company=eob_result['insurance_company'],
-                            pdf_url=f"/api/eobs/{claim_id}/pdf",  # Will be updated after EOB is created
-                            ai_analysis=eob_result.get('ai_analysis'),
-                            denial_reasons=eob_result.get('denial_reasons'),
-                            refile_required=eob_result.get('refile_required', False)
-                        )
-                        
-                        db.session.add(eob)
-                        db.session.commit()
-                        
-                        # Update PDF URL with actual EOB ID
-                        eob.pdf_url = f"/api/eobs/{eob.id}/pdf"
-                        db.session.commit()
-                        
-                        print(f"EOB generated for automatically approved claim {claim_id}")
-                except Exception as eob_error:
-                    print(f"Error generating EOB for automatically approved claim {claim_id}: {eob_error}")
-            
-            return jsonify({
+                    payload = _store_processed_claim(data, payload)
+                except Exception as e:
+                    event, payload = 'error', {"error": str(e)}
+            yield _sse_event(event, payload)
+    
+    return Response(
+        stream_with_context(generate()),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+def _sse_event(event, payload):
+    """Format one Server-Sent Events message"""
+    return f"event: {event}\ndata: {json.dumps(payload)}\n\n"
+
+@app.route('/api/claims/process/batch', methods=['POST'])
+def process_claims_batch():
+    """Process many claims with packed AI prompts and store them in one transaction"""
+    try:
+        data = request.get_json()
+        claims_data = data.get('claims') if isinstance(data, dict) else data
+        if not isinstance(claims_data, list) or not claims_data:
+            return jsonify({"error": "Request must contain a non-empty 'claims' array"}), 400
+        
+        max_batch = int(os.getenv('AI_BATCH_MAX_CLAIMS', '1000'))
+        if len(claims_data) > max_batch:
+            return jsonify({"error": f"Batch exceeds maximum of {max_batch} claims"}), 400
+        
+        # Validate every row before any AI call, so one bad row cannot fail the whole insert
+        report = []
+        valid = []
+        for index, claim_data in enumerate(claims_data):
+            values, error = _validate_claim_row(claim_data)
+            if error:
+                report.append({"index": index, "success": False, "error": error})
+            else:
+                report.append(None)
+                claims_data[index] = values
+                valid.append(index)
+        
+        if not valid:
+            return jsonify({"error": "No valid claims to process", "results": report}), 400
+        
+        results = bedrock_service.process_claims_batch([claims_data[i] for i in valid])
+        claims = [_build_claim(claims_data[i], result) for i, result in zip(valid, results)]
+        for claim in claims:
+            claim.id = str(uuid.uuid4())
+        
+        # Approved claims get their EOB as in /api/claims/process, generated in parallel before
+        # the insert so claims and EOBs are stored together
+        approved = [claim for claim in claims if claim.status == 'approved']
+        eobs = {}
+        for claim, eob_result in zip(approved, bedrock_service.generate_eobs(approved)):
+            if eob_result.get('success'):
+                eobs[claim.id] = _build_eob(claim, eob_result)
+            else:
+                print(f"Error generating EOB for automatically approved claim {claim.id}: {eob_result.get('error')}")
+        claim_service.create_claims(claims, list(eobs.values()))
+        
+        for index, claim, result in zip(valid, claims, results):
+            eob = eobs.get(claim.id)
+            report[index] = {
+                "index": index,
                 "success": True,
-                "claim_id": claim_id,
+                "claim_id": claim.id,
                 "status": claim.status,
                 "approval_required": claim.approval_required,
-                "ai_analysis": result.get('ai_analysis', {}),
-                "next_steps": result.get('next_steps', []),
-                "approved_at": claim.approved_at.isoformat() if claim.approved_at else None,
-                "denied_at": claim.denied_at.isoformat() if claim.denied_at else None,
-                "denial_reason": claim.denial_reason
-            }), 201
-        else:
-            return jsonify({"error": result.get('error', 'Claim processing failed')}), 400
+                "denial_reason": claim.denial_reason,
+                "eob_id": eob.id if eob else None,
+                "ai_analysis": result.get('ai_analysis', {})
+            }
+        
+        return jsonify({
+            "success": True,
+            "processed": len(valid),
+            "failed": len(claims_data) - len(valid),
+            "results": report
+        }), 201
             
     except Exception as e:
         return jsonify({"error": str(e)}), 500
@@ -205,7 +435,7 @@ def process_claim():
 def get_claim(claim_id):
     """Get claim information"""
     try:
-        claim = claim_service.get_claim(claim_id)
+        claim = claim_service.get_claim(claim_id, include_archived=True)
         if claim:
             return jsonify(claim.to_dict()), 200
         else:
@@ -248,6 +478,7 @@ def deny_claim(claim_id):
         return jsonify({"error": str(e)}), 500
 
 @app.route('/api/observability/metrics', methods=['GET'])
+@replica_router.route_reads
 def get_metrics():
     """Get application observability metrics"""
     try:
@@ -257,6 +488,7 @@ def get_metrics():
         return jsonify({"error": str(e)}), 500
 
 @app.route('/api/agents/status', methods=['GET'])
+@replica_router.route_reads
 def get_agent_status():
     """Get status of all AI agents"""
     try:
@@ -266,6 +498,7 @@ def get_agent_status():
         return jsonify({"error": str(e)}), 500
 
 @app.route('/api/observability/alerts', methods=['GET'])
+@replica_router.route_reads
 def get_system_alerts():
     """Get system alerts and notifications"""
     try:
@@ -274,25 +507,94 @@ def get_system_alerts():
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
+@app.route('/api/observability/runtime', methods=['GET'])
+def get_runtime_stats():
+    """Get AI invocation layer statistics"""
+    try:
+        stats = bedrock_service.get_runtime_stats()
+        return jsonify(stats), 200
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+def _list_args(model):
+    """Pagination, date-range and projection arguments shared by the list endpoints"""
+    return {
+        'created_after': parse_datetime(request.args.get('created_after'), 'created_after'),
+        'created_before': parse_datetime(request.args.get('created_before'), 'created_before'),
+        'cursor': request.args.get('cursor'),
+        'limit': parse_limit(request.args.get('limit')),
+        'fields': parse_fields(request.args.get('fields'), model.FIELDS)
+    }
+
+NDJSON_MIMETYPE = 'application/x-ndjson'
+
+def _wants_ndjson():
+    """NDJSON when asked for with format=ndjson or Accept: application/x-ndjson"""
+    return (request.args.get('format') == 'ndjson' or
+            request.accept_mimetypes.best_match(['application/json', NDJSON_MIMETYPE]) == NDJSON_MIMETYPE)
+
+def _list_response(model, rows, next_cursor=None, streamed=False, envelope=None):
+    """Encode list rows as a JSON array (wrapped in {envelope: [...]} if given) or as NDJSON
+    
+    Streamed rows are encoded as they are fetched, so the whole list is never held in memory.
+    The next page's cursor goes in X-Next-Cursor.
+    """
+    headers = {'X-Next-Cursor': next_cursor} if next_cursor else None
+    if _wants_ndjson():
+        body, mimetype = json_serializer.iter_ndjson(rows, model.JSON_FIELDS), NDJSON_MIMETYPE
+    else:
+        prefix, suffix = b'[', b']'
+        if envelope:
+            prefix = b'{"' + envelope.encode('utf-8') + b'":['
+            suffix = b'],"next_cursor":' + json_serializer.dumps(next_cursor) + b'}'
+        body, mimetype = json_serializer.iter_array(rows, model.JSON_FIELDS, prefix, suffix), 'application/json'
+    body = stream_with_context(body) if streamed else b''.join(body)
+    return json_serializer.response(body, headers=headers, mimetype=mimetype)
+
+# Claim filters matched exactly; the AI decision columns are stored lower-case
+CASE_SENSITIVE_CLAIM_FILTERS = ('patient_id', 'claim_type')
+
 @app.route('/api/claims', methods=['GET'])
+@replica_router.route_reads
 def get_all_claims():
-    """Get all claims"""
+    """List claims newest first, with optional filters, keyset pagination and field projection"""
     try:
-        claims = claim_service.get_all_claims()
-        return jsonify([claim.to_dict() for claim in claims]), 200
+        filters = {
+            column: request.args[column] if column in CASE_SENSITIVE_CLAIM_FILTERS else request.args[column].lower()
+            for column in claim_service.FILTERABLE_COLUMNS
+            if column in request.args
+        }
+        if 'ai_parse_success' in filters:
+            filters['ai_parse_success'] = filters['ai_parse_success'] in ('1', 'true', 'yes')
+        args = _list_args(Claim)
+        limit = args.pop('limit')
+        if limit is None:
+            return _list_response(Claim, claim_service.iter_claims(filters, **args), streamed=True)
+        claims, next_cursor = claim_service.list_claims(filters, limit=limit, as_rows=True, **args)
+        return _list_response(Claim, claims, next_cursor)
+    except ListQueryError as e:
+        return jsonify({"error": str(e)}), 400
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
 @app.route('/api/patients', methods=['GET'])
+@replica_router.route_reads
 def get_all_patients():
-    """Get all patients"""
+    """List patients newest first, with optional date range, keyset pagination and field projection"""
     try:
-        patients = patient_service.get_all_patients()
-        return jsonify([patient.to_dict() for patient in patients]), 200
+        args = _list_args(Patient)
+        limit = args.pop('limit')
+        if limit is None:
+            return _list_response(Patient, patient_service.iter_patients(**args), streamed=True)
+        patients, next_cursor = patient_service.list_patients(limit=limit, as_rows=True, **args)
+        return _list_response(Patient, patients, next_cursor)
+    except ListQueryError as e:
+        return jsonify({"error": str(e)}), 400
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
 @app.route('/api/activity/recent', methods=['GET'])
+@replica_router.route_reads
 def get_recent_activity():
     """Get recent activity from patients and claims"""
     try:
@@ -457,11 +759,23 @@ def chatbot_query():
 
 # EOB Management Endpoints
 @app.route('/api/eobs', methods=['GET'])
+@replica_router.route_reads
 def get_eobs():
-    """Get all EOBs"""
+    """List EOBs newest first, with optional filters, keyset pagination and field projection"""
     try:
-        eobs = EOB.query.all()
-        return jsonify({"eobs": [eob.to_dict() for eob in eobs]})
+        filters = {
+            column: request.args[column]
+            for column in eob_service.FILTERABLE_COLUMNS
+            if column in request.args
+        }
+        args = _list_args(EOB)
+        limit = args.pop('limit')
+        if limit is None:
+            return _list_response(EOB, eob_service.iter_eobs(filters, **args), streamed=True, envelope='eobs')
+        eobs, next_cursor = eob_service.list_eobs(filters, limit=limit, as_rows=True, **args)
+        return _list_response(EOB, eobs, next_cursor, envelope='eobs')
+    except ListQueryError as e:
+        return jsonify({"error": str(e)}), 400
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
@@ -516,7 +830,7 @@ def generate_eob():
 def analyze_eob(eob_id):
     """Analyze EOB using AI"""
     try:
-        eob = EOB.query.get(eob_id)
+        eob = eob_service.get_eob(eob_id)
         if not eob:
             return jsonify({"error": "EOB not found"}), 404
         
@@ -544,7 +858,7 @@ def refile_claim(eob_id):
         data = request.get_json()
         reason = data.get('reason', '')
         
-        eob = EOB.query.get(eob_id)
+        eob = eob_service.get_eob(eob_id)
         if not eob:
             return jsonify({"error": "EOB not found"}), 404
         
@@ -552,8 +866,8 @@ def refile_claim(eob_id):
         result = bedrock_service.refile_claim(eob, reason)
         
         if result['success']:
-            # Update claim status
-            claim = Claim.query.get(eob.claim_id)
+            # Update claim status; the claim was loaded with the EOB
+            claim = eob.claim
             if claim:
                 claim.status = 'refiled'
                 claim.denial_reason = reason
@@ -570,7 +884,7 @@ def refile_claim(eob_id):
 def get_eob_pdf(eob_id):
     """Generate and return PDF for EOB"""
     try:
-        eob = EOB.query.get(eob_id)
+        eob = eob_service.get_eob(eob_id, include_archived=True)
         if not eob:
             return jsonify({"error": "EOB not found"}), 404
         
@@ -587,5 +901,58 @@ def get_eob_pdf(eob_id):
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
+# Full-table exports, streamed from a server-side cursor
+EXPORTS = {
+    'claims': (Claim, lambda: claim_service.iter_claims()),
+    'patients': (Patient, lambda: patient_service.iter_patients()),
+    'eobs': (EOB, lambda: eob_service.iter_eobs())
+}
+
+@app.cli.command('export')
+@click.argument('resource', type=click.Choice(sorted(EXPORTS)))
+@click.option('--output', '-o', type=click.File('wb'), default='-', help='File to write (default stdout)')
+def export_command(resource, output):
+    """Write every claim, patient or EOB as NDJSON with flat memory use"""
+    model, rows = EXPORTS[resource]
+    for chunk in json_serializer.iter_ndjson(rows(), model.JSON_FIELDS):
+        output.write(chunk)
+
+@app.cli.group('stats')
+def stats_group():
+    """Maintain the platform_statistics counters"""
+
+@stats_group.command('rebuild')
+def stats_rebuild_command():
+    """Recompute every counter from the patients and claims tables"""
+    stats = rebuild_statistics(db.session.connection())
+    db.session.commit()
+    for name, value in sorted(stats.items()):
+        click.echo(f'{name}: {value:g}')
+
+@app.cli.group('activity')
+def activity_group():
+    """Maintain the activity_rollups buckets"""
+
+@activity_group.command('compact')
+def activity_compact_command():
+    """Downsample old minute buckets to hourly ones and expire hourly buckets past retention"""
+    result = compact_activity(db.session.connection())
+    db.session.commit()
+    for name, value in result.items():
+        click.echo(f'{name}: {value}')
+
+@app.cli.group('archive')
+def archive_group():
+    """Move closed claims out of the hot tables"""
+
+@archive_group.command('claims')
+@click.option('--older-than-days', type=float, default=None, help='Age of the last change (default ARCHIVE_AFTER_DAYS)')
+@click.option('--dry-run', is_flag=True, help='Only count the claims that would be archived')
+def archive_claims_command(older_than_days, dry_run):
+    """Archive approved and denied claims, with their EOBs, into monthly compressed files"""
+    result = claim_archive.archive_closed_claims(after_days=older_than_days, dry_run=dry_run)
+    for name, value in result.items():
+        click.echo(f'{name}: {value}')
+
 if __name__ == '__main__':
     app.run(debug=True, host='0.0.0.0', port=5001)
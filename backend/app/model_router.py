@@ -0,0 +1,122 @@
+"""
+Madza AI Healthcare Platform - Model Router
+Copyright (c) 2025 Madza AI Healthcare Platform. All rights reserved.
+
+PROPRIETARY SOFTWARE - UNAUTHORIZED USE PROHIBITED
+This file contains the per-task model router. Each AI task maps to a latency/cost
+tier, each tier to a Bedrock model, and a secondary model is used when the
+primary is throttled. Per-route latency is recorded for observability.
+
+For licensing information, contact: arpanchowdhury2025@gmail.com
+"""
+
+import os
+import threading
+from collections import deque
+from typing import Dict, Any, List, Optional
+
+DEFAULT_TASK_TIERS = {
+    'patient_registration': 'fast',
+    'suggestions': 'fast',
+    'chatbot': 'fast',
+    'claim_processing': 'standard',
+    'denial_analysis': 'standard'
+}
+
+
+def _percentile(sorted_values: List[float], percentile: float) -> float:
+    index = min(len(sorted_values) - 1, int(round(percentile / 100 * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+class ModelRouter:
+    """Maps AI tasks to model tiers with a throttling fallback model"""
+
+    def __init__(self, tier_models: Dict[str, str], task_tiers: Optional[Dict[str, str]] = None,
+                 fallback_model_id: Optional[str] = None, default_tier: str = 'standard',
+                 latency_window: int = 500):
+        self.tier_models = dict(tier_models)
+        self.task_tiers = dict(DEFAULT_TASK_TIERS)
+        self.task_tiers.update(task_tiers or {})
+        self.fallback_model_id = fallback_model_id
+        self.default_tier = default_tier
+        self.latency_window = latency_window
+        self._lock = threading.Lock()
+        self._routes = {}
+
+    @classmethod
+    def from_env(cls) -> 'ModelRouter':
+        """Create a router from BEDROCK_*_MODEL_ID and AI_TASK_TIERS environment variables
+
+        AI_TASK_TIERS overrides the task map, e.g. "suggestions=standard,chatbot=fast".
+        """
+        standard_model = os.getenv('BEDROCK_MODEL_ID', 'openai.gpt-oss-120b-1:0')
+        task_tiers = {}
+        for pair in os.getenv('AI_TASK_TIERS', '').split(','):
+            if '=' in pair:
+                task, tier = pair.split('=', 1)
+                task_tiers[task.strip()] = tier.strip()
+        return cls(
+            tier_models={
+                'fast': os.getenv('BEDROCK_FAST_MODEL_ID') or standard_model,
+                'standard': standard_model
+            },
+            task_tiers=task_tiers,
+            fallback_model_id=os.getenv('BEDROCK_FALLBACK_MODEL_ID') or None
+        )
+
+    def tier_for(self, task: str) -> str:
+        tier = self.task_tiers.get(task, self.default_tier)
+        return tier if tier in self.tier_models else self.default_tier
+
+    def route(self, task: str) -> List[str]:
+        """Models to try for a task, primary first"""
+        models = [self.tier_models[self.tier_for(task)]]
+        if self.fallback_model_id and self.fallback_model_id not in models:
+            models.append(self.fallback_model_id)
+        return models
+
+    def primary_model(self, task: str) -> str:
+        return self.route(task)[0]
+
+    def record(self, task: str, model_id: str, seconds: float, success: bool = True, fallback: bool = False):
+        """Record one call's latency and outcome on its route"""
+        with self._lock:
+            route = self._routes.get((task, model_id))
+            if route is None:
+                route = {'calls': 0, 'errors': 0, 'fallbacks': 0, 'total_seconds': 0.0,
+                         'latencies': deque(maxlen=self.latency_window)}
+                self._routes[(task, model_id)] = route
+            route['calls'] += 1
+            route['total_seconds'] += seconds
+            route['latencies'].append(seconds)
+            if not success:
+                route['errors'] += 1
+            if fallback:
+                route['fallbacks'] += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get the routing table and per-route latency"""
+        with self._lock:
+            routes = {key: dict(value, latencies=sorted(value['latencies'])) for key, value in self._routes.items()}
+        stats = {}
+        for (task, model_id), route in routes.items():
+            latencies = route['latencies']
+            stats[f'{task}->{model_id}'] = {
+                'calls': route['calls'],
+                'errors': route['errors'],
+                'fallbacks': route['fallbacks'],
+                'average_ms': round(route['total_seconds'] / route['calls'] * 1000, 1),
+                'p50_ms': round(_percentile(latencies, 50) * 1000, 1) if latencies else 0,
+                'p95_ms': round(_percentile(latencies, 95) * 1000, 1) if latencies else 0
+            }
+        return {
+            'tiers': dict(self.tier_models),
+            'tasks': {task: self.tier_for(task) for task in self.task_tiers},
+            'fallback_model': self.fallback_model_id,
+            'routes': stats
+        }
+
+
+# Shared process-wide router so route latency is aggregated across service instances
+model_router = ModelRouter.from_env()
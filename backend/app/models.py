@@ -10,13 +10,58 @@ For licensing information, contact: arpanchowdhury2025@gmail.com
 """
 
 from datetime import datetime
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, Set
 import uuid
 import json
 from .database import db
+from .json_column import JSONText, cached_json, store_json
+
+# Column widths for the decision fields copied out of a claim's AI analysis
+DECISION_COLUMN_LENGTHS = {
+    'validation_status': 20,
+    'coverage_decision': 30,
+    'fraud_risk_level': 20,
+    'ai_recommendation': 40
+}
+
+
+def claim_decision_fields(parsed_analysis: Any) -> Dict[str, Any]:
+    """Typed decision columns for a parsed claim analysis (None if it could not be parsed)
+
+    Values are lower-cased so SQL filters and aggregates need no case folding.
+    """
+    if not isinstance(parsed_analysis, dict) or 'error' in parsed_analysis:
+        return {
+            'validation_status': None,
+            'coverage_decision': None,
+            'fraud_risk_level': None,
+            'ai_recommendation': None,
+            'ai_parse_success': False
+        }
+
+    def field(section: str, key: str, column: str) -> Optional[str]:
+        section_data = parsed_analysis.get(section)
+        value = section_data.get(key) if isinstance(section_data, dict) else None
+        if value is None or isinstance(value, (dict, list)):
+            return None
+        return str(value).strip().lower()[:DECISION_COLUMN_LENGTHS[column]] or None
+
+    return {
+        'validation_status': field('validation', 'status', 'validation_status'),
+        'coverage_decision': field('coverageCheck', 'coverageDecision', 'coverage_decision'),
+        'fraud_risk_level': field('fraudRiskAssessment', 'riskLevel', 'fraud_risk_level'),
+        'ai_recommendation': field('fraudRiskAssessment', 'recommendation', 'ai_recommendation'),
+        'ai_parse_success': True
+    }
 
 class Patient(db.Model):
     __tablename__ = 'patients'
+    __table_args__ = (
+        # Recent-activity feed, per-hour counts and keyset pagination
+        db.Index('ix_patients_created_at_id', 'created_at', 'id'),
+        # Agent status "last used"
+        db.Index('ix_patients_updated_at', 'updated_at'),
+    )
     
     id = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
     first_name = db.Column(db.String(100), nullable=False)
@@ -26,7 +71,7 @@ class Patient(db.Model):
     date_of_birth = db.Column(db.String(10), nullable=False)
     insurance_id = db.Column(db.String(100), nullable=False)
     insurance_provider = db.Column(db.String(100), nullable=False)
-    ai_analysis = db.Column(db.Text)  # JSON stored as text
+    ai_analysis = db.Column(JSONText)  # JSONB on Postgres, JSON text on SQLite
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
@@ -47,16 +92,27 @@ class Patient(db.Model):
     
     def get_ai_analysis(self) -> Dict[str, Any]:
         """Get AI analysis as dictionary"""
-        if self.ai_analysis:
-            return json.loads(self.ai_analysis)
-        return {}
+        return cached_json(self, 'ai_analysis', dict)
     
     def set_ai_analysis(self, analysis: Dict[str, Any]):
         """Set AI analysis from dictionary"""
-        self.ai_analysis = json.dumps(analysis) if analysis else None
+        store_json(self, 'ai_analysis', analysis)
     
-    def to_dict(self):
-        return {
+    # API fields, and the large text columns that can be deferred when not requested
+    FIELDS = ('id', 'first_name', 'last_name', 'email', 'phone', 'date_of_birth', 'insurance_id',
+              'insurance_provider', 'ai_analysis', 'created_at', 'updated_at')
+    DEFERRABLE_FIELDS = ('ai_analysis',)
+    # JSON text columns spliced into list responses as stored, with the value used when NULL
+    JSON_FIELDS = {'ai_analysis': '{}'}
+    
+    @classmethod
+    def api_columns(cls) -> Dict[str, Any]:
+        """Column expressions for each API field, for the ORM-free list path"""
+        return {name: getattr(cls, name) for name in cls.FIELDS}
+    
+    def to_dict(self, fields: Optional[Set[str]] = None):
+        """Serialize the patient; fields limits the output and skips decoding unrequested JSON"""
+        data = {
             'id': self.id,
             'first_name': self.first_name,
             'last_name': self.last_name,
@@ -65,28 +121,52 @@ class Patient(db.Model):
             'date_of_birth': self.date_of_birth,
             'insurance_id': self.insurance_id,
             'insurance_provider': self.insurance_provider,
-            'ai_analysis': self.get_ai_analysis(),
             'created_at': self.created_at.isoformat(),
             'updated_at': self.updated_at.isoformat()
         }
+        if fields is None or 'ai_analysis' in fields:
+            data['ai_analysis'] = self.get_ai_analysis()
+        if fields is None:
+            return data
+        return {key: value for key, value in data.items() if key in fields}
 
 class Claim(db.Model):
     __tablename__ = 'claims'
+    __table_args__ = (
+        # Status counts (covering) and status-filtered lists ordered by age
+        db.Index('ix_claims_status_created_at', 'status', 'created_at'),
+        # Average approval time reads both timestamps from the index alone
+        db.Index('ix_claims_status_approved_at', 'status', 'approved_at', 'created_at'),
+        # Recent-activity feed, per-hour counts and keyset pagination
+        db.Index('ix_claims_created_at_id', 'created_at', 'id'),
+        # Agent status "last used"
+        db.Index('ix_claims_updated_at', 'updated_at'),
+        # Patient.claims and per-patient claim lists
+        db.Index('ix_claims_patient_id_created_at', 'patient_id', 'created_at'),
+    )
     
     id = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
     patient_id = db.Column(db.String(36), db.ForeignKey('patients.id'), nullable=False)
     claim_amount = db.Column(db.Float, nullable=False)
     claim_type = db.Column(db.String(50), nullable=False)
     description = db.Column(db.Text, nullable=False)
-    status = db.Column(db.String(20), default='pending')
-    ai_analysis = db.Column(db.Text)  # JSON stored as text
+    # active_history loads the previous value on change so app.statistics can move the counters
+    status = db.column_property(db.Column(db.String(20), default='pending'), active_history=True)
+    ai_analysis = db.Column(JSONText)  # JSONB on Postgres, JSON text on SQLite
     approval_required = db.Column(db.Boolean, default=False)
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    created_at = db.column_property(db.Column(db.DateTime, default=datetime.utcnow), active_history=True)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
-    approved_at = db.Column(db.DateTime)
+    approved_at = db.column_property(db.Column(db.DateTime), active_history=True)
     denied_at = db.Column(db.DateTime)
     denial_reason = db.Column(db.Text)
-    ai_suggestions = db.Column(db.Text)  # JSON stored as text
+    ai_suggestions = db.Column(JSONText)  # JSONB on Postgres, JSON text on SQLite
+    
+    # Decision fields parsed out of ai_analysis at write time, for SQL filters and aggregates
+    validation_status = db.Column(db.String(DECISION_COLUMN_LENGTHS['validation_status']), index=True)
+    coverage_decision = db.Column(db.String(DECISION_COLUMN_LENGTHS['coverage_decision']), index=True)
+    fraud_risk_level = db.Column(db.String(DECISION_COLUMN_LENGTHS['fraud_risk_level']), index=True)
+    ai_recommendation = db.Column(db.String(DECISION_COLUMN_LENGTHS['ai_recommendation']), index=True)
+    ai_parse_success = db.column_property(db.Column(db.Boolean, index=True), active_history=True)
     
     def __init__(self, patient_id: str, claim_amount: float, claim_type: str, 
                  description: str, status: str = 'pending', ai_analysis: Dict[str, Any] = None,
@@ -101,44 +181,84 @@ class Claim(db.Model):
     
     def get_ai_analysis(self) -> Dict[str, Any]:
         """Get AI analysis as dictionary"""
-        if self.ai_analysis:
-            return json.loads(self.ai_analysis)
-        return {}
+        return cached_json(self, 'ai_analysis', dict)
     
     def set_ai_analysis(self, analysis: Dict[str, Any]):
         """Set AI analysis from dictionary"""
-        self.ai_analysis = json.dumps(analysis) if analysis else None
+        store_json(self, 'ai_analysis', analysis)
+    
+    def set_decision_fields(self, parsed_analysis: Any):
+        """Store the typed decision columns from the parsed AI analysis
+        
+        Claims without any AI analysis keep every decision column NULL.
+        """
+        for column, value in claim_decision_fields(parsed_analysis).items():
+            setattr(self, column, value if self.ai_analysis else None)
     
     def get_ai_suggestions(self) -> Dict[str, Any]:
         """Get AI suggestions as dictionary"""
-        if self.ai_suggestions:
-            return json.loads(self.ai_suggestions)
-        return {}
+        return cached_json(self, 'ai_suggestions', dict)
     
     def set_ai_suggestions(self, suggestions: Dict[str, Any]):
         """Set AI suggestions from dictionary"""
-        self.ai_suggestions = json.dumps(suggestions) if suggestions else None
+        store_json(self, 'ai_suggestions', suggestions)
     
-    def to_dict(self):
-        return {
+    # API fields, and the large text columns that can be deferred when not requested
+    FIELDS = ('id', 'patient_id', 'claim_amount', 'claim_type', 'description', 'status', 'ai_analysis',
+              'approval_required', 'created_at', 'updated_at', 'approved_at', 'denied_at', 'denial_reason',
+              'ai_suggestions', 'validation_status', 'coverage_decision', 'fraud_risk_level',
+              'ai_recommendation', 'ai_parse_success')
+    DEFERRABLE_FIELDS = ('ai_analysis', 'ai_suggestions', 'description', 'denial_reason')
+    # JSON text columns spliced into list responses as stored, with the value used when NULL
+    JSON_FIELDS = {'ai_analysis': '{}', 'ai_suggestions': '{}'}
+    
+    @classmethod
+    def api_columns(cls) -> Dict[str, Any]:
+        """Column expressions for each API field, for the ORM-free list path"""
+        return {name: getattr(cls, name) for name in cls.FIELDS}
+    
+    def to_dict(self, fields: Optional[Set[str]] = None):
+        """Serialize the claim; fields limits the output and skips decoding unrequested JSON"""
+        wanted = lambda field: fields is None or field in fields
+        data = {
             'id': self.id,
             'patient_id': self.patient_id,
             'claim_amount': self.claim_amount,
             'claim_type': self.claim_type,
-            'description': self.description,
             'status': self.status,
-            'ai_analysis': self.get_ai_analysis(),
             'approval_required': self.approval_required,
             'created_at': self.created_at.isoformat(),
             'updated_at': self.updated_at.isoformat(),
             'approved_at': self.approved_at.isoformat() if self.approved_at else None,
             'denied_at': self.denied_at.isoformat() if self.denied_at else None,
-            'denial_reason': self.denial_reason,
-            'ai_suggestions': self.get_ai_suggestions()
+            'validation_status': self.validation_status,
+            'coverage_decision': self.coverage_decision,
+            'fraud_risk_level': self.fraud_risk_level,
+            'ai_recommendation': self.ai_recommendation,
+            'ai_parse_success': self.ai_parse_success
         }
+        if wanted('description'):
+            data['description'] = self.description
+        if wanted('denial_reason'):
+            data['denial_reason'] = self.denial_reason
+        if wanted('ai_analysis'):
+            data['ai_analysis'] = self.get_ai_analysis()
+        if wanted('ai_suggestions'):
+            data['ai_suggestions'] = self.get_ai_suggestions()
+        if fields is None:
+            return data
+        return {key: value for key, value in data.items() if key in fields}
 
 class EOB(db.Model):
     __tablename__ = 'eobs'
+    __table_args__ = (
+        # Claim.eobs and EOB lookups for a claim
+        db.Index('ix_eobs_claim_id', 'claim_id'),
+        # Patient.eobs and per-patient EOB lists
+        db.Index('ix_eobs_patient_id_created_at', 'patient_id', 'created_at'),
+        # EOB list ordering and keyset pagination
+        db.Index('ix_eobs_created_at_id', 'created_at', 'id'),
+    )
     
     id = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
     claim_id = db.Column(db.String(36), db.ForeignKey('claims.id'), nullable=False)
@@ -148,8 +268,8 @@ class EOB(db.Model):
     eob_date = db.Column(db.Date, nullable=False)
     insurance_company = db.Column(db.String(100), nullable=False)
     pdf_url = db.Column(db.String(500), nullable=True)
-    ai_analysis = db.Column(db.Text)  # JSON stored as text
-    denial_reasons = db.Column(db.Text)  # JSON stored as text
+    ai_analysis = db.Column(JSONText)  # JSONB on Postgres, JSON text on SQLite
+    denial_reasons = db.Column(JSONText)  # JSONB on Postgres, JSON text on SQLite
     refile_required = db.Column(db.Boolean, default=False)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
@@ -175,39 +295,102 @@ class EOB(db.Model):
     
     def get_ai_analysis(self) -> Dict[str, Any]:
         """Get AI analysis as dictionary"""
-        if self.ai_analysis:
-            return json.loads(self.ai_analysis)
-        return {}
+        return cached_json(self, 'ai_analysis', dict)
     
     def set_ai_analysis(self, analysis: Dict[str, Any]):
         """Set AI analysis from dictionary"""
-        self.ai_analysis = json.dumps(analysis) if analysis else None
+        store_json(self, 'ai_analysis', analysis)
     
     def get_denial_reasons(self) -> list:
         """Get denial reasons as list"""
-        if self.denial_reasons:
-            return json.loads(self.denial_reasons)
-        return []
+        return cached_json(self, 'denial_reasons', list)
     
     def set_denial_reasons(self, reasons: list):
         """Set denial reasons from list"""
-        self.denial_reasons = json.dumps(reasons) if reasons else None
+        store_json(self, 'denial_reasons', reasons)
     
-    def to_dict(self):
-        return {
+    # API fields, and the large text columns that can be deferred when not requested
+    FIELDS = ('id', 'claim_id', 'patient_id', 'patient_name', 'claim_amount', 'eob_amount', 'status',
+              'eob_date', 'insurance_company', 'pdf_url', 'ai_analysis', 'denial_reasons',
+              'refile_required', 'created_at', 'updated_at')
+    DEFERRABLE_FIELDS = ('ai_analysis', 'denial_reasons')
+    # JSON text columns spliced into list responses as stored, with the value used when NULL
+    JSON_FIELDS = {'ai_analysis': '{}', 'denial_reasons': '[]'}
+    # API fields read from the patient and claim rows
+    RELATED_FIELDS = ('patient_name', 'claim_amount')
+    
+    @classmethod
+    def api_columns(cls) -> Dict[str, Any]:
+        """Column expressions for each API field; related fields need patients and claims outer-joined"""
+        columns = {name: getattr(cls, name) for name in cls.FIELDS if name not in cls.RELATED_FIELDS}
+        columns['patient_name'] = Patient.first_name + ' ' + Patient.last_name
+        columns['claim_amount'] = db.func.coalesce(Claim.claim_amount, 0)
+        return columns
+    
+    def to_dict(self, fields: Optional[Set[str]] = None):
+        """Serialize the EOB; fields limits the output and skips unrequested relationship loads"""
+        wanted = lambda field: fields is None or field in fields
+        data = {
             'id': self.id,
             'claim_id': self.claim_id,
             'patient_id': self.patient_id,
-            'patient_name': self.patient.first_name + ' ' + self.patient.last_name if self.patient else None,
-            'claim_amount': self.claim.claim_amount if self.claim else 0,
             'eob_amount': self.eob_amount,
             'status': self.status,
             'eob_date': self.eob_date.isoformat(),
             'insurance_company': self.insurance_company,
             'pdf_url': self.pdf_url,
-            'ai_analysis': self.get_ai_analysis(),
-            'denial_reasons': self.get_denial_reasons(),
             'refile_required': self.refile_required,
             'created_at': self.created_at.isoformat(),
             'updated_at': self.updated_at.isoformat()
         }
+        if wanted('patient_name'):
+            data['patient_name'] = self.patient.first_name + ' ' + self.patient.last_name if self.patient else None
+        if wanted('claim_amount'):
+            data['claim_amount'] = self.claim.claim_amount if self.claim else 0
+        if wanted('ai_analysis'):
+            data['ai_analysis'] = self.get_ai_analysis()
+        if wanted('denial_reasons'):
+            data['denial_reasons'] = self.get_denial_reasons()
+        if fields is None:
+            return data
+        return {key: value for key, value in data.items() if key in fields}
+
+class PlatformStatistic(db.Model):
+    """Running counter maintained by app.statistics in the same transaction as the rows it counts"""
+    __tablename__ = 'platform_statistics'
+    
+    name = db.Column(db.String(100), primary_key=True)
+    value = db.Column(db.Float, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+class ActivityRollup(db.Model):
+    """Event count for one metric in one time bucket, maintained by app.activity"""
+    __tablename__ = 'activity_rollups'
+    
+    # Bucket width in seconds: per-minute buckets, downsampled to hourly ones as they age
+    resolution = db.Column(db.Integer, primary_key=True)
+    bucket_start = db.Column(db.DateTime, primary_key=True)
+    metric = db.Column(db.String(50), primary_key=True)
+    value = db.Column(db.Float, nullable=False, default=0)
+
+class ArchivedClaim(db.Model):
+    """Where an archived claim lives, plus the columns app.statistics.rebuild counts"""
+    __tablename__ = 'archived_claims'
+    
+    id = db.Column(db.String(36), primary_key=True)
+    # Archive partition (YYYY-MM of created_at), naming the archive file that holds the claim
+    partition = db.Column(db.String(7), nullable=False)
+    patient_id = db.Column(db.String(36), nullable=False, index=True)
+    status = db.Column(db.String(20))
+    created_at = db.Column(db.DateTime)
+    approved_at = db.Column(db.DateTime)
+    ai_parse_success = db.Column(db.Boolean)
+    archived_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+class ArchivedEOB(db.Model):
+    """Where an archived EOB lives; EOBs are archived in their claim's partition"""
+    __tablename__ = 'archived_eobs'
+    
+    id = db.Column(db.String(36), primary_key=True)
+    claim_id = db.Column(db.String(36), nullable=False, index=True)
+    partition = db.Column(db.String(7), nullable=False)
@@ -0,0 +1,151 @@
+"""
+Madza AI Healthcare Platform - List Pagination
+Copyright (c) 2025 Madza AI Healthcare Platform. All rights reserved.
+
+PROPRIETARY SOFTWARE - UNAUTHORIZED USE PROHIBITED
+This file contains the keyset pagination, date-range and field-projection
+helpers shared by the claim, patient and EOB list endpoints. Pages are ordered
+newest first on (created_at, id), and cursors are opaque base64 tokens.
+
+For licensing information, contact: arpanchowdhury2025@gmail.com
+"""
+
+import base64
+import json
+import os
+from datetime import datetime
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from sqlalchemy import tuple_
+from sqlalchemy.orm import defer
+
+MAX_PAGE_SIZE = int(os.getenv('API_MAX_PAGE_SIZE', '500'))
+# Rows fetched per round trip when streaming a whole list
+STREAM_BATCH_SIZE = int(os.getenv('API_STREAM_BATCH_SIZE', '1000'))
+# Columns every page query selects so the next cursor can be built
+KEYSET_FIELDS = ('created_at', 'id')
+
+
+class ListQueryError(ValueError):
+    """Raised for an invalid cursor, limit, date or field list"""
+
+
+def encode_cursor(created_at: datetime, row_id: str) -> str:
+    payload = json.dumps([created_at.isoformat(), row_id], separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, str]:
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        created_at, row_id = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+        return datetime.fromisoformat(created_at), str(row_id)
+    except (ValueError, TypeError) as e:
+        raise ListQueryError(f'Invalid cursor: {cursor}') from e
+
+
+def parse_limit(raw: Optional[str]) -> Optional[int]:
+    """Page size from the limit parameter; None means an unpaginated list"""
+    if raw is None:
+        return None
+    try:
+        limit = int(raw)
+    except ValueError as e:
+        raise ListQueryError(f'Invalid limit: {raw}') from e
+    if limit < 1:
+        raise ListQueryError('limit must be at least 1')
+    return min(limit, MAX_PAGE_SIZE)
+
+
+def parse_datetime(raw: Optional[str], name: str) -> Optional[datetime]:
+    """ISO date or datetime from a query parameter"""
+    if raw is None:
+        return None
+    try:
+        return datetime.fromisoformat(raw)
+    except ValueError as e:
+        raise ListQueryError(f'Invalid {name}: {raw}') from e
+
+
+def parse_fields(raw: Optional[str], allowed: Iterable[str]) -> Optional[Set[str]]:
+    """Requested field names from fields=a,b,c; None means every field"""
+    if not raw:
+        return None
+    fields = {field.strip() for field in raw.split(',') if field.strip()}
+    unknown = fields - set(allowed)
+    if unknown:
+        raise ListQueryError(f"Unknown fields: {', '.join(sorted(unknown))}")
+    return fields
+
+
+def created_between(query, model, created_after: Optional[datetime] = None,
+                    created_before: Optional[datetime] = None):
+    """Restrict query to rows created in [created_after, created_before)"""
+    if created_after is not None:
+        query = query.filter(model.created_at >= created_after)
+    if created_before is not None:
+        query = query.filter(model.created_at < created_before)
+    return query
+
+
+def defer_unrequested(query, model, fields: Optional[Set[str]] = None):
+    """Skip loading the model's large text columns that fields does not ask for"""
+    if fields is None:
+        return query
+    deferred = [defer(getattr(model, name)) for name in model.DEFERRABLE_FIELDS if name not in fields]
+    return query.options(*deferred) if deferred else query
+
+
+def select_fields(query, columns: Dict[str, Any], fields: Optional[Set[str]] = None):
+    """Select labelled column tuples for fields instead of hydrating ORM objects"""
+    names = [name for name in columns if fields is None or name in fields or name in KEYSET_FIELDS]
+    return query.with_entities(*[columns[name].label(name) for name in names])
+
+
+def iter_mappings(rows, fields: Optional[Set[str]] = None) -> Iterator[Dict[str, Any]]:
+    """Column tuples from select_fields as dicts of the requested fields"""
+    for row in rows:
+        if fields is None:
+            yield dict(row._mapping)
+        else:
+            yield {key: value for key, value in row._mapping.items() if key in fields}
+
+
+def row_mappings(rows, fields: Optional[Set[str]] = None) -> List[Dict[str, Any]]:
+    return list(iter_mappings(rows, fields))
+
+
+def _after_cursor(query, model, cursor: Optional[str] = None):
+    query = query.order_by(model.created_at.desc(), model.id.desc())
+    if cursor:
+        created_at, row_id = decode_cursor(cursor)
+        query = query.filter(tuple_(model.created_at, model.id) < tuple_(created_at, row_id))
+    return query
+
+
+def keyset_page(query, model, cursor: Optional[str] = None,
+                limit: Optional[int] = None) -> Tuple[List[Any], Optional[str]]:
+    """Order query newest first on (created_at, id) and return (rows, next_cursor)
+
+    With no limit every remaining row is returned and next_cursor is None.
+    """
+    query = _after_cursor(query, model, cursor)
+    if limit is None:
+        return query.all(), None
+
+    # One extra row tells us whether another page exists
+    rows = query.limit(limit + 1).all()
+    if len(rows) <= limit:
+        return rows, None
+    last = rows[limit - 1]
+    return rows[:limit], encode_cursor(last.created_at, last.id)
+
+
+def keyset_stream(query, model, cursor: Optional[str] = None, batch_size: Optional[int] = None):
+    """Iterate every row after cursor, newest first, batch_size rows per fetch
+
+    The cursor is validated immediately; rows are fetched only as the result is
+    iterated. yield_per streams from a server-side cursor where the driver
+    supports one (psycopg2), so memory stays flat however many rows match.
+    """
+    return _after_cursor(query, model, cursor).yield_per(batch_size or STREAM_BATCH_SIZE)
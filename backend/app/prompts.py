@@ -0,0 +1,246 @@
+"""
+Madza AI Healthcare Platform - Prompt Templates
+Copyright (c) 2025 Madza AI Healthcare Platform. All rights reserved.
+
+PROPRIETARY SOFTWARE - UNAUTHORIZED USE PROHIBITED
+This file contains the prompt template registry for every AI task. Templates are
+compiled once at import time with indentation and blank-line whitespace removed,
+report their token cost, and truncate long embedded context to a per-field
+token budget when rendered.
+
+For licensing information, contact: arpanchowdhury2025@gmail.com
+"""
+
+import string
+from typing import Dict, Any, Optional
+
+# Rough characters-per-token ratio for English prose and JSON across the model
+# families we call; no tokenizer ships with the Bedrock runtime client.
+CHARS_PER_TOKEN = 4
+TRUNCATION_MARKER = ' ...[truncated]'
+
+
+def estimate_tokens(text: str) -> int:
+    """Estimate the token count of text"""
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    """Cut text down to roughly max_tokens, marking the cut"""
+    max_chars = max_tokens * CHARS_PER_TOKEN
+    if len(text) <= max_chars:
+        return text
+    return text[:max(0, max_chars - len(TRUNCATION_MARKER))] + TRUNCATION_MARKER
+
+
+def compact_whitespace(text: str) -> str:
+    """Strip per-line indentation and trailing space and drop blank lines"""
+    return '\n'.join(line.strip() for line in text.strip().splitlines() if line.strip())
+
+
+class PromptTemplate:
+    """A whitespace-minimized str.format template with per-field token budgets"""
+
+    def __init__(self, name: str, text: str, budgets: Optional[Dict[str, int]] = None):
+        self.name = name
+        self.text = compact_whitespace(text)
+        self.budgets = budgets or {}
+        self.fields = sorted({
+            field for _, field, _, _ in string.Formatter().parse(self.text) if field
+        })
+        # Token cost of the fixed part of the prompt, excluding substituted values
+        self.token_count = estimate_tokens(self.text.format(**{field: '' for field in self.fields}))
+
+    def render(self, **values: Any) -> str:
+        """Substitute values, truncating budgeted fields first"""
+        for field, budget in self.budgets.items():
+            if field in values:
+                values[field] = truncate_to_tokens(str(values[field]), budget)
+        return self.text.format(**values)
+
+    def describe(self) -> Dict[str, Any]:
+        return {
+            'tokens': self.token_count,
+            'fields': self.fields,
+            'budgets': dict(self.budgets)
+        }
+
+
+class PromptRegistry:
+    """Named collection of compiled prompt templates"""
+
+    def __init__(self):
+        self._templates = {}
+
+    def register(self, name: str, text: str, budgets: Optional[Dict[str, int]] = None) -> PromptTemplate:
+        template = PromptTemplate(name, text, budgets)
+        self._templates[name] = template
+        return template
+
+    def get(self, name: str) -> PromptTemplate:
+        return self._templates[name]
+
+    def render(self, name: str, **values: Any) -> str:
+        return self._templates[name].render(**values)
+
+    def describe(self) -> Dict[str, Any]:
+        """Token counts and budgets for every template"""
+        return {name: template.describe() for name, template in self._templates.items()}
+
+
+prompts = PromptRegistry()
+
+prompts.register('patient_registration', """
+    Analyze this patient registration data and respond with ONLY a JSON object. No other text.
+    Patient Data:
+    - Name: {first_name} {last_name}
+    - Email: {email}
+    - Phone: {phone}
+    - Date of Birth: {date_of_birth}
+    - Insurance ID: {insurance_id}
+    - Insurance Provider: {insurance_provider}
+    Based on the data provided, return this JSON structure with appropriate values:
+    {{"riskAssessment": {{"insuranceEligibility": "Eligible|Not Eligible|Pending Review", "riskLevel": "Low|Medium|High", "justification": "Brief explanation based on the data including insurance verification"}},
+    "dataQualityAnalysis": {{"completeness": "Complete|Incomplete|Partial", "formatConsistency": "Consistent|Inconsistent|Mixed", "overallQuality": "High|Medium|Low"}},
+    "insuranceVerification": {{"providerValid": "Valid|Invalid|Pending Verification", "idFormat": "Valid|Invalid|Needs Review", "coverageStatus": "Active|Inactive|Unknown"}},
+    "verificationRecommendations": ["Specific recommendation based on the data", "Insurance verification recommendation", "Third specific recommendation"],
+    "potentialFraudIndicators": ["Any fraud indicators found or 'None identified'", "Insurance-related fraud indicators or 'None identified'"]}}
+""", budgets={'first_name': 25, 'last_name': 25, 'email': 40, 'insurance_provider': 25})
+
+prompts.register('claim_processing', """
+    Analyze this insurance claim and respond with ONLY a JSON object. No other text.
+    Claim Data:
+    - Patient ID: {patient_id}
+    - Claim Amount: ${claim_amount}
+    - Claim Type: {claim_type}
+    - Description: {description}
+    Based on the claim data, return this JSON structure with appropriate values:
+    {{"claimId": "CLM-{claim_ref}",
+    "validation": {{"status": "Valid|Invalid|Pending", "completeness": "Complete|Incomplete|Partial", "issues": ["Any issues found or empty array"]}},
+    "coverageCheck": {{"policyCoverage": "Covered|Not Covered|Partially Covered", "medicalNecessity": "Medically Necessary|Not Medically Necessary|Under Review", "coverageDecision": "Approved|Denied|Pending Review"}},
+    "fraudRiskAssessment": {{"riskLevel": "Low|Medium|High", "riskFactors": ["Any risk factors found or empty array"], "recommendation": "Approve|Deny|Manual Review Required"}},
+    "approvalRequirements": {{"requiredDocuments": ["Document 1", "Document 2"], "preAuthorization": "Required|Not Required|Already Obtained", "additionalSteps": ["Any additional steps needed or empty array"]}},
+    "processingTimeEstimate": {{"standardTurnaround": "1-3 business days|3-5 business days|5-10 business days", "potentialDelays": ["Any potential delays or empty array"]}},
+    "nextSteps": ["Next step 1", "Next step 2", "Next step 3"]}}
+""", budgets={'description': 500})
+
+prompts.register('claim_batch', """
+    Analyze each of these insurance claims independently and respond with ONLY a JSON object. No other text.
+    Claims:
+    {claims}
+    Return {{"results": [...]}} with exactly one entry per claim, in the same order, each shaped like:
+    {{"index": <claim number from the list above>,
+    "validation": {{"status": "Valid|Invalid|Pending", "completeness": "Complete|Incomplete|Partial", "issues": []}},
+    "coverageCheck": {{"policyCoverage": "Covered|Not Covered|Partially Covered", "medicalNecessity": "Medically Necessary|Not Medically Necessary|Under Review", "coverageDecision": "Approved|Denied|Pending Review"}},
+    "fraudRiskAssessment": {{"riskLevel": "Low|Medium|High", "riskFactors": [], "recommendation": "Approve|Deny|Manual Review Required"}},
+    "nextSteps": ["Next step 1", "Next step 2"]}}
+""")
+
+# Output tokens of one claim_batch result entry, estimated from the entry shape the template asks for
+CLAIM_BATCH_ENTRY_TOKENS = estimate_tokens(prompts.get('claim_batch').text.split('each shaped like:', 1)[1].format())
+
+prompts.register('denial_analysis', """
+    You are a healthcare AI system. You must respond with ONLY a JSON object. No other text, no reasoning, no explanations.
+    Claim ID: {claim_id}
+    Denial Reason: {reason}
+    {{"rootCauseAnalysis": "Claim denied due to missing documentation",
+    "requiredDocumentation": ["Medical records", "Insurance verification", "Provider authorization"],
+    "resolutionSteps": ["Gather required documents", "Resubmit claim with documentation", "Follow up with insurance provider"],
+    "successLikelihood": "High",
+    "alternativeOptions": ["Appeal the denial", "Contact provider for assistance", "Submit partial claim"],
+    "priority": "High"}}
+""", budgets={'reason': 300})
+
+prompts.register('claim_suggestions', """
+    Analyze this insurance claim and provide improvement suggestions. Respond with ONLY a JSON object. No other text.
+    Claim Details:
+    - ID: {claim_id}
+    - Amount: ${claim_amount}
+    - Type: {claim_type}
+    - Description: {description}
+    - Status: {status}
+    - Approval Required: {approval_required}
+    Current AI Analysis:
+    {analysis}
+    Based on the claim data and analysis, return this JSON structure with appropriate values:
+    {{"root_cause": "Brief explanation of why the claim needs improvement",
+    "suggestions": ["Specific suggestion 1 with actionable steps", "Specific suggestion 2 with actionable steps", "Specific suggestion 3 with actionable steps"],
+    "priority": "High|Medium|Low",
+    "estimated_impact": "Brief description of expected improvement"}}
+""", budgets={'description': 500, 'analysis': 800})
+
+prompts.register('chatbot', """
+    You are an AI healthcare assistant for the Madza AI Healthcare Platform. Respond to user queries about the platform, healthcare processes, and general questions. Be helpful, professional, and informative.
+    User Query: {message}
+    Based on the query, provide a helpful response and relevant suggestions. Respond with ONLY a JSON object in this format:
+    {{"response": "Your helpful response to the user's query",
+    "suggestions": ["Relevant suggestion 1", "Relevant suggestion 2", "Relevant suggestion 3"],
+    "actionData": {{"type": "none|patient_registration|claim_processing|system_info", "data": {{}}}}}}
+    Common topics you can help with:
+    - Patient registration process and requirements
+    - Claim processing and AI analysis
+    - System features and capabilities
+    - Healthcare platform navigation
+    - Technical support and troubleshooting
+    - General healthcare information
+    Keep responses concise but informative. Provide 2-4 relevant suggestions for follow-up questions.
+""", budgets={'message': 500})
+
+prompts.register('eob_generation', """
+    Generate a realistic Explanation of Benefits (EOB) for this healthcare claim. Respond with ONLY a JSON object.
+    Claim Details:
+    - ID: {claim_id}
+    - Patient ID: {patient_id}
+    - Amount: ${claim_amount}
+    - Type: {claim_type}
+    - Description: {description}
+    - Status: {status}
+    Generate a realistic EOB with the following structure:
+    {{"eob_amount": <amount insurance will pay - can be full, partial, or 0>,
+    "status": "approved|denied|partial",
+    "eob_date": "YYYY-MM-DD",
+    "insurance_company": "Realistic insurance company name",
+    "pdf_url": "GENERATE_PDF_URL",
+    "ai_analysis": {{"summary": "Brief summary of EOB decision", "coverage_details": "Details about what was covered", "deductible_applied": <amount>, "copay_applied": <amount>, "coinsurance_applied": <amount>}},
+    "denial_reasons": [<array of denial reasons if status is denied>],
+    "refile_required": <true if denied and refile is recommended>}}
+    Make it realistic - sometimes approve, sometimes deny, sometimes partial payment.
+""", budgets={'description': 500})
+
+prompts.register('eob_analysis', """
+    Analyze this Explanation of Benefits (EOB) and provide detailed analysis. Respond with ONLY a JSON object.
+    EOB Details:
+    - ID: {eob_id}
+    - Claim Amount: ${claim_amount}
+    - EOB Amount: ${eob_amount}
+    - Status: {status}
+    - Insurance: {insurance_company}
+    - Date: {eob_date}
+    Provide analysis in this format:
+    {{"summary": "Overall analysis summary",
+    "coverage_analysis": "Detailed coverage analysis",
+    "denial_reasons": [<array of specific denial reasons if applicable>],
+    "recommendations": [<array of actionable recommendations>],
+    "refile_required": <true/false>,
+    "refile_priority": "high|medium|low",
+    "next_steps": [<array of recommended next steps>],
+    "confidence_score": <0-100>}}
+""")
+
+prompts.register('claim_refile', """
+    Generate a claim refile recommendation based on EOB analysis. Respond with ONLY a JSON object.
+    EOB Details:
+    - Status: {status}
+    - Denial Reasons: {denial_reasons}
+    - EOB Amount: ${eob_amount}
+    - Insurance: {insurance_company}
+    - Refile Reason: {reason}
+    Provide refile recommendation:
+    {{"refile_justification": "Why this claim should be refiled",
+    "required_documents": [<array of documents needed>],
+    "modifications_needed": [<array of claim modifications>],
+    "priority": "high|medium|low",
+    "estimated_success": <0-100>,
+    "timeline": "Expected processing time",
+    "next_steps": [<array of specific next steps>]}}
+""", budgets={'denial_reasons': 300, 'reason': 300})
@@ -0,0 +1,216 @@
+"""
+Madza AI Healthcare Platform - Read Replica Routing
+Copyright (c) 2025 Madza AI Healthcare Platform. All rights reserved.
+
+PROPRIETARY SOFTWARE - UNAUTHORIZED USE PROHIBITED
+This file contains the routing that sends dashboard and list reads to a read
+replica (DATABASE_REPLICA_URL) so they stop competing with claim intake on the
+primary. Views opt in with @replica_router.route_reads. Reads fall back to the
+primary when the replica is unreachable or lags more than the staleness bound,
+after the session has written, and for a short sticky window after a client's
+write (a cookie), so clients read their own writes. A view whose replica read
+fails is run once more against the primary.
+
+For licensing information, contact: arpanchowdhury2025@gmail.com
+"""
+
+import os
+import threading
+import time
+from functools import wraps
+from typing import Any, Dict, Optional
+
+from flask import has_app_context, request
+from flask_sqlalchemy.session import Session
+from sqlalchemy import event, exc, text
+
+REPLICA_BIND = 'replica'
+STICKY_COOKIE = 'db_primary_until'
+
+# session.info keys
+READ_REPLICA = 'read_replica'
+WROTE = 'wrote'
+REPLICA_USED = 'replica_used'
+REPLICA_FAILED = 'replica_failed'
+
+# Replication delay in seconds; 0 when the replica has replayed everything it received
+POSTGRES_LAG_SQL = """
+SELECT CASE
+    WHEN NOT pg_is_in_recovery() OR pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+    ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+END
+"""
+
+
+class ReplicaRouter:
+    """Decides per read whether the replica may serve it"""
+
+    def __init__(self, max_lag_seconds: float = 5.0, sticky_seconds: float = 10.0,
+                 check_interval_seconds: float = 5.0, retry_seconds: float = 30.0):
+        self.max_lag_seconds = max_lag_seconds
+        self.sticky_seconds = sticky_seconds
+        self.check_interval_seconds = check_interval_seconds
+        self.retry_seconds = retry_seconds
+        self.engine = None
+        self._session = None
+        self._lock = threading.Lock()
+        self._checked_at = None
+        self._usable = False
+        self._down_until = 0.0
+        self._lag_seconds = None
+        self._stats = {'replica_reads': 0, 'primary_fallbacks': 0, 'failures': 0, 'primary_retries': 0}
+
+    @classmethod
+    def from_env(cls) -> 'ReplicaRouter':
+        return cls(
+            max_lag_seconds=float(os.getenv('DB_REPLICA_MAX_LAG_SECONDS', '5')),
+            sticky_seconds=float(os.getenv('DB_REPLICA_STICKY_SECONDS', '10')),
+            check_interval_seconds=float(os.getenv('DB_REPLICA_CHECK_INTERVAL_SECONDS', '5')),
+            retry_seconds=float(os.getenv('DB_REPLICA_RETRY_SECONDS', '30'))
+        )
+
+    def init_app(self, app, engine, session):
+        """Route opted-in reads to engine; session is the app's scoped session"""
+        self.engine = engine
+        self._session = session
+        self._checked_at = None
+        self._down_until = 0.0
+        event.listen(engine, 'handle_error', self._on_error)
+        app.after_request(self._set_sticky_cookie)
+
+    def route_reads(self, view):
+        """Let the replica serve this view's reads, unless the client wrote within the sticky window
+
+        Views usually turn exceptions into a 500 response themselves, so a
+        failed replica read is detected from the session rather than from the
+        view raising, and the view is then run once more on the primary.
+        """
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            if self.engine is None or self._sticky():
+                return view(*args, **kwargs)
+            info = self._session.info
+            info[READ_REPLICA] = True
+            try:
+                response = view(*args, **kwargs)
+            except exc.OperationalError:
+                if not info.get(REPLICA_FAILED):
+                    raise
+                response = None
+            if not info.get(REPLICA_FAILED):
+                return response
+            self._stats['primary_retries'] += 1
+            print(f"Read replica failed during {view.__name__}, retrying on primary")
+            self._session.rollback()
+            for key in (READ_REPLICA, REPLICA_USED, REPLICA_FAILED):
+                info.pop(key, None)
+            return view(*args, **kwargs)
+        return wrapper
+
+    def read_engine(self) -> Optional[Any]:
+        """The replica engine if it is reachable and within the staleness bound, else None"""
+        if self.engine is None:
+            return None
+        now = time.monotonic()
+        if now < self._down_until:
+            self._stats['primary_fallbacks'] += 1
+            return None
+        if self._checked_at is None or now - self._checked_at >= self.check_interval_seconds:
+            with self._lock:
+                if self._checked_at is None or now - self._checked_at >= self.check_interval_seconds:
+                    self._check(now)
+        if not self._usable:
+            self._stats['primary_fallbacks'] += 1
+            return None
+        self._stats['replica_reads'] += 1
+        return self.engine
+
+    def lag_seconds(self, connection) -> float:
+        """How far the replica is behind the primary (SQLite copies report 0)"""
+        if connection.dialect.name == 'postgresql':
+            return float(connection.execute(text(POSTGRES_LAG_SQL)).scalar() or 0)
+        connection.execute(text('SELECT 1'))
+        return 0.0
+
+    def _check(self, now: float):
+        try:
+            with self.engine.connect() as connection:
+                self._lag_seconds = self.lag_seconds(connection)
+        except Exception as e:
+            self.mark_down(e)
+            return
+        finally:
+            self._checked_at = now
+        usable = self._lag_seconds <= self.max_lag_seconds
+        if usable != self._usable:
+            state = 'in use' if usable else 'too far behind, reading from primary'
+            print(f"Read replica {state} (lag {self._lag_seconds:.1f}s, bound {self.max_lag_seconds}s)")
+        self._usable = usable
+
+    def mark_down(self, error: Exception):
+        """Send reads to the primary for retry_seconds"""
+        self._stats['failures'] += 1
+        self._usable = False
+        self._down_until = time.monotonic() + self.retry_seconds
+        print(f"Read replica unavailable, reading from primary for {self.retry_seconds}s: {error}")
+
+    def _on_error(self, context):
+        if context.is_disconnect or isinstance(context.original_exception, exc.OperationalError) \
+                or isinstance(context.sqlalchemy_exception, exc.OperationalError):
+            self.mark_down(context.original_exception)
+            # Only reads the session already sent to the replica need a retry; failed health checks fall back
+            if has_app_context() and self._session.info.get(REPLICA_USED):
+                self._session.info[REPLICA_FAILED] = True
+
+    def _sticky(self) -> bool:
+        try:
+            return float(request.cookies.get(STICKY_COOKIE, 0)) > time.time()
+        except ValueError:
+            return False
+
+    def _set_sticky_cookie(self, response):
+        if self._session.info.get(WROTE):
+            until = time.time() + self.sticky_seconds
+            response.set_cookie(STICKY_COOKIE, f'{until:.3f}', max_age=int(self.sticky_seconds) + 1,
+                                httponly=True, samesite='Lax')
+        return response
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            'configured': self.engine is not None,
+            'usable': self.engine is not None and self._usable and time.monotonic() >= self._down_until,
+            'lag_seconds': self._lag_seconds,
+            'max_lag_seconds': self.max_lag_seconds,
+            **self._stats
+        }
+
+
+replica_router = ReplicaRouter.from_env()
+
+
+class RoutingSession(Session):
+    """Session that sends reads to the replica while routing is enabled for it
+
+    Flushes and DML statements always use the primary, and once the session
+    has written, so do all of its later reads.
+    """
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and self.info.get(READ_REPLICA) and not self.info.get(WROTE) and not self._flushing:
+            engine = replica_router.read_engine()
+            if engine is not None:
+                self.info[REPLICA_USED] = True
+                return engine
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+@event.listens_for(RoutingSession, 'after_flush')
+def _mark_written(session, flush_context):
+    session.info[WROTE] = True
+
+
+@event.listens_for(RoutingSession, 'do_orm_execute')
+def _mark_statement_written(orm_execute_state):
+    # Bulk and Core DML run through session.execute without a flush
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        orm_execute_state.session.info[WROTE] = True
@@ -0,0 +1,374 @@
+"""
+Madza AI Healthcare Platform - Resilience Layer
+Copyright (c) 2025 Madza AI Healthcare Platform. All rights reserved.
+
+PROPRIETARY SOFTWARE - UNAUTHORIZED USE PROHIBITED
+This file contains the retry policy and circuit breakers shared by the Bedrock
+and Lambda AI integrations. Throttling errors are retried with exponential
+backoff and full jitter; each endpoint has a breaker that fails fast to the
+existing fallbacks while the dependency is unhealthy. Slow calls can be hedged
+with a secondary path once they pass a latency percentile.
+
+For licensing information, contact: arpanchowdhury2025@gmail.com
+"""
+
+import os
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError, wait, FIRST_COMPLETED
+from datetime import datetime
+from typing import Dict, Any, Callable, Optional
+
+import requests
+from botocore.exceptions import ClientError, HTTPClientError
+
+THROTTLING_ERROR_CODES = {
+    'ThrottlingException',
+    'TooManyRequestsException',
+    'ServiceUnavailableException',
+    'ModelNotReadyException',
+    'RequestLimitExceeded',
+    'ServiceQuotaExceededException'
+}
+
+
+class CircuitOpenError(Exception):
+    """Raised when a call is rejected because its circuit breaker is open"""
+
+
+class RetryableHTTPError(Exception):
+    """Raised for non-200 HTTP responses; only 429/503 are actually retried"""
+
+    def __init__(self, status_code: int):
+        super().__init__(f'HTTP {status_code}')
+        self.status_code = status_code
+
+
+def is_throttling_error(error: Exception) -> bool:
+    """Whether an error means the dependency is throttling or briefly unavailable
+
+    Connection failures are not throttling: a wrong URL or a DNS failure will not
+    fix itself within the backoff, so they fail through to the fallbacks at once.
+    """
+    if isinstance(error, ClientError):
+        return error.response.get('Error', {}).get('Code') in THROTTLING_ERROR_CODES
+    if isinstance(error, RetryableHTTPError):
+        return error.status_code in (429, 503)
+    return False
+
+
+def is_dependency_failure(error: Exception) -> bool:
+    """Whether an error says the dependency itself is unhealthy (counts against its breaker)
+
+    Transport failures, 5xx responses and throttling count. Errors the dependency
+    answered with on purpose, such as a ValidationException or AccessDenied for a
+    bad request, say nothing about its health and do not.
+    """
+    if is_throttling_error(error):
+        return True
+    if isinstance(error, ClientError):
+        return error.response.get('ResponseMetadata', {}).get('HTTPStatusCode', 0) >= 500
+    if isinstance(error, RetryableHTTPError):
+        return error.status_code >= 500
+    return isinstance(error, (
+        requests.exceptions.ConnectionError,
+        requests.exceptions.Timeout,
+        HTTPClientError
+    ))
+
+
+class RetryPolicy:
+    """Exponential backoff with full jitter for throttling errors"""
+
+    def __init__(self, max_attempts: int = 3, base_delay: float = 0.5, max_delay: float = 8.0,
+                 retry_on: Callable[[Exception], bool] = is_throttling_error):
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.retry_on = retry_on
+
+    @classmethod
+    def from_env(cls) -> 'RetryPolicy':
+        """Create a policy configured from AI_RETRY_* environment variables"""
+        return cls(
+            max_attempts=int(os.getenv('AI_RETRY_MAX_ATTEMPTS', '3')),
+            base_delay=float(os.getenv('AI_RETRY_BASE_DELAY', '0.5')),
+            max_delay=float(os.getenv('AI_RETRY_MAX_DELAY', '8.0'))
+        )
+
+    def backoff(self, attempt: int) -> float:
+        """Delay before the given retry attempt (1-based)"""
+        return random.uniform(0, min(self.max_delay, self.base_delay * (2 ** (attempt - 1))))
+
+
+class CircuitBreaker:
+    """Closed/open/half-open breaker for one remote endpoint"""
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, name: str, failure_threshold: int = 5, recovery_timeout: float = 30.0,
+                 on_state_change: Optional[Callable[[str, str, str], None]] = None):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.on_state_change = on_state_change
+        self.state = self.CLOSED
+        self.consecutive_failures = 0
+        self.opened_at = 0.0
+        self._half_open_probe = False
+        self._lock = threading.Lock()
+        self._stats = {'successes': 0, 'failures': 0, 'rejected': 0}
+
+    def allow_request(self) -> bool:
+        """Whether a call may proceed; moves open -> half_open once the cool-down elapses"""
+        with self._lock:
+            if self.state == self.OPEN:
+                if time.monotonic() - self.opened_at < self.recovery_timeout:
+                    self._stats['rejected'] += 1
+                    return False
+                self._transition(self.HALF_OPEN)
+            if self.state == self.HALF_OPEN:
+                # Only one probe call at a time while half open
+                if self._half_open_probe:
+                    self._stats['rejected'] += 1
+                    return False
+                self._half_open_probe = True
+            return True
+
+    def record_success(self):
+        with self._lock:
+            self._stats['successes'] += 1
+            self.consecutive_failures = 0
+            self._half_open_probe = False
+            if self.state != self.CLOSED:
+                self._transition(self.CLOSED)
+
+    def record_failure(self):
+        with self._lock:
+            self._stats['failures'] += 1
+            self.consecutive_failures += 1
+            self._half_open_probe = False
+            if self.state == self.HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+                self.opened_at = time.monotonic()
+                if self.state != self.OPEN:
+                    self._transition(self.OPEN)
+
+    def record_ignored(self):
+        """A call ended with an error that says nothing about the endpoint's health"""
+        with self._lock:
+            self._half_open_probe = False
+
+    def _transition(self, new_state: str):
+        """Change state (lock held) and report it"""
+        old_state = self.state
+        self.state = new_state
+        if self.on_state_change:
+            self.on_state_change(self.name, old_state, new_state)
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self._stats)
+            stats['state'] = self.state
+            stats['consecutive_failures'] = self.consecutive_failures
+        return stats
+
+
+class ResilienceRegistry:
+    """Shared retry policy, per-endpoint breakers and state-change metrics"""
+
+    def __init__(self, retry_policy: Optional[RetryPolicy] = None, failure_threshold: int = 5,
+                 recovery_timeout: float = 30.0, sleep: Callable[[float], None] = time.sleep,
+                 counts_as_failure: Callable[[Exception], bool] = is_dependency_failure):
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.counts_as_failure = counts_as_failure
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.sleep = sleep
+        self._breakers = {}
+        self._lock = threading.Lock()
+        self._state_changes = []  # most recent state-change events
+        self._counters = {'calls': 0, 'retries': 0, 'short_circuited': 0, 'state_changes': 0}
+
+    @classmethod
+    def from_env(cls) -> 'ResilienceRegistry':
+        """Create a registry configured from AI_RETRY_* and AI_BREAKER_* environment variables"""
+        return cls(
+            retry_policy=RetryPolicy.from_env(),
+            failure_threshold=int(os.getenv('AI_BREAKER_FAILURE_THRESHOLD', '5')),
+            recovery_timeout=float(os.getenv('AI_BREAKER_RECOVERY_SECONDS', '30'))
+        )
+
+    def breaker(self, name: str) -> CircuitBreaker:
+        """Get (or create) the breaker for an endpoint"""
+        with self._lock:
+            breaker = self._breakers.get(name)
+            if breaker is None:
+                breaker = CircuitBreaker(
+                    name,
+                    failure_threshold=self.failure_threshold,
+                    recovery_timeout=self.recovery_timeout,
+                    on_state_change=self._record_state_change
+                )
+                self._breakers[name] = breaker
+            return breaker
+
+    def call(self, endpoint: str, fn: Callable, *args, **kwargs):
+        """Run fn through the endpoint's breaker, retrying throttling errors with backoff
+
+        Raises CircuitOpenError without calling fn while the breaker is open.
+        """
+        breaker = self.breaker(endpoint)
+        policy = self.retry_policy
+        with self._lock:
+            self._counters['calls'] += 1
+
+        attempt = 1
+        while True:
+            if not breaker.allow_request():
+                with self._lock:
+                    self._counters['short_circuited'] += 1
+                raise CircuitOpenError(f'Circuit breaker open for {endpoint}')
+            try:
+                result = fn(*args, **kwargs)
+            except Exception as e:
+                if self.counts_as_failure(e):
+                    breaker.record_failure()
+                else:
+                    breaker.record_ignored()
+                if attempt >= policy.max_attempts or not policy.retry_on(e):
+                    raise
+                with self._lock:
+                    self._counters['retries'] += 1
+                self.sleep(policy.backoff(attempt))
+                attempt += 1
+                continue
+            breaker.record_success()
+            return result
+
+    def _record_state_change(self, name: str, old_state: str, new_state: str):
+        event = {
+            'endpoint': name,
+            'from': old_state,
+            'to': new_state,
+            'timestamp': datetime.utcnow().isoformat()
+        }
+        print(f"Circuit breaker {name}: {old_state} -> {new_state}")
+        with self._lock:
+            self._counters['state_changes'] += 1
+            self._state_changes.append(event)
+            del self._state_changes[:-50]
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get call counters, breaker states and recent state changes"""
+        with self._lock:
+            breakers = list(self._breakers.values())
+            stats = dict(self._counters)
+            stats['recent_state_changes'] = list(self._state_changes)
+        stats['breakers'] = {b.name: b.get_stats() for b in breakers}
+        return stats
+
+
+class LatencyHedge:
+    """Starts a secondary call once the primary runs past a latency percentile
+
+    Calls run on small dedicated pools so hedging never waits on the AI executor
+    that may be running the caller. Primaries and hedges have separate pools, so
+    a hedge never queues behind the slow primaries it is meant to race. The
+    losing call is not cancelled; it finishes in the background and its result
+    is dropped.
+    """
+
+    def __init__(self, enabled: bool = False, percentile: float = 95.0, initial_delay: float = 2.0,
+                 min_samples: int = 20, window: int = 200, max_workers: int = 8):
+        self.enabled = enabled
+        self.percentile = percentile
+        self.initial_delay = initial_delay
+        self.min_samples = min_samples
+        self._latencies = deque(maxlen=window)
+        self._primary_pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='ai-hedge-primary')
+        self._hedge_pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='ai-hedge')
+        self._lock = threading.Lock()
+        self._stats = {'calls': 0, 'hedged': 0, 'primary_wins': 0, 'hedge_wins': 0}
+
+    @classmethod
+    def from_env(cls) -> 'LatencyHedge':
+        """Create a hedge configured from AI_LAMBDA_HEDGE_* environment variables"""
+        return cls(
+            enabled=os.getenv('AI_LAMBDA_HEDGE_ENABLED', 'false').lower() in ('1', 'true', 'yes'),
+            percentile=float(os.getenv('AI_LAMBDA_HEDGE_PERCENTILE', '95')),
+            initial_delay=float(os.getenv('AI_LAMBDA_HEDGE_DELAY', '2.0')),
+            max_workers=int(os.getenv('AI_LAMBDA_HEDGE_WORKERS', '8'))
+        )
+
+    def delay(self) -> float:
+        """Seconds to wait on the primary before hedging"""
+        with self._lock:
+            latencies = sorted(self._latencies)
+        if len(latencies) < self.min_samples:
+            return self.initial_delay
+        index = min(len(latencies) - 1, int(round(self.percentile / 100 * (len(latencies) - 1))))
+        return latencies[index]
+
+    def run(self, primary: Callable, hedge: Callable, accept: Callable[[Any], bool] = lambda result: True):
+        """Return (result, 'primary' | 'hedge') from whichever call finishes first
+
+        A hedge result only wins if accept() approves it; otherwise the primary is
+        awaited. If the primary fails before the hedge delay, its exception is
+        raised so the caller's own fallback runs.
+        """
+        with self._lock:
+            self._stats['calls'] += 1
+        primary_future = self._primary_pool.submit(self._timed, primary)
+        try:
+            return self._win(primary_future.result(timeout=self.delay()), 'primary')
+        except FutureTimeoutError:
+            pass
+
+        with self._lock:
+            self._stats['hedged'] += 1
+        hedge_future = self._hedge_pool.submit(hedge)
+        sources = {primary_future: 'primary', hedge_future: 'hedge'}
+        pending = set(sources)
+        rejected_hedge = None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is not None:
+                    continue
+                if sources[future] == 'primary' or accept(future.result()):
+                    return self._win(future.result(), sources[future])
+                rejected_hedge = future.result()
+        if rejected_hedge is not None:
+            return self._win(rejected_hedge, 'hedge')
+        raise primary_future.exception()
+
+    def _timed(self, fn: Callable):
+        started = time.monotonic()
+        result = fn()
+        with self._lock:
+            self._latencies.append(time.monotonic() - started)
+        return result
+
+    def _win(self, result, source: str):
+        with self._lock:
+            self._stats[f'{source}_wins'] += 1
+        return result, source
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self._stats)
+            stats['samples'] = len(self._latencies)
+        stats['enabled'] = self.enabled
+        stats['delay_seconds'] = round(self.delay(), 3)
+        return stats
+
+
+# Shared process-wide registry so breaker state is common to every service instance
+resilience = ResilienceRegistry.from_env()
+
+# Shared hedge for the Lambda HTTP path so its latency samples cover every caller
+lambda_hedge = LatencyHedge.from_env()
@@ -0,0 +1,126 @@
+"""
+Madza AI Healthcare Platform - Fast JSON Serialization
+Copyright (c) 2025 Madza AI Healthcare Platform. All rights reserved.
+
+PROPRIETARY SOFTWARE - UNAUTHORIZED USE PROHIBITED
+This file contains the JSON encoder used by the list endpoints' ORM-free read
+path. Rows arrive as column mappings; JSON text columns are spliced into the
+output as stored instead of being decoded and re-encoded. Encoding uses orjson
+when it is installed and falls back to the standard library. Whole lists can be
+encoded incrementally, as a JSON array or NDJSON, for streamed responses.
+
+For licensing information, contact: arpanchowdhury2025@gmail.com
+"""
+
+import json
+import os
+from datetime import date, datetime
+from typing import Any, Callable, Dict, Iterable, Iterator, Mapping, Optional
+
+from flask import Response
+
+try:
+    import orjson
+except ImportError:  # listed in requirements.txt; the stdlib encoder is the fallback
+    orjson = None
+
+
+def _default(value: Any) -> Any:
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    raise TypeError(f'Object of type {type(value).__name__} is not JSON serializable')
+
+
+def _stdlib_dumps(obj: Any) -> bytes:
+    return json.dumps(obj, default=_default, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+
+
+def _orjson_dumps(obj: Any) -> bytes:
+    # orjson writes naive datetimes and dates in the same ISO 8601 form as isoformat()
+    return orjson.dumps(obj, default=_default)
+
+
+# Streamed bodies are written in chunks of about this size rather than one write per row
+STREAM_CHUNK_BYTES = int(os.getenv('API_STREAM_CHUNK_BYTES', str(64 * 1024)))
+
+ENCODERS: Dict[str, Callable[[Any], bytes]] = {'stdlib': _stdlib_dumps}
+if orjson is not None:
+    ENCODERS['orjson'] = _orjson_dumps
+
+
+class JSONSerializer:
+    """Encode response bodies with a pluggable encoder
+
+    encoder is a name from ENCODERS or any callable returning UTF-8 bytes.
+    Unknown or unavailable names fall back to the stdlib encoder.
+    """
+
+    def __init__(self, encoder: Any = 'orjson'):
+        if callable(encoder):
+            self.name, self._dumps = getattr(encoder, '__name__', 'custom'), encoder
+        else:
+            self.name = encoder if encoder in ENCODERS else 'stdlib'
+            self._dumps = ENCODERS[self.name]
+            if self.name != encoder:
+                print(f"JSON encoder '{encoder}' is not available (orjson is in requirements.txt); using stdlib")
+
+    @classmethod
+    def from_env(cls) -> 'JSONSerializer':
+        return cls(os.getenv('API_JSON_ENCODER', 'orjson').lower())
+
+    def dumps(self, obj: Any) -> bytes:
+        return self._dumps(obj)
+
+    def encode_row(self, row: Mapping[str, Any], raw_fields: Optional[Dict[str, str]] = None) -> bytes:
+        """Encode one row; raw_fields maps JSON text columns to the literal used when NULL"""
+        raw_fields = raw_fields or {}
+        body = self._dumps({key: value for key, value in row.items() if key not in raw_fields})
+        spliced = [
+            b'"' + name.encode('utf-8') + b'":' + (row[name] or default).encode('utf-8')
+            for name, default in raw_fields.items() if name in row
+        ]
+        if not spliced:
+            return body
+        separator = b',' if len(body) > 2 else b''
+        return body[:-1] + separator + b','.join(spliced) + b'}'
+
+    def encode_rows(self, rows: Iterable[Mapping[str, Any]], raw_fields: Optional[Dict[str, str]] = None) -> bytes:
+        """Encode rows as a JSON array"""
+        return b'[' + b','.join(self.encode_row(row, raw_fields) for row in rows) + b']'
+
+    def iter_array(self, rows: Iterable[Mapping[str, Any]], raw_fields: Optional[Dict[str, str]] = None,
+                   prefix: bytes = b'[', suffix: bytes = b']') -> Iterator[bytes]:
+        """Encode rows as a JSON array one chunk at a time; prefix/suffix wrap it in an envelope"""
+        def pieces():
+            yield prefix
+            for index, row in enumerate(rows):
+                yield (b',' if index else b'') + self.encode_row(row, raw_fields)
+            yield suffix
+        return _chunked(pieces())
+
+    def iter_ndjson(self, rows: Iterable[Mapping[str, Any]],
+                    raw_fields: Optional[Dict[str, str]] = None) -> Iterator[bytes]:
+        """Encode rows as newline-delimited JSON one chunk at a time"""
+        return _chunked(self.encode_row(row, raw_fields) + b'\n' for row in rows)
+
+    def response(self, body: Any, status: int = 200, headers: Optional[Dict[str, str]] = None,
+                 mimetype: str = 'application/json') -> Response:
+        """Response for an encoded body, or for an iterator of chunks to stream"""
+        return Response(body, status=status, headers=headers, mimetype=mimetype)
+
+
+def _chunked(pieces: Iterable[bytes], chunk_bytes: Optional[int] = None) -> Iterator[bytes]:
+    chunk_bytes = chunk_bytes or STREAM_CHUNK_BYTES
+    buffer, size = [], 0
+    for piece in pieces:
+        buffer.append(piece)
+        size += len(piece)
+        if size >= chunk_bytes:
+            yield b''.join(buffer)
+            buffer, size = [], 0
+    if buffer:
+        yield b''.join(buffer)
+
+
+# Shared serializer used by the list endpoints
+json_serializer = JSONSerializer.from_env()
@@ -0,0 +1,67 @@
+"""
+Madza AI Healthcare Platform - Single-Flight Request Coalescing
+Copyright (c) 2025 Madza AI Healthcare Platform. All rights reserved.
+
+PROPRIETARY SOFTWARE - UNAUTHORIZED USE PROHIBITED
+This file contains the single-flight layer for AI calls. When identical requests
+arrive while one is already in flight, the later callers wait for that call
+instead of starting their own, and all of them receive its result or error.
+
+For licensing information, contact: arpanchowdhury2025@gmail.com
+"""
+
+import threading
+from concurrent.futures import Future
+from typing import Dict, Any, Callable
+
+
+class SingleFlight:
+    """Coalesces concurrent calls that share a key into one execution"""
+
+    def __init__(self):
+        self._calls = {}
+        self._lock = threading.Lock()
+        self._stats = {'calls': 0, 'executed': 0, 'coalesced': 0}
+
+    def do(self, key: str, fn: Callable, *args, **kwargs):
+        """Run fn for key, or wait for the call already in flight for key
+
+        The result object is shared between callers; copy it before mutating.
+        """
+        with self._lock:
+            self._stats['calls'] += 1
+            future = self._calls.get(key)
+            leader = future is None
+            if leader:
+                future = Future()
+                self._calls[key] = future
+                self._stats['executed'] += 1
+            else:
+                self._stats['coalesced'] += 1
+
+        if not leader:
+            return future.result()
+
+        try:
+            result = fn(*args, **kwargs)
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            # Later arrivals start a fresh call; only overlapping ones share this result
+            with self._lock:
+                del self._calls[key]
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self._stats)
+            stats['in_flight'] = len(self._calls)
+        stats['coalesce_rate'] = round((stats['coalesced'] / stats['calls']) * 100, 1) if stats['calls'] else 0
+        return stats
+
+
+# Shared process-wide instance so coalescing spans every request thread
+singleflight = SingleFlight()
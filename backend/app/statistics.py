@@ -0,0 +1,194 @@
+"""
+Madza AI Healthcare Platform - Platform Statistics
+Copyright (c) 2025 Madza AI Healthcare Platform. All rights reserved.
+
+PROPRIETARY SOFTWARE - UNAUTHORIZED USE PROHIBITED
+This file contains the running counters behind the observability metrics.
+Every flush that creates, changes or deletes a patient or claim adds the
+difference it makes to the platform_statistics rows in the same transaction,
+so the metrics endpoint reads a handful of rows instead of scanning claims.
+rebuild() recomputes every counter from the source tables
+(`flask stats rebuild`).
+
+For licensing information, contact: arpanchowdhury2025@gmail.com
+"""
+
+from collections import Counter
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import and_, event, func, inspect, select
+from sqlalchemy.dialects import postgresql, sqlite
+
+from .database import db
+from .models import Patient, Claim, ArchivedClaim, PlatformStatistic
+
+PATIENTS_TOTAL = 'patients_total'
+CLAIMS_TOTAL = 'claims_total'
+CLAIMS_STATUS_PREFIX = 'claims_status:'
+APPROVED_TIMED = 'approved_processing_count'
+APPROVED_SECONDS = 'approved_processing_seconds'
+AI_PARSED = 'ai_parsed_total'
+AI_PARSE_SUCCESS = 'ai_parse_success_total'
+
+# Claim attributes the counters depend on (declared with active_history on the model)
+CLAIM_FIELDS = ('status', 'created_at', 'approved_at', 'ai_parse_success')
+
+# Rows read per batch when rebuild sums processing times
+REBUILD_BATCH_SIZE = 5000
+
+
+def claim_contribution(status: Optional[str], created_at: Optional[datetime], approved_at: Optional[datetime],
+                       ai_parse_success: Optional[bool]) -> Counter:
+    """What one claim in the given state adds to the counters"""
+    stats = Counter({CLAIMS_TOTAL: 1, CLAIMS_STATUS_PREFIX + str(status): 1})
+    if status == 'approved' and created_at and approved_at:
+        stats[APPROVED_TIMED] += 1
+        stats[APPROVED_SECONDS] += (approved_at - created_at).total_seconds()
+    # ai_parse_success is NULL exactly when a claim has no AI analysis
+    if ai_parse_success is not None:
+        stats[AI_PARSED] += 1
+        stats[AI_PARSE_SUCCESS] += 1 if ai_parse_success else 0
+    return stats
+
+
+def committed_value(instance, key):
+    """Attribute value as loaded from the database, before any pending change
+
+    Attributes the instance was loaded without (load_only, deferred) cannot
+    have changed, so they are loaded here and read as unchanged rather than
+    as missing.
+    """
+    history = db.inspect(instance).attrs[key].load_history()
+    if history.deleted:
+        return history.deleted[0]
+    if history.unchanged:
+        return history.unchanged[0]
+    return None
+
+
+def _subtract(total: Counter, stats: Counter):
+    for name, value in stats.items():
+        total[name] -= value
+
+
+def deleted_deltas(session) -> Counter:
+    """Counter changes for objects about to be deleted; read before the flush while their rows still exist"""
+    deltas = Counter()
+    for instance in session.deleted:
+        if isinstance(instance, Patient):
+            deltas[PATIENTS_TOTAL] -= 1
+        elif isinstance(instance, Claim):
+            _subtract(deltas, claim_contribution(*(getattr(instance, key) for key in CLAIM_FIELDS)))
+    return deltas
+
+
+def flushed_deltas(session) -> Counter:
+    """Counter changes for new and changed objects; read after the flush, once column defaults are set"""
+    deltas = Counter()
+    for instance in session.new:
+        if isinstance(instance, Patient):
+            deltas[PATIENTS_TOTAL] += 1
+        elif isinstance(instance, Claim):
+            deltas.update(claim_contribution(*(getattr(instance, key) for key in CLAIM_FIELDS)))
+    for instance in session.dirty:
+        if isinstance(instance, Claim) and instance not in session.deleted:
+            before = claim_contribution(*(committed_value(instance, key) for key in CLAIM_FIELDS))
+            after = claim_contribution(*(getattr(instance, key) for key in CLAIM_FIELDS))
+            if before != after:
+                deltas.update(after)
+                _subtract(deltas, before)
+    return deltas
+
+
+def upsert_increment(connection, table, keys: Tuple[str, ...], rows: List[Dict[str, Any]]):
+    """Add each row's value to the row with the same keys, inserting it when missing
+
+    One atomic upsert on SQLite and Postgres; other databases update, then
+    insert when nothing matched.
+    """
+    dialect = connection.dialect.name
+    if dialect in ('sqlite', 'postgresql'):
+        insert = sqlite.insert if dialect == 'sqlite' else postgresql.insert
+        statement = insert(table)
+        statement = statement.on_conflict_do_update(
+            index_elements=[table.c[key] for key in keys],
+            set_={'value': table.c.value + statement.excluded.value,
+                  **{name: statement.excluded[name] for name in rows[0] if name not in keys and name != 'value'}}
+        )
+        connection.execute(statement, rows)
+        return
+    for row in rows:
+        match = and_(*(table.c[key] == row[key] for key in keys))
+        values = {name: value for name, value in row.items() if name not in keys}
+        values['value'] = table.c.value + row['value']
+        if connection.execute(table.update().where(match).values(**values)).rowcount == 0:
+            connection.execute(table.insert().values(**row))
+
+
+def apply_deltas(connection, deltas: Dict[str, float]):
+    """Add deltas to the counters with one atomic upsert per counter"""
+    if not deltas:
+        return
+    now = datetime.utcnow()
+    # Sorted so concurrent transactions lock counter rows in the same order
+    rows = [{'name': name, 'value': deltas[name], 'updated_at': now} for name in sorted(deltas)]
+    upsert_increment(connection, PlatformStatistic.__table__, ('name',), rows)
+
+
+@event.listens_for(db.session, 'before_flush')
+def _track_deletes(session, flush_context, instances):
+    session.info['statistics_deltas'] = deleted_deltas(session)
+
+
+@event.listens_for(db.session, 'after_flush')
+def _apply_flush(session, flush_context):
+    # session.new/dirty/deleted and attribute history still show the pre-flush state here. The
+    # counters are written on the flush's own connection, so they commit or roll back with the rows.
+    deltas = session.info.pop('statistics_deltas', Counter())
+    deltas.update(flushed_deltas(session))
+    apply_deltas(session.connection(), {name: value for name, value in deltas.items() if value})
+
+
+def read_statistics(session=None) -> Dict[str, float]:
+    """Every counter, in one query"""
+    session = session or db.session
+    return dict(session.query(PlatformStatistic.name, PlatformStatistic.value).all())
+
+
+def rebuild(connection) -> Dict[str, float]:
+    """Recompute every counter from the patients, claims and archived_claims tables and replace the stored values"""
+    table = PlatformStatistic.__table__
+    if connection.dialect.name == 'postgresql':
+        # Writers wait for the rebuild, so their deltas land on top of the recomputed values
+        connection.exec_driver_sql('LOCK TABLE platform_statistics IN EXCLUSIVE MODE')
+    # Deleting first takes SQLite's write lock before the source tables are read
+    connection.execute(table.delete())
+
+    stats = Counter({PATIENTS_TOTAL: connection.execute(select(func.count()).select_from(Patient.__table__)).scalar()})
+    # Archived claims keep counting, from the columns their archive index keeps (the table is
+    # missing while migrations older than 0006 run)
+    sources = [Claim.__table__]
+    if inspect(connection).has_table(ArchivedClaim.__tablename__):
+        sources.append(ArchivedClaim.__table__)
+    for claims in sources:
+        for status, count in connection.execute(select(claims.c.status, func.count()).group_by(claims.c.status)):
+            stats[CLAIMS_TOTAL] += count
+            stats[CLAIMS_STATUS_PREFIX + str(status)] += count
+        for parsed, count in connection.execute(
+                select(claims.c.ai_parse_success, func.count())
+                .where(claims.c.ai_parse_success.isnot(None)).group_by(claims.c.ai_parse_success)):
+            stats[AI_PARSED] += count
+            stats[AI_PARSE_SUCCESS] += count if parsed else 0
+        approved = connection.execution_options(yield_per=REBUILD_BATCH_SIZE).execute(
+            select(claims.c.created_at, claims.c.approved_at)
+            .where(claims.c.status == 'approved', claims.c.approved_at.isnot(None), claims.c.created_at.isnot(None)))
+        for created_at, approved_at in approved:
+            stats[APPROVED_TIMED] += 1
+            stats[APPROVED_SECONDS] += (approved_at - created_at).total_seconds()
+
+    now = datetime.utcnow()
+    rows = [{'name': name, 'value': value, 'updated_at': now} for name, value in sorted(stats.items())]
+    if rows:
+        connection.execute(table.insert(), rows)
+    return dict(stats)
@@ -0,0 +1,71 @@
+"""
+Madza AI Healthcare Platform - AI Output Extractor Benchmark
+Copyright (c) 2025 Madza AI Healthcare Platform. All rights reserved.
+
+PROPRIETARY SOFTWARE - UNAUTHORIZED USE PROHIBITED
+This file benchmarks app.ai_extractor against the strip/slice/json.loads parsing
+that was previously copied across the services, on claim analyses with large
+reasoning preambles.
+
+Run from the backend directory: python benchmarks/bench_ai_extractor.py
+
+For licensing information, contact: arpanchowdhury2025@gmail.com
+"""
+
+import json
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from app.ai_extractor import AIExtractor
+
+ANALYSIS = {
+    'claimId': 'CLM-12345678',
+    'validation': {'status': 'Valid', 'completeness': 'Complete', 'issues': []},
+    'coverageCheck': {'policyCoverage': 'Covered', 'medicalNecessity': 'Medically Necessary',
+                      'coverageDecision': 'Approved'},
+    'fraudRiskAssessment': {'riskLevel': 'Low', 'riskFactors': [], 'recommendation': 'Approve'},
+    'nextSteps': ['Notify patient', 'Schedule payment', 'Archive documents']
+}
+
+
+def legacy_parse(response):
+    """The parsing previously repeated in process_claim, update_claim and main.py"""
+    analysis_text = response['analysis']
+    json_string = analysis_text
+    if '<reasoning>' in json_string:
+        reasoning_end = json_string.find('</reasoning>')
+        if reasoning_end != -1:
+            json_string = json_string[reasoning_end + 11:].strip()
+    first_brace = json_string.find('{')
+    last_brace = json_string.rfind('}')
+    if first_brace != -1 and last_brace != -1 and last_brace > first_brace:
+        json_string = json_string[first_brace:last_brace + 1]
+    return json.loads(json_string)
+
+
+def build_response(reasoning_chars):
+    sentence = 'The claim amount is consistent with the procedure code and the policy limits. '
+    reasoning = (sentence * (reasoning_chars // len(sentence) + 1))[:reasoning_chars]
+    return {'analysis': f'<reasoning>{reasoning}</reasoning>\n{json.dumps(ANALYSIS)}', 'status': 'success'}
+
+
+def main():
+    extractor = AIExtractor()
+    print(f"{'reasoning':>12} {'legacy/parse':>13} {'legacy/request':>15} {'extractor':>10} {'speedup':>8}")
+    for reasoning_chars in (1_000, 10_000, 100_000, 1_000_000):
+        response = build_response(reasoning_chars)
+        assert legacy_parse(response) == extractor.extract(response, 'claim_processing')[0] == ANALYSIS
+        number = max(20, 200_000 // reasoning_chars)
+        legacy = min(timeit.repeat(lambda: legacy_parse(response), number=number, repeat=5)) / number
+        single = min(timeit.repeat(lambda: extractor.extract(response, 'claim_processing'),
+                                   number=number, repeat=5)) / number
+        # A denied claim used to be parsed twice per request: for its status, then its denial reason
+        print(f"{reasoning_chars:>12,} {legacy * 1e6:>11.1f}us {legacy * 2e6:>13.1f}us "
+              f"{single * 1e6:>8.1f}us {legacy * 2 / single:>7.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,86 @@
+"""
+Madza AI Healthcare Platform - List Serialization Benchmark
+Copyright (c) 2025 Madza AI Healthcare Platform. All rights reserved.
+
+PROPRIETARY SOFTWARE - UNAUTHORIZED USE PROHIBITED
+This file benchmarks the /api/claims body built from ORM objects with to_dict()
+and Flask's jsonify against the column-tuple path in app.serialization, on an
+in-memory SQLite database of claims carrying realistic AI analysis blobs.
+
+Run from the backend directory: python benchmarks/bench_list_serialization.py [rows]
+
+For licensing information, contact: arpanchowdhury2025@gmail.com
+"""
+
+import json
+import os
+import sys
+import timeit
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from flask import Flask, jsonify
+
+from app.database import db
+from app.models import Claim, Patient
+from app.serialization import ENCODERS, JSONSerializer
+from app.services import ClaimService
+
+ANALYSIS = {
+    'analysis': '<reasoning>' + 'The claim is consistent with the policy. ' * 40 + '</reasoning>' + json.dumps({
+        'validation': {'status': 'Valid', 'issues': []},
+        'coverageCheck': {'coverageDecision': 'Approved'},
+        'fraudRiskAssessment': {'riskLevel': 'Low', 'recommendation': 'Approve'}
+    }),
+    'status': 'success'
+}
+
+
+def load(rows):
+    patient = Patient(first_name='Bench', last_name='Patient', email='b@example.com', phone='1',
+                      date_of_birth='1980-01-01', insurance_id='INS1', insurance_provider='Acme')
+    patient.id = 'patient-1'
+    db.session.add(patient)
+    start = datetime(2025, 1, 1)
+    for i in range(rows):
+        claim = Claim(patient_id='patient-1', claim_amount=100.0 + i % 900, claim_type='routine',
+                      description='Office visit')
+        claim.created_at = claim.updated_at = start + timedelta(minutes=i)
+        claim.status = 'approved'
+        claim.set_ai_analysis(ANALYSIS)
+        db.session.add(claim)
+    db.session.commit()
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite://'
+    db.init_app(app)
+    service = ClaimService()
+    with app.app_context():
+        db.create_all()
+        load(rows)
+
+        def orm_path():
+            db.session.expunge_all()
+            claims, _ = service.list_claims()
+            return jsonify([claim.to_dict() for claim in claims]).get_data()
+
+        def row_path(serializer):
+            claims, _ = service.list_claims(as_rows=True)
+            return serializer.encode_rows(claims, Claim.JSON_FIELDS)
+
+        assert json.loads(orm_path()) == json.loads(row_path(JSONSerializer('stdlib')))
+        baseline = min(timeit.repeat(orm_path, number=1, repeat=5))
+        print(f"{rows:,} claims, {len(orm_path()) / 1e6:.1f} MB body")
+        print(f"{'to_dict + jsonify':>22} {baseline * 1e3:>8.1f}ms")
+        for name in sorted(ENCODERS):
+            serializer = JSONSerializer(name)
+            elapsed = min(timeit.repeat(lambda: row_path(serializer), number=1, repeat=5))
+            print(f"{'rows + ' + name:>22} {elapsed * 1e3:>8.1f}ms {baseline / elapsed:>6.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,138 @@
+"""Add typed AI decision columns to claims and backfill them
+
+Revision ID: 0001_claim_decision_columns
+Revises:
+Create Date: 2025-10-17 00:00:00
+
+Idempotent: tables created by db.create_all() already carry the columns, so
+only missing columns and indexes are added. Existing rows are read and updated
+in batches of CLAIM_BACKFILL_BATCH_SIZE (default 500) so memory stays flat and
+each batch is written with a single executemany.
+
+The parsing and normalisation below are frozen copies of what the application
+did when this revision was written, so replaying it never depends on app code.
+"""
+import json
+import os
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '0001_claim_decision_columns'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+DECISION_COLUMN_LENGTHS = {
+    'validation_status': 20,
+    'coverage_decision': 30,
+    'fraud_risk_level': 20,
+    'ai_recommendation': 40
+}
+
+COLUMN_TYPES = [
+    (name, sa.String(length)) for name, length in DECISION_COLUMN_LENGTHS.items()
+] + [('ai_parse_success', sa.Boolean())]
+
+REASONING_END = '</reasoning>'
+
+
+def _parse_model_text(text):
+    """JSON document after any <reasoning> preamble; raises ValueError if there is none"""
+    start = 0
+    reasoning_end = text.find(REASONING_END)
+    if reasoning_end != -1:
+        start = reasoning_end + len(REASONING_END)
+    first_brace = text.find('{', start)
+    if first_brace == -1:
+        return json.loads(text[start:])
+    try:
+        document, _ = json.JSONDecoder().raw_decode(text, first_brace)
+        return document
+    except ValueError:
+        last_brace = text.rfind('}')
+        if last_brace <= first_brace:
+            raise
+        return json.loads(text[first_brace:last_brace + 1])
+
+
+def _parsed_analysis(ai_analysis):
+    try:
+        response = json.loads(ai_analysis)
+        if isinstance(response, dict) and 'analysis' in response:
+            analysis = response['analysis']
+            return analysis if not isinstance(analysis, str) else _parse_model_text(analysis)
+        if isinstance(response, dict):
+            return response
+        return _parse_model_text(response if isinstance(response, str) else str(response))
+    except (ValueError, TypeError):
+        return None
+
+
+def _decision_fields(parsed_analysis):
+    """Lower-cased decision column values for a parsed analysis"""
+    if not isinstance(parsed_analysis, dict) or 'error' in parsed_analysis:
+        return dict({name: None for name in DECISION_COLUMN_LENGTHS}, ai_parse_success=False)
+
+    def field(section, key, column):
+        section_data = parsed_analysis.get(section)
+        value = section_data.get(key) if isinstance(section_data, dict) else None
+        if value is None or isinstance(value, (dict, list)):
+            return None
+        return str(value).strip().lower()[:DECISION_COLUMN_LENGTHS[column]] or None
+
+    return {
+        'validation_status': field('validation', 'status', 'validation_status'),
+        'coverage_decision': field('coverageCheck', 'coverageDecision', 'coverage_decision'),
+        'fraud_risk_level': field('fraudRiskAssessment', 'riskLevel', 'fraud_risk_level'),
+        'ai_recommendation': field('fraudRiskAssessment', 'recommendation', 'ai_recommendation'),
+        'ai_parse_success': True
+    }
+
+
+def backfill(connection, batch_size):
+    """Fill decision columns for rows stored before they existed"""
+    claims = sa.table('claims', sa.column('id'), sa.column('ai_analysis'), *[sa.column(name) for name, _ in COLUMN_TYPES])
+    filled = 0
+    while True:
+        rows = connection.execute(
+            sa.select(claims.c.id, claims.c.ai_analysis)
+            .where(claims.c.ai_parse_success.is_(None), claims.c.ai_analysis.isnot(None))
+            .limit(batch_size)
+        ).fetchall()
+        if not rows:
+            break
+        connection.execute(
+            claims.update().where(claims.c.id == sa.bindparam('claim_id'))
+            .values({name: sa.bindparam(name) for name, _ in COLUMN_TYPES}),
+            [
+                dict(_decision_fields(_parsed_analysis(ai_analysis)), claim_id=claim_id)
+                for claim_id, ai_analysis in rows
+            ]
+        )
+        filled += len(rows)
+        print(f"Backfilled decision columns for {filled} claims")
+
+
+def upgrade():
+    inspector = sa.inspect(op.get_bind())
+    if 'claims' not in inspector.get_table_names():
+        return
+    existing_columns = {column['name'] for column in inspector.get_columns('claims')}
+    existing_indexes = {index['name'] for index in inspector.get_indexes('claims')}
+
+    for name, column_type in COLUMN_TYPES:
+        if name not in existing_columns:
+            op.add_column('claims', sa.Column(name, column_type))
+        if f'ix_claims_{name}' not in existing_indexes:
+            op.create_index(f'ix_claims_{name}', 'claims', [name])
+
+    backfill(op.get_bind(), int(os.getenv('CLAIM_BACKFILL_BATCH_SIZE', '500')))
+
+
+def downgrade():
+    with op.batch_alter_table('claims') as batch_op:
+        for name, _ in reversed(COLUMN_TYPES):
+            batch_op.drop_index(f'ix_claims_{name}')
+            batch_op.drop_column(name)
@@ -0,0 +1,54 @@
+"""Add composite indexes for the hot claim, patient and EOB queries
+
+Revision ID: 0002_hot_query_indexes
+Revises: 0001_claim_decision_columns
+Create Date: 2025-10-17 00:00:00
+
+Idempotent: indexes that already exist (e.g. created by db.create_all()) are
+skipped. tests/test_query_plans.py checks these query shapes with EXPLAIN.
+"""
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '0002_hot_query_indexes'
+down_revision = '0001_claim_decision_columns'
+branch_labels = None
+depends_on = None
+
+INDEXES = {
+    'patients': [
+        ('ix_patients_created_at_id', ['created_at', 'id']),
+        ('ix_patients_updated_at', ['updated_at'])
+    ],
+    'claims': [
+        ('ix_claims_status_created_at', ['status', 'created_at']),
+        ('ix_claims_status_approved_at', ['status', 'approved_at', 'created_at']),
+        ('ix_claims_created_at_id', ['created_at', 'id']),
+        ('ix_claims_updated_at', ['updated_at']),
+        ('ix_claims_patient_id_created_at', ['patient_id', 'created_at'])
+    ],
+    'eobs': [
+        ('ix_eobs_claim_id', ['claim_id']),
+        ('ix_eobs_patient_id_created_at', ['patient_id', 'created_at']),
+        ('ix_eobs_created_at_id', ['created_at', 'id'])
+    ]
+}
+
+
+def upgrade():
+    inspector = sa.inspect(op.get_bind())
+    tables = set(inspector.get_table_names())
+    for table, indexes in INDEXES.items():
+        if table not in tables:
+            continue
+        existing = {index['name'] for index in inspector.get_indexes(table)}
+        for name, columns in indexes:
+            if name not in existing:
+                op.create_index(name, table, columns)
+
+
+def downgrade():
+    for table, indexes in INDEXES.items():
+        for name, _ in indexes:
+            op.drop_index(name, table_name=table)
@@ -0,0 +1,53 @@
+"""Store AI analysis, suggestion and denial-reason documents as JSONB on Postgres
+
+Revision ID: 0003_json_columns
+Revises: 0002_hot_query_indexes
+Create Date: 2025-10-17 00:00:00
+
+The models declare these columns as JSONText, which is JSONB on Postgres and
+TEXT on SQLite. SQLite keeps the existing TEXT columns (the JSON1 functions read
+them directly), so this revision only converts Postgres columns that are still
+text. Stored values were always written with json.dumps, so the cast is safe.
+"""
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects.postgresql import JSONB
+
+# revision identifiers, used by Alembic.
+revision = '0003_json_columns'
+down_revision = '0002_hot_query_indexes'
+branch_labels = None
+depends_on = None
+
+JSON_COLUMNS = {
+    'patients': ['ai_analysis'],
+    'claims': ['ai_analysis', 'ai_suggestions'],
+    'eobs': ['ai_analysis', 'denial_reasons']
+}
+
+
+def _columns_to_convert(inspector, target):
+    tables = set(inspector.get_table_names())
+    for table, columns in JSON_COLUMNS.items():
+        if table not in tables:
+            continue
+        types = {column['name']: column['type'] for column in inspector.get_columns(table)}
+        for column in columns:
+            if column in types and isinstance(types[column], JSONB) != (target is JSONB):
+                yield table, column
+
+
+def upgrade():
+    bind = op.get_bind()
+    if bind.dialect.name != 'postgresql':
+        return
+    for table, column in list(_columns_to_convert(sa.inspect(bind), JSONB)):
+        op.alter_column(table, column, type_=JSONB(none_as_null=True), postgresql_using=f'{column}::jsonb')
+
+
+def downgrade():
+    bind = op.get_bind()
+    if bind.dialect.name != 'postgresql':
+        return
+    for table, column in list(_columns_to_convert(sa.inspect(bind), sa.Text)):
+        op.alter_column(table, column, type_=sa.Text(), postgresql_using=f'{column}::text')
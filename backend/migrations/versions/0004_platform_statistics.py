@@ -0,0 +1,76 @@
+"""Add the platform_statistics counters and fill them from existing rows
+
+Revision ID: 0004_platform_statistics
+Revises: 0003_json_columns
+Create Date: 2025-10-17 00:00:00
+
+Idempotent: the table is only created when missing (db.create_all() may have
+created it empty), and the counters are always recomputed from the patients
+and claims tables, as `flask stats rebuild` did when this revision was written.
+The recount is a frozen copy of that rebuild, so replaying the revision never
+depends on app code.
+"""
+from collections import Counter
+from datetime import datetime
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '0004_platform_statistics'
+down_revision = '0003_json_columns'
+branch_labels = None
+depends_on = None
+
+patients = sa.table('patients', sa.column('id'))
+claims = sa.table(
+    'claims', sa.column('status', sa.String()), sa.column('created_at', sa.DateTime()),
+    sa.column('approved_at', sa.DateTime()), sa.column('ai_parse_success', sa.Boolean())
+)
+platform_statistics = sa.table(
+    'platform_statistics', sa.column('name', sa.String()), sa.column('value', sa.Float()),
+    sa.column('updated_at', sa.DateTime())
+)
+
+
+def rebuild(connection):
+    """Replace the counters with values recomputed from patients and claims"""
+    connection.execute(platform_statistics.delete())
+    stats = Counter({'patients_total': connection.execute(sa.select(sa.func.count()).select_from(patients)).scalar()})
+    for status, count in connection.execute(sa.select(claims.c.status, sa.func.count()).group_by(claims.c.status)):
+        stats['claims_total'] += count
+        stats[f'claims_status:{status}'] += count
+    for parsed, count in connection.execute(
+            sa.select(claims.c.ai_parse_success, sa.func.count())
+            .where(claims.c.ai_parse_success.isnot(None)).group_by(claims.c.ai_parse_success)):
+        stats['ai_parsed_total'] += count
+        stats['ai_parse_success_total'] += count if parsed else 0
+    approved = connection.execution_options(yield_per=5000).execute(
+        sa.select(claims.c.created_at, claims.c.approved_at)
+        .where(claims.c.status == 'approved', claims.c.approved_at.isnot(None), claims.c.created_at.isnot(None)))
+    for created_at, approved_at in approved:
+        stats['approved_processing_count'] += 1
+        stats['approved_processing_seconds'] += (approved_at - created_at).total_seconds()
+
+    now = datetime.utcnow()
+    rows = [{'name': name, 'value': value, 'updated_at': now} for name, value in sorted(stats.items())]
+    if rows:
+        connection.execute(platform_statistics.insert(), rows)
+
+
+def upgrade():
+    bind = op.get_bind()
+    tables = set(sa.inspect(bind).get_table_names())
+    if 'platform_statistics' not in tables:
+        op.create_table(
+            'platform_statistics',
+            sa.Column('name', sa.String(100), primary_key=True),
+            sa.Column('value', sa.Float(), nullable=False),
+            sa.Column('updated_at', sa.DateTime())
+        )
+    if {'patients', 'claims'} <= tables:
+        rebuild(bind)
+
+
+def downgrade():
+    op.drop_table('platform_statistics')
@@ -0,0 +1,84 @@
+"""Add per-minute activity rollups and backfill them from recent rows
+
+Revision ID: 0005_activity_rollups
+Revises: 0004_platform_statistics
+Create Date: 2025-10-17 00:00:00
+
+Idempotent: the table is only created when missing (db.create_all() may have
+created it empty). Minute buckets inside the retention window are seeded from
+patients.created_at, claims.created_at and claims.approved_at so windowed
+rates are right immediately; denials carry no timestamp and start at zero.
+Metric names and bucketing are frozen copies of app.activity as it was when
+this revision was written, so replaying it never depends on app code.
+"""
+import os
+from collections import Counter
+from datetime import datetime, timedelta
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '0005_activity_rollups'
+down_revision = '0004_platform_statistics'
+branch_labels = None
+depends_on = None
+
+MINUTE = 60
+EPOCH = datetime(1970, 1, 1)
+
+patients = sa.table('patients', sa.column('created_at', sa.DateTime()))
+claims = sa.table(
+    'claims', sa.column('status', sa.String()), sa.column('created_at', sa.DateTime()),
+    sa.column('approved_at', sa.DateTime()), sa.column('ai_parse_success', sa.Boolean())
+)
+activity_rollups = sa.table(
+    'activity_rollups', sa.column('resolution', sa.Integer()), sa.column('bucket_start', sa.DateTime()),
+    sa.column('metric', sa.String()), sa.column('value', sa.Float())
+)
+
+
+def minute_start(moment):
+    seconds = int((moment - EPOCH).total_seconds())
+    return EPOCH + timedelta(seconds=seconds - seconds % MINUTE)
+
+
+def upgrade():
+    bind = op.get_bind()
+    tables = set(sa.inspect(bind).get_table_names())
+    if 'activity_rollups' not in tables:
+        op.create_table(
+            'activity_rollups',
+            sa.Column('resolution', sa.Integer(), primary_key=True),
+            sa.Column('bucket_start', sa.DateTime(), primary_key=True),
+            sa.Column('metric', sa.String(50), primary_key=True),
+            sa.Column('value', sa.Float(), nullable=False)
+        )
+    if not {'patients', 'claims'} <= tables:
+        return
+    if bind.execute(sa.select(sa.func.count()).select_from(activity_rollups)).scalar():
+        return
+
+    since = datetime.utcnow() - timedelta(hours=float(os.getenv('ACTIVITY_MINUTE_RETENTION_HOURS', '48')))
+    events = Counter()
+
+    def count(metric, rows):
+        for (moment,) in rows:
+            events[(minute_start(moment), metric)] += 1
+
+    count('patients_registered', bind.execute(sa.select(patients.c.created_at).where(patients.c.created_at >= since)))
+    count('claims_submitted', bind.execute(sa.select(claims.c.created_at).where(claims.c.created_at >= since)))
+    count('claim_ai_failures', bind.execute(
+        sa.select(claims.c.created_at).where(claims.c.created_at >= since, claims.c.ai_parse_success.isnot(True))))
+    count('claims_approved', bind.execute(
+        sa.select(claims.c.approved_at).where(claims.c.status == 'approved', claims.c.approved_at >= since)))
+    if events:
+        # The table is empty here, so every bucket is a plain insert
+        bind.execute(activity_rollups.insert(), [
+            {'resolution': MINUTE, 'bucket_start': start, 'metric': metric, 'value': value}
+            for (start, metric), value in sorted(events.items())
+        ])
+
+
+def downgrade():
+    op.drop_table('activity_rollups')
@@ -0,0 +1,47 @@
+"""Add the index tables for claims and EOBs moved to the claim archive
+
+Revision ID: 0006_claim_archive
+Revises: 0005_activity_rollups
+Create Date: 2025-10-17 00:00:00
+
+Idempotent: tables that already exist (e.g. created by db.create_all()) are
+skipped. The archive files themselves live under ARCHIVE_DIR.
+"""
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '0006_claim_archive'
+down_revision = '0005_activity_rollups'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    tables = set(sa.inspect(op.get_bind()).get_table_names())
+    if 'archived_claims' not in tables:
+        op.create_table(
+            'archived_claims',
+            sa.Column('id', sa.String(36), primary_key=True),
+            sa.Column('partition', sa.String(7), nullable=False),
+            sa.Column('patient_id', sa.String(36), nullable=False),
+            sa.Column('status', sa.String(20)),
+            sa.Column('created_at', sa.DateTime()),
+            sa.Column('approved_at', sa.DateTime()),
+            sa.Column('ai_parse_success', sa.Boolean()),
+            sa.Column('archived_at', sa.DateTime())
+        )
+        op.create_index('ix_archived_claims_patient_id', 'archived_claims', ['patient_id'])
+    if 'archived_eobs' not in tables:
+        op.create_table(
+            'archived_eobs',
+            sa.Column('id', sa.String(36), primary_key=True),
+            sa.Column('claim_id', sa.String(36), nullable=False),
+            sa.Column('partition', sa.String(7), nullable=False)
+        )
+        op.create_index('ix_archived_eobs_claim_id', 'archived_eobs', ['claim_id'])
+
+
+def downgrade():
+    op.drop_table('archived_eobs')
+    op.drop_table('archived_claims')
@@ -0,0 +1,18 @@
+import json
+from unittest.mock import MagicMock
+
+from botocore.exceptions import ClientError
+
+
+def bedrock_body(content):
+    """Build a fake invoke_model response for the GPT-OSS format"""
+    body = MagicMock()
+    body.read.return_value = json.dumps({
+        'choices': [{'message': {'content': content}}]
+    }).encode('utf-8')
+    return {'body': body}
+
+
+def throttle_error():
+    """A Bedrock throttling error, the one error class the resilience layer retries"""
+    return ClientError({'Error': {'Code': 'ThrottlingException', 'Message': 'slow down'}}, 'InvokeModel')
@@ -0,0 +1,114 @@
+import importlib.util
+import os
+import sys
+from datetime import datetime, timedelta
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from app.models import Patient, Claim, EOB
+
+VERSIONS_DIR = os.path.join(os.path.dirname(__file__), '..', 'migrations', 'versions')
+
+
+@pytest.fixture
+def load_revision():
+    """Load a migration revision module by file name, so tests can call its helpers or patch its op"""
+    def load(filename):
+        spec = importlib.util.spec_from_file_location(filename[:-3], os.path.join(VERSIONS_DIR, filename))
+        migration = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(migration)
+        return migration
+    return load
+
+
+@pytest.fixture
+def memory_db():
+    """A throwaway Flask app bound to an in-memory SQLite database, with one patient, 7 claims and 7 EOBs"""
+    from flask import Flask
+    from app.database import db
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite://'
+    db.init_app(app)
+    with app.app_context():
+        db.create_all()
+        start = datetime(2025, 1, 1)
+        patient = Patient(first_name='Test', last_name='Patient', email='t@example.com', phone='1',
+                          date_of_birth='1980-01-01', insurance_id='INS1', insurance_provider='Acme')
+        patient.id = 'patient-1'
+        db.session.add(patient)
+        for i in range(7):
+            claim = Claim(patient_id='patient-1', claim_amount=100.0 + i,
+                          claim_type='vision' if i % 2 else 'routine', description=f'Claim {i}')
+            claim.id = f'claim-{i}'
+            # Two claims share a timestamp so the id tie-breaker is exercised
+            claim.created_at = start + timedelta(days=min(i, 5))
+            claim.status = 'approved' if i % 3 else 'denied'
+            claim.set_ai_analysis({'analysis': 'x' * 100})
+            db.session.add(claim)
+            eob = EOB(claim_id=claim.id, patient_id='patient-1', eob_amount=80.0 + i, status='approved',
+                      eob_date='2025-01-10', insurance_company='Acme')
+            eob.id = f'eob-{i}'
+            eob.created_at = start + timedelta(days=i)
+            db.session.add(eob)
+        db.session.commit()
+        # Start each test with an empty identity map so relationship loads hit the database
+        db.session.expunge_all()
+        yield db
+        db.session.remove()
+        db.drop_all()
+
+
+@pytest.fixture
+def replica_app(tmp_path, monkeypatch):
+    """Primary and replica SQLite files holding different claims, with a routed list view and a write view"""
+    from flask import Flask, jsonify
+    from app import replicas
+    from app.database import db
+    router = replicas.ReplicaRouter(max_lag_seconds=5, sticky_seconds=10, check_interval_seconds=0)
+    monkeypatch.setattr(replicas, 'replica_router', router)
+    # init_app registers a metadata per bind key; keep the replica one out of later tests' create_all
+    monkeypatch.setattr(db, 'metadatas', dict(db.metadatas))
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = f"sqlite:///{tmp_path / 'primary.db'}"
+    app.config['SQLALCHEMY_BINDS'] = {replicas.REPLICA_BIND: f"sqlite:///{tmp_path / 'replica.db'}"}
+    db.init_app(app)
+
+    @app.route('/claims')
+    @router.route_reads
+    def list_claims():
+        return jsonify([claim.id for claim in Claim.query.order_by(Claim.id)])
+
+    @app.route('/claims', methods=['POST'])
+    def add_claim():
+        claim = Claim(patient_id='patient-1', claim_amount=1.0, claim_type='routine', description='New')
+        claim.id = 'claim-new'
+        db.session.add(claim)
+        db.session.commit()
+        return jsonify({'id': claim.id}), 201
+
+    @app.route('/patients/bulk', methods=['POST'])
+    def add_patients():
+        from app.services import PatientService
+        ids = PatientService().create_patients([{
+            'first_name': 'Bulk', 'last_name': 'Patient', 'email': 'bulk@example.com', 'phone': '1',
+            'date_of_birth': '1990-01-01', 'insurance_id': 'INS', 'insurance_provider': 'Acme'}])
+        return jsonify({'ids': ids}), 201
+
+    with app.app_context():
+        replica_engine = db.engines[replicas.REPLICA_BIND]
+        db.create_all()
+        db.metadata.create_all(replica_engine)
+        for claim_id in ('claim-primary', 'claim-replica'):
+            engine = replica_engine if claim_id == 'claim-replica' else db.engine
+            with engine.begin() as connection:
+                connection.execute(Claim.__table__.insert().values(
+                    id=claim_id, patient_id='patient-1', claim_amount=1.0, claim_type='routine',
+                    description='Seeded', status='pending', created_at=datetime(2025, 1, 1)))
+        router.init_app(app, replica_engine, db.session)
+    yield app, router, db
+    with app.app_context():
+        db.session.remove()
+        for engine in db.engines.values():
+            engine.dispose()
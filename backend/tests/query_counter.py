@@ -0,0 +1,39 @@
+from contextlib import contextmanager
+
+from sqlalchemy import event
+
+
+class QueryCounter:
+    """Record every SQL statement an engine executes while active"""
+
+    def __init__(self, engine):
+        self.engine = engine
+        self.statements = []
+
+    def _record(self, conn, cursor, statement, parameters, context, executemany):
+        self.statements.append(statement)
+
+    def __enter__(self):
+        event.listen(self.engine, 'before_cursor_execute', self._record)
+        return self
+
+    def __exit__(self, *exc_info):
+        event.remove(self.engine, 'before_cursor_execute', self._record)
+
+    @property
+    def count(self):
+        return len(self.statements)
+
+
+@contextmanager
+def assert_max_queries(engine, expected):
+    """Fail if the block issues more than expected SQL statements
+
+    Usage:
+        with assert_max_queries(db.engine, 1):
+            [eob.to_dict() for eob in eob_service.list_eobs()[0]]
+    """
+    with QueryCounter(engine) as counter:
+        yield counter
+    statements = '\n'.join(counter.statements)
+    assert counter.count <= expected, f'Expected at most {expected} queries, got {counter.count}:\n{statements}'
@@ -0,0 +1,107 @@
+import pytest
+import os
+import sys
+from datetime import datetime, timedelta
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from app.services import BedrockService, EOBService
+from app.models import Claim, ActivityRollup
+from app import activity
+from tests.query_counter import QueryCounter
+
+
+class TestActivityRollups:
+    def test_flush_records_current_minute(self, memory_db):
+        """Test the fixture's inserts land in one minute bucket, including decisions and AI failures"""
+        totals = activity.window_totals(timedelta(hours=1))
+        assert totals == {
+            activity.PATIENTS_REGISTERED: 1, activity.CLAIMS_SUBMITTED: 7, activity.CLAIM_AI_FAILURES: 7,
+            activity.CLAIMS_APPROVED: 4, activity.CLAIMS_DENIED: 3
+        }
+        assert memory_db.session.query(ActivityRollup).filter_by(resolution=activity.MINUTE).count() == 5
+
+    def test_only_transitions_count_as_decisions(self, memory_db):
+        """Test approving a claim counts once and unrelated updates count nothing"""
+        claim = memory_db.session.get(Claim, 'claim-0')
+        claim.status = 'approved'
+        memory_db.session.commit()
+        claim.description = 'Edited'
+        memory_db.session.commit()
+        totals = activity.window_totals(timedelta(hours=1))
+        assert totals[activity.CLAIMS_APPROVED] == 5 and totals[activity.CLAIMS_SUBMITTED] == 7
+
+    def test_refile_of_partially_loaded_claim_records_no_ai_failure(self, memory_db):
+        """Test a claim loaded without its parse result does not count as a new AI failure when refiled"""
+        claim = memory_db.session.get(Claim, 'claim-2')
+        claim.ai_parse_success = False
+        memory_db.session.commit()
+        memory_db.session.expunge_all()
+        eob = EOBService().get_eob('eob-2')
+        # Read before anything touches the attribute, whatever order flush_events checks it in
+        assert activity.committed_value(eob.claim, 'ai_parse_success') is False
+        eob.claim.status = 'refiled'
+        memory_db.session.commit()
+        totals = activity.window_totals(timedelta(hours=1))
+        assert totals[activity.CLAIM_AI_FAILURES] == 8
+
+    def test_migration_seeds_recent_buckets(self, memory_db, load_revision):
+        """Test revision 0005 seeds minute buckets from rows inside the retention window"""
+        migration = load_revision('0005_activity_rollups.py')
+        connection = memory_db.session.connection()
+        recent = datetime.utcnow() - timedelta(hours=1)
+        connection.execute(Claim.__table__.update().values(created_at=recent))
+        connection.execute(Claim.__table__.update().where(Claim.__table__.c.id == 'claim-1').values(approved_at=recent))
+        connection.execute(ActivityRollup.__table__.delete())
+
+        with patch.object(migration, 'op') as mock_op:
+            mock_op.get_bind.return_value = connection
+            migration.upgrade()
+
+        assert activity.window_totals(timedelta(hours=2)) == {
+            activity.PATIENTS_REGISTERED: 1, activity.CLAIMS_SUBMITTED: 7, activity.CLAIM_AI_FAILURES: 7,
+            activity.CLAIMS_APPROVED: 1
+        }
+
+    def test_revisions_do_not_import_app_code(self):
+        """Test migration revisions stay frozen instead of importing the application"""
+        import ast
+        versions = os.path.join(os.path.dirname(__file__), '..', 'migrations', 'versions')
+        for name in sorted(os.listdir(versions)):
+            if not name.endswith('.py'):
+                continue
+            with open(os.path.join(versions, name)) as f:
+                tree = ast.parse(f.read())
+            modules = [node.module or '' for node in ast.walk(tree) if isinstance(node, ast.ImportFrom)]
+            modules += [alias.name for node in ast.walk(tree) if isinstance(node, ast.Import) for alias in node.names]
+            assert not [module for module in modules if module == 'app' or module.startswith('app.')], name
+
+    def test_compact_downsamples_and_expires(self, memory_db):
+        """Test old minute buckets merge into hourly buckets and expired hours are dropped"""
+        now = datetime(2025, 6, 10, 12, 30)
+        connection = memory_db.session.connection()
+        activity.record(connection, {activity.CLAIMS_SUBMITTED: 2}, now=datetime(2025, 6, 7, 9, 5))
+        activity.record(connection, {activity.CLAIMS_SUBMITTED: 3}, now=datetime(2025, 6, 7, 9, 40))
+        activity.record(connection, {activity.CLAIMS_SUBMITTED: 1}, now=now - timedelta(minutes=10))
+        activity.record(connection, {activity.CLAIMS_SUBMITTED: 4}, now=now - timedelta(days=200))
+        result = activity.compact(connection, now=now)
+        assert result == {'downsampled_minutes': 3, 'hourly_buckets': 2, 'expired_hours': 1}
+        hourly = memory_db.session.query(ActivityRollup).filter_by(resolution=activity.HOUR).all()
+        assert [(row.bucket_start, row.value) for row in hourly] == [(datetime(2025, 6, 7, 9), 5)]
+        assert activity.window_totals(timedelta(days=4), now=now)[activity.CLAIMS_SUBMITTED] == 6
+        assert activity.window_totals(timedelta(hours=1), now=now)[activity.CLAIMS_SUBMITTED] == 1
+
+    def test_status_endpoints_read_rollups(self, memory_db):
+        """Test the alerts use the rollup failure rate and agent status reads it without scanning claims"""
+        service = BedrockService()
+        alerts = service.get_system_alerts()
+        assert 'claim_processing_issues' in [alert['id'] for alert in alerts]
+        with QueryCounter(memory_db.engine) as counter:
+            status = service.get_agent_status()
+        assert status['claim_processing_agent']['performance']['cpu_usage'] == '26%'
+        assert not [sql for sql in counter.statements if 'FROM claims' in sql and 'created_at >=' in sql]
+
+
+if __name__ == '__main__':
+    pytest.main([__file__])
@@ -0,0 +1,98 @@
+import pytest
+import os
+import sys
+import time
+from unittest.mock import MagicMock
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from app.ai_cache import ResponseCache, make_cache_key
+from app.resilience import ResilienceRegistry
+from app.services import BedrockService
+from tests.bedrock_stubs import bedrock_body
+
+
+class TestResponseCache:
+    def test_key_ignores_whitespace_but_not_params(self):
+        """Test cache keys normalize prompt whitespace and include params"""
+        key = make_cache_key('model-a', 'Analyze   this\n   claim', {'temperature': 0.7})
+        assert key == make_cache_key('model-a', 'Analyze this claim', {'temperature': 0.7})
+        assert key != make_cache_key('model-b', 'Analyze this claim', {'temperature': 0.7})
+        assert key != make_cache_key('model-a', 'Analyze this claim', {'temperature': 0.2})
+
+    def test_lru_eviction_and_counters(self):
+        """Test size eviction drops the least recently used entry"""
+        cache = ResponseCache(max_entries=2, ttl_seconds=60)
+        cache.set('a', {'v': 1})
+        cache.set('b', {'v': 2})
+        assert cache.get('a') == {'v': 1}
+        cache.set('c', {'v': 3})
+
+        assert cache.get('b') is None
+        assert cache.get('a') == {'v': 1}
+        stats = cache.get_stats()
+        assert stats['hits'] == 2
+        assert stats['misses'] == 1
+        assert stats['evictions'] == 1
+
+    def test_ttl_expiry(self):
+        """Test expired entries are treated as misses"""
+        cache = ResponseCache(max_entries=10, ttl_seconds=60)
+        cache.set('a', {'v': 1}, ttl_seconds=-1)
+        assert cache.get('a') is None
+        assert cache.get_stats()['expirations'] == 1
+
+    def test_sqlite_tier_survives_restart(self, tmp_path):
+        """Test the persistent tier serves entries to a fresh cache instance"""
+        path = str(tmp_path / 'cache.db')
+        ResponseCache(sqlite_path=path).set('a', {'v': 1})
+
+        restarted = ResponseCache(sqlite_path=path)
+        assert restarted.get('a') == {'v': 1}
+        assert restarted.get_stats()['persistent_hits'] == 1
+
+
+    def test_sqlite_expiry_counted_under_stats_lock(self, tmp_path):
+        """Test expired persistent entries are deleted and counted while the stats lock is held"""
+        cache = ResponseCache(sqlite_path=str(tmp_path / 'cache.db'))
+        cache._sqlite_set('a', {'v': 1}, expires_at=time.time() - 1)
+
+        class LockedStats(dict):
+            def __setitem__(self, key, value):
+                assert cache._lock.locked(), f'{key} updated without _lock'
+                super().__setitem__(key, value)
+
+        cache._stats = LockedStats(cache._stats)
+        assert cache.get('a') is None
+        assert cache.get_stats()['expirations'] == 1
+        assert cache._sqlite_get('a', time.time()) is None
+
+class TestBedrockCaching:
+    def test_repeat_prompt_served_from_cache(self):
+        """Test identical prompts only reach invoke_model once"""
+        service = BedrockService()
+        service.response_cache = ResponseCache(max_entries=10, ttl_seconds=60)
+        service.bedrock_client = MagicMock()
+        service.bedrock_client.invoke_model.return_value = bedrock_body('{"ok": true}')
+
+        first = service._invoke_bedrock('Analyze this claim')
+        second = service._invoke_bedrock('Analyze   this claim')
+
+        assert first == second == {'ok': True}
+        assert service.bedrock_client.invoke_model.call_count == 1
+
+    def test_errors_are_not_cached(self):
+        """Test failed invocations are retried on the next call"""
+        service = BedrockService()
+        service.response_cache = ResponseCache(max_entries=10, ttl_seconds=60)
+        service.bedrock_client = MagicMock()
+        service.resilience = ResilienceRegistry()
+        service.bedrock_client.invoke_model.side_effect = RuntimeError('boom')
+
+        assert 'error' in service._invoke_bedrock('Analyze this claim')
+        assert 'error' in service._invoke_bedrock('Analyze this claim')
+        assert service.bedrock_client.invoke_model.call_count == 2
+
+
+if __name__ == '__main__':
+    pytest.main([__file__])
@@ -0,0 +1,75 @@
+import pytest
+import os
+import sys
+import threading
+import time
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from app.ai_executor import AIExecutor
+from app.services import BedrockService
+
+
+class TestAIExecutor:
+    def test_per_model_limit_caps_concurrency(self):
+        """Test no more than per_model_concurrency calls run at once for a model"""
+        executor = AIExecutor(max_concurrency=8, per_model_concurrency=2)
+        lock = threading.Lock()
+        active = {'now': 0, 'peak': 0}
+
+        def work(value):
+            with lock:
+                active['now'] += 1
+                active['peak'] = max(active['peak'], active['now'])
+            time.sleep(0.02)
+            with lock:
+                active['now'] -= 1
+            return value * 2
+
+        futures = [executor.submit('model-a', work, i) for i in range(8)]
+        assert [f.result(timeout=5) for f in futures] == [i * 2 for i in range(8)]
+        assert active['peak'] <= 2
+        assert executor.get_stats()['completed'] == 8
+        executor.shutdown()
+
+    def test_saturated_model_does_not_hold_workers(self):
+        """Test calls queued behind a busy model leave pool workers free for other models"""
+        executor = AIExecutor(max_concurrency=4, per_model_concurrency=2)
+        release = threading.Event()
+        blocked = [executor.submit('model-a', release.wait, 5) for _ in range(6)]
+        assert executor.submit('model-b', lambda: 'done').result(timeout=1) == 'done'
+        stats = executor.get_stats()
+        assert stats['in_flight_by_model'] == {'model-a': 2}
+        assert stats['queued'] == 4
+        release.set()
+        assert all(f.result(timeout=5) for f in blocked)
+        stats = executor.get_stats()
+        assert stats['completed'] == 7 and stats['queued'] == 0 and stats['in_flight'] == 0
+        executor.shutdown()
+
+    def test_failures_propagate_through_future(self):
+        """Test exceptions surface on the future and are counted"""
+        executor = AIExecutor(max_concurrency=2, per_model_concurrency=2)
+
+        def fail():
+            raise ValueError('bad')
+
+        future = executor.submit('model-a', fail)
+        with pytest.raises(ValueError):
+            future.result(timeout=5)
+        assert executor.get_stats()['failed'] == 1
+        executor.shutdown()
+
+    def test_bedrock_async_returns_future(self):
+        """Test invoke_bedrock_async resolves to the _invoke_bedrock result"""
+        service = BedrockService()
+        service.executor = AIExecutor(max_concurrency=2, per_model_concurrency=2)
+        with patch.object(service, '_invoke_bedrock', return_value={'ok': True}) as mock_invoke:
+            assert service.invoke_bedrock_async('prompt').result(timeout=5) == {'ok': True}
+            mock_invoke.assert_called_once_with('prompt', 'claim_processing')
+        service.executor.shutdown()
+
+
+if __name__ == '__main__':
+    pytest.main([__file__])
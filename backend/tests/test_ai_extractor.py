@@ -0,0 +1,58 @@
+import pytest
+import json
+import os
+import sys
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from app.ai_extractor import AIExtractor, parse_model_text
+from app.claim_rules import ClaimRulesEngine
+from app.services import BedrockService
+
+
+class TestAIExtractor:
+    def test_reasoning_preamble_and_trailing_text(self):
+        """Test braces inside reasoning and text after the document are ignored"""
+        text = '<reasoning>Consider {"draft": 1} first</reasoning>\n{"priority": "High"}\nHope this helps {ok}'
+        assert parse_model_text(text) == {'priority': 'High'}
+
+    def test_all_response_shapes(self):
+        """Test wrapped text, raw strings and already-parsed dicts all extract"""
+        extractor = AIExtractor()
+        document = {'root_cause': 'x', 'suggestions': [], 'priority': 'Low', 'estimated_impact': 'y'}
+        wrapped = {'analysis': '<reasoning>r</reasoning>' + json.dumps(document), 'status': 'success'}
+        assert extractor.extract(wrapped, 'suggestions') == (document, [])
+        assert extractor.extract(json.dumps(document), 'suggestions') == (document, [])
+        assert extractor.extract(document, 'suggestions') == (document, [])
+
+    def test_schema_drops_mistyped_fields(self):
+        """Test fields of the wrong type are reported and removed"""
+        extractor = AIExtractor()
+        document, errors = extractor.extract({'validation': 'Valid', 'coverageCheck': {}}, 'claim_processing')
+        assert document == {'coverageCheck': {}}
+        assert errors == ['Field validation should be dict', 'Missing field: fraudRiskAssessment']
+        assert extractor.get_stats()['claim_processing']['schema_errors'] == 1
+
+    def test_unparseable_text_returns_none(self):
+        """Test text without a JSON object is counted as a parse failure"""
+        extractor = AIExtractor()
+        assert extractor.extract({'analysis': 'no json here'}, 'chatbot')[0] is None
+        assert extractor.extract('[1, 2]', 'chatbot')[0] is None
+        assert extractor.get_stats()['chatbot']['parse_failures'] == 2
+
+    def test_process_claim_parses_analysis_once(self):
+        """Test process_claim returns the parsed analysis used for its decision"""
+        service = BedrockService()
+        service.claim_rules = ClaimRulesEngine([], enabled=False)
+        analysis = {'validation': {'status': 'Valid'}, 'coverageCheck': {'coverageDecision': 'Approved'},
+                    'fraudRiskAssessment': {'recommendation': 'Approve'}}
+        response = {'analysis': '<reasoning>ok</reasoning>' + json.dumps(analysis)}
+        with patch.object(service, '_invoke_bedrock', return_value=response):
+            result = service.process_claim({'patient_id': 'p', 'claim_amount': 900, 'claim_type': 'surgery'})
+        assert result['status'] == 'approved'
+        assert result['parsed_analysis'] == analysis
+
+
+if __name__ == '__main__':
+    pytest.main([__file__])
@@ -105,6 +105,67 @@ class TestPatientRegistration:
         data = json.loads(response.data)
         assert data['error'] == 'Bedrock service unavailable'
 
+class TestBulkPatientRegistration:
+    @patch('app.main.patient_service.create_patients')
+    @patch('app.main.patient_service.existing_emails')
+    @patch('app.main.bedrock_service.process_patient_registrations')
+    def test_bulk_json_reports_per_row(self, mock_process, mock_existing, mock_create, client, sample_patient_data):
+        """Test invalid rows are reported before AI analysis and only analysed rows are inserted"""
+        first = {**sample_patient_data, "insuranceId": "INS1", "insuranceProvider": "Acme"}
+        second = {**first, "email": "jane.doe@example.com"}
+        third = {**first, "email": "sam.doe@example.com"}
+        mock_existing.return_value = set()
+        mock_process.return_value = [
+            {'success': True, 'ai_analysis': {'risk': 'low'}},
+            {'success': False, 'error': 'Bedrock service unavailable'},
+            {'success': True, 'ai_analysis': {}}
+        ]
+        mock_create.return_value = ['patient-1', 'patient-3']
+        
+        rows = [first, {"firstName": "No"}, {**first, "email": "x@example.com", "dateOfBirth": "01/01/1990"},
+                {**first}, second, third]
+        response = client.post('/api/patients/bulk', data=json.dumps(rows), content_type='application/json')
+        
+        assert response.status_code == 201
+        data = json.loads(response.data)
+        assert (data['processed'], data['failed']) == (2, 4)
+        results = data['results']
+        assert results[0] == {"index": 0, "success": True, "patient_id": "patient-1"}
+        assert results[1]['error'] == 'Missing required field: lastName'
+        assert results[2]['error'] == 'dateOfBirth must be YYYY-MM-DD'
+        assert results[3]['error'] == 'Duplicate email in upload'
+        assert results[4]['error'] == 'Bedrock service unavailable'
+        assert results[5]['patient_id'] == 'patient-3'
+        assert len(mock_process.call_args[0][0]) == 3
+        inserted = mock_create.call_args[0][0]
+        assert [row['email'] for row in inserted] == ['john.doe@example.com', 'sam.doe@example.com']
+        assert inserted[0]['ai_analysis'] == '{"risk": "low"}' and inserted[1]['ai_analysis'] is None
+    
+    @patch('app.main.patient_service.create_patients')
+    @patch('app.main.patient_service.existing_emails')
+    @patch('app.main.bedrock_service.process_patient_registrations')
+    def test_bulk_csv_accepts_column_headers(self, mock_process, mock_existing, mock_create, client):
+        """Test CSV uploads with API or column-name headers and skip already registered emails"""
+        mock_existing.return_value = {'taken@example.com'}
+        mock_process.return_value = [{'success': True, 'ai_analysis': {}}]
+        mock_create.return_value = ['patient-1']
+        body = ("first_name,lastName,email,phone,date_of_birth,insuranceId,insurance_provider\n"
+                "Ann,Lee,ann@example.com,555,1985-02-03,INS9,Acme\n"
+                "Bob,Ray,taken@example.com,556,1970-12-31,INS8,Acme\n")
+        response = client.post('/api/patients/bulk', data=body, content_type='text/csv')
+        
+        assert response.status_code == 201
+        data = json.loads(response.data)
+        assert data['results'][1]['error'] == 'Email already registered'
+        assert mock_create.call_args[0][0][0]['first_name'] == 'Ann'
+        assert mock_create.call_args[0][0][0]['date_of_birth'] == '1985-02-03'
+    
+    def test_bulk_requires_rows(self, client):
+        """Test bulk registration rejects an empty payload"""
+        response = client.post('/api/patients/bulk', data=json.dumps({"patients": []}),
+                               content_type='application/json')
+        assert response.status_code == 400
+
 class TestPatientRetrieval:
     def test_get_patient_not_found(self, client):
         """Test getting non-existent patient"""
@@ -191,6 +252,131 @@ class TestClaimProcessing:
         data = json.loads(response.data)
         assert data['error'] == 'Claim processing failed'
 
+class TestClaimStreaming:
+    @patch('app.main.bedrock_service.process_claim_stream')
+    def test_process_claim_stream_emits_events(self, mock_stream, client, sample_claim_data):
+        """Test streaming claim processing emits SSE progress and the stored decision"""
+        mock_stream.return_value = iter([
+            ('started', {'model': 'test-model'}),
+            ('reasoning_started', {'received_chars': 11}),
+            ('json_started', {'received_chars': 40}),
+            ('decision', {
+                'success': True,
+                'status': 'pending_approval',
+                'approval_required': True,
+                'ai_analysis': {'fraud_risk': 'low'},
+                'next_steps': []
+            })
+        ])
+        
+        response = client.post('/api/claims/process/stream',
+                             data=json.dumps(sample_claim_data),
+                             content_type='application/json')
+        
+        assert response.status_code == 200
+        assert response.mimetype == 'text/event-stream'
+        body = response.get_data(as_text=True)
+        events = [line[len('event: '):] for line in body.splitlines() if line.startswith('event: ')]
+        assert events == ['started', 'reasoning_started', 'json_started', 'decision']
+        decision = json.loads(body.strip().split('\n')[-1][len('data: '):])
+        assert decision['success'] is True
+        assert 'claim_id' in decision
+
+class TestClaimBatchProcessing:
+    @patch('app.main.bedrock_service.process_claims_batch')
+    def test_process_batch_reports_per_claim(self, mock_batch, client, sample_claim_data):
+        """Test batch processing stores valid claims and reports invalid rows"""
+        mock_batch.return_value = [{
+            'success': True,
+            'status': 'denied',
+            'approval_required': False,
+            'ai_analysis': {'validation': {'status': 'Invalid', 'issues': ['Missing codes']}},
+            'parsed_analysis': {'validation': {'status': 'Invalid', 'issues': ['Missing codes']}}
+        }]
+        
+        response = client.post('/api/claims/process/batch',
+                             data=json.dumps({"claims": [sample_claim_data, {"patient_id": "x"}]}),
+                             content_type='application/json')
+        
+        assert response.status_code == 201
+        data = json.loads(response.data)
+        assert data['processed'] == 1
+        assert data['failed'] == 1
+        assert data['results'][0]['status'] == 'denied'
+        assert data['results'][0]['denial_reason'] == 'Missing codes'
+        assert data['results'][1]['success'] is False
+    
+    @patch('app.main.bedrock_service.generate_eob')
+    @patch('app.main.bedrock_service.process_claims_batch')
+    def test_process_batch_generates_eobs_for_approved_claims(self, mock_batch, mock_eob, client, sample_claim_data):
+        """Test approved batch rows get an EOB like single claim processing, denied rows do not"""
+        approved = {'success': True, 'status': 'approved', 'approval_required': False,
+                    'ai_analysis': {}, 'parsed_analysis': None}
+        denied = dict(approved, status='denied')
+        mock_batch.return_value = [approved, denied]
+        mock_eob.return_value = {
+            'success': True, 'eob_amount': 1200.0, 'status': 'approved', 'eob_date': '2025-01-10',
+            'insurance_company': 'Acme', 'ai_analysis': {}, 'denial_reasons': [], 'refile_required': False
+        }
+        
+        response = client.post('/api/claims/process/batch',
+                             data=json.dumps({"claims": [sample_claim_data, sample_claim_data]}),
+                             content_type='application/json')
+        
+        assert response.status_code == 201
+        results = json.loads(response.data)['results']
+        assert mock_eob.call_count == 1
+        assert results[1]['eob_id'] is None
+        from app.models import EOB
+        with app.app_context():
+            eob = EOB.query.get(results[0]['eob_id'])
+            assert eob.claim_id == results[0]['claim_id']
+            assert eob.pdf_url == f"/api/eobs/{eob.id}/pdf"
+    
+    @patch('app.main.bedrock_service.process_claims_batch')
+    def test_process_batch_rejects_invalid_amounts_per_row(self, mock_batch, client, sample_claim_data):
+        """Test rows with a non-numeric claim_amount are reported instead of failing the batch"""
+        mock_batch.return_value = [{
+            'success': True,
+            'status': 'pending_approval',
+            'approval_required': True,
+            'ai_analysis': {},
+            'parsed_analysis': None
+        }]
+        claims = [dict(sample_claim_data, claim_amount='abc'), dict(sample_claim_data, claim_amount='250.5'),
+                  dict(sample_claim_data, claim_amount=-5)]
+        
+        response = client.post('/api/claims/process/batch',
+                             data=json.dumps({"claims": claims}),
+                             content_type='application/json')
+        
+        assert response.status_code == 201
+        data = json.loads(response.data)
+        assert data['processed'] == 1 and data['failed'] == 2
+        assert data['results'][0]['error'] == 'claim_amount must be a number'
+        assert data['results'][1]['success'] is True
+        assert data['results'][2]['error'] == 'claim_amount must be a positive number'
+        assert mock_batch.call_args[0][0][0]['claim_amount'] == 250.5
+    
+    @patch('app.main.bedrock_service.process_claims_batch')
+    def test_process_batch_with_no_valid_rows_returns_400(self, mock_batch, client, sample_claim_data):
+        """Test a batch where every row fails validation is rejected before any AI call"""
+        response = client.post('/api/claims/process/batch',
+                             data=json.dumps({"claims": [dict(sample_claim_data, claim_amount=None)]}),
+                             content_type='application/json')
+        
+        assert response.status_code == 400
+        data = json.loads(response.data)
+        assert data['results'][0]['error'] == 'claim_amount must be a number'
+        mock_batch.assert_not_called()
+    
+    def test_process_batch_requires_claims(self, client):
+        """Test batch processing rejects an empty payload"""
+        response = client.post('/api/claims/process/batch',
+                             data=json.dumps({"claims": []}),
+                             content_type='application/json')
+        assert response.status_code == 400
+
 class TestClaimRetrieval:
     def test_get_claim_not_found(self, client):
         """Test getting non-existent claim"""
@@ -217,6 +403,72 @@ class TestClaimRetrieval:
         assert data['patient_id'] == "test-patient-id"
         assert data['claim_amount'] == 1500.00
 
+    @patch('app.main.claim_service.iter_claims')
+    def test_list_claims_with_decision_filters(self, mock_iter_claims, client):
+        """Test claim list filters are passed through to the indexed columns"""
+        mock_iter_claims.return_value = iter([])
+        
+        with client.get('/api/claims?fraud_risk_level=High&ai_parse_success=false&claim_type=Vision&unknown=x') as response:
+            assert response.status_code == 200
+        filters = mock_iter_claims.call_args[0][0]
+        assert filters == {'fraud_risk_level': 'high', 'ai_parse_success': False, 'claim_type': 'Vision'}
+
+    @patch('app.main.claim_service.list_claims')
+    def test_list_claims_page_and_projection(self, mock_list_claims, client):
+        """Test limit, cursor and fields are parsed and the next cursor is returned in a header"""
+        mock_list_claims.return_value = ([{'id': 'claim-1', 'status': 'approved'}], 'next-token')
+        
+        response = client.get('/api/claims?limit=1&cursor=abc&fields=id,status&created_after=2025-01-01')
+        assert response.status_code == 200
+        assert response.headers['X-Next-Cursor'] == 'next-token'
+        assert json.loads(response.data) == [{'id': 'claim-1', 'status': 'approved'}]
+        kwargs = mock_list_claims.call_args[1]
+        assert kwargs['limit'] == 1
+        assert kwargs['cursor'] == 'abc'
+        assert kwargs['fields'] == {'id', 'status'}
+        assert kwargs['created_after'].year == 2025
+        assert kwargs['as_rows'] is True
+
+    @patch('app.main.claim_service.iter_claims')
+    def test_unpaginated_list_is_streamed(self, mock_iter_claims, client):
+        """Test lists without a limit are streamed as a JSON array or as NDJSON"""
+        rows = [{'id': 'claim-1', 'ai_analysis': '{"a":1}'}, {'id': 'claim-2', 'ai_analysis': None}]
+        mock_iter_claims.side_effect = lambda *args, **kwargs: iter(rows)
+        
+        with client.get('/api/claims') as response:
+            assert response.is_streamed
+            assert json.loads(response.data) == [{'id': 'claim-1', 'ai_analysis': {'a': 1}},
+                                                 {'id': 'claim-2', 'ai_analysis': {}}]
+        
+        for url, headers in (('/api/claims?format=ndjson', {}), ('/api/claims', {'Accept': 'application/x-ndjson'})):
+            with client.get(url, headers=headers) as response:
+                assert response.mimetype == 'application/x-ndjson'
+                assert response.data == b'{"id":"claim-1","ai_analysis":{"a":1}}\n{"id":"claim-2","ai_analysis":{}}\n'
+
+    @patch('app.main.eob_service.iter_eobs')
+    def test_streamed_eobs_keep_envelope(self, mock_iter_eobs, client):
+        """Test the streamed EOB list keeps the {"eobs": [...]} envelope"""
+        mock_iter_eobs.return_value = iter([{'id': 'eob-1', 'eob_amount': 10.0}])
+        
+        with client.get('/api/eobs') as response:
+            assert json.loads(response.data) == {'eobs': [{'id': 'eob-1', 'eob_amount': 10.0}], 'next_cursor': None}
+
+    @patch('app.main.patient_service.iter_patients')
+    def test_export_command(self, mock_iter_patients):
+        """Test flask export writes every row as NDJSON"""
+        mock_iter_patients.return_value = iter([{'id': 'p1'}, {'id': 'p2'}])
+        
+        result = app.test_cli_runner().invoke(args=['export', 'patients'])
+        assert result.exit_code == 0
+        assert result.output == '{"id":"p1"}\n{"id":"p2"}\n'
+
+    def test_list_rejects_bad_arguments(self, client):
+        """Test invalid list arguments are reported as client errors"""
+        for url in ('/api/claims?limit=0', '/api/claims?fields=id,secret', '/api/patients?created_before=yesterday',
+                    '/api/eobs?cursor=not-a-cursor'):
+            response = client.get(url)
+            assert response.status_code == 400, url
+
 class TestClaimApproval:
     @patch('app.main.claim_service.approve_claim')
     def test_approve_claim_success(self, mock_approve, client):
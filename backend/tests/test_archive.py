@@ -0,0 +1,88 @@
+import pytest
+import os
+import sys
+from datetime import datetime, timedelta
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from app.services import ClaimService, EOBService
+from app.models import Claim, EOB
+from app import statistics
+
+
+class TestClaimArchive:
+    def _archive(self, tmp_path):
+        from app.archive import ClaimArchive
+        return ClaimArchive(str(tmp_path / 'archive'), after_days=30, batch_size=2)
+
+    def test_moves_closed_claims_into_monthly_files(self, memory_db, tmp_path):
+        """Test closed claims and their EOBs leave the hot tables, partitioned by claim month"""
+        archive = self._archive(tmp_path)
+        memory_db.session.get(Claim, 'claim-2').status = 'pending_approval'
+        memory_db.session.get(Claim, 'claim-6').created_at = datetime(2025, 2, 3)
+        memory_db.session.commit()
+        later = datetime.utcnow() + timedelta(days=60)
+        assert archive.archive_closed_claims(dry_run=True, now=later)['claims'] == 6
+        assert archive.archive_closed_claims(now=datetime.utcnow())['claims'] == 0
+
+        result = archive.archive_closed_claims(now=later)
+        assert (result['claims'], result['eobs'], result['retried']) == (6, 6, 0)
+        assert result['partitions'] == ['2025-01', '2025-02']
+        assert [claim.id for claim in Claim.query] == ['claim-2']
+        assert [eob.id for eob in EOB.query] == ['eob-2']
+        assert sorted(os.listdir(tmp_path / 'archive')) == ['claims-2025-01.sqlite', 'claims-2025-02.sqlite']
+
+    def test_lookups_by_id_read_archived_records(self, memory_db, tmp_path):
+        """Test get_claim and get_eob fall back to the archive only when asked to"""
+        archive = self._archive(tmp_path)
+        claim_before = memory_db.session.get(Claim, 'claim-3').to_dict()
+        eob_before = EOBService().get_eob('eob-3').to_dict()
+        memory_db.session.expunge_all()
+        archive.archive_closed_claims(now=datetime.utcnow() + timedelta(days=60))
+        with patch('app.services.claim_archive', archive):
+            assert ClaimService().get_claim('claim-3') is None
+            assert ClaimService().get_claim('claim-3', include_archived=True).to_dict() == claim_before
+            assert EOBService().get_eob('eob-3', include_archived=True).to_dict() == eob_before
+            assert ClaimService().get_claim('missing', include_archived=True) is None
+
+    def test_statistics_keep_counting_archived_claims(self, memory_db, tmp_path):
+        """Test archival leaves the counters alone and rebuild counts the archive index"""
+        before = statistics.read_statistics()
+        self._archive(tmp_path).archive_closed_claims(now=datetime.utcnow() + timedelta(days=60))
+        assert statistics.read_statistics() == before
+        statistics.rebuild(memory_db.session.connection())
+        memory_db.session.commit()
+        assert {k: v for k, v in statistics.read_statistics().items() if v} == {k: v for k, v in before.items() if v}
+
+
+    def test_retried_batch_does_not_duplicate_archived_rows(self, memory_db, tmp_path):
+        """Test archiving a claim that is already archived replaces its index entries and archived rows"""
+        import sqlite3
+        from app.models import ArchivedClaim, ArchivedEOB
+        archive = self._archive(tmp_path)
+        later = datetime.utcnow() + timedelta(days=60)
+        claim_row = dict(memory_db.session.execute(Claim.__table__.select().where(Claim.id == 'claim-3')).mappings().one())
+        eob_row = dict(memory_db.session.execute(EOB.__table__.select().where(EOB.id == 'eob-3')).mappings().one())
+        archive.archive_closed_claims(now=later)
+
+        # The batch's hot rows are back, as if the delete had not landed before the run was retried
+        memory_db.session.execute(Claim.__table__.insert().values(**claim_row))
+        memory_db.session.execute(EOB.__table__.insert().values(**eob_row))
+        memory_db.session.commit()
+        result = archive.archive_closed_claims(now=later)
+
+        assert (result['claims'], result['eobs']) == (1, 1)
+        assert ArchivedClaim.query.filter_by(id='claim-3').count() == 1
+        assert ArchivedEOB.query.filter_by(id='eob-3').count() == 1
+        assert ArchivedClaim.query.count() == 7
+        conn = sqlite3.connect(archive.path('2025-01'))
+        try:
+            assert conn.execute("SELECT COUNT(*) FROM claims WHERE id = 'claim-3'").fetchone()[0] == 1
+            assert conn.execute("SELECT COUNT(*) FROM eobs WHERE id = 'eob-3'").fetchone()[0] == 1
+        finally:
+            conn.close()
+
+
+if __name__ == '__main__':
+    pytest.main([__file__])
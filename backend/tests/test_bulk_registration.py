@@ -0,0 +1,56 @@
+import pytest
+import os
+import sys
+import threading
+import time
+from datetime import timedelta
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from app.services import BedrockService
+from app.models import Patient
+from app import activity, statistics
+from tests.query_counter import QueryCounter
+
+
+class TestBulkPatientRegistration:
+    def test_registrations_run_with_bounded_parallelism(self):
+        """Test bulk registrations keep at most the configured number in flight and return results in order"""
+        service = BedrockService()
+        service.bulk_registration_concurrency = 3
+        lock = threading.Lock()
+        state = {'in_flight': 0, 'peak': 0}
+
+        def register(patient_data):
+            with lock:
+                state['in_flight'] += 1
+                state['peak'] = max(state['peak'], state['in_flight'])
+            time.sleep(0.01 * (patient_data['n'] % 3))
+            with lock:
+                state['in_flight'] -= 1
+            return {'success': True, 'ai_analysis': {'n': patient_data['n']}}
+
+        with patch.object(service, 'process_patient_registration', side_effect=register):
+            results = service.process_patient_registrations([{'n': n} for n in range(20)])
+        assert [result['ai_analysis']['n'] for result in results] == list(range(20))
+        assert 1 < state['peak'] <= 3
+
+    def test_create_patients_inserts_in_one_statement_and_counts(self, memory_db):
+        """Test bulk inserts use executemany and still move the statistics and activity counters"""
+        from app.services import PatientService
+        rows = [{'first_name': f'P{i}', 'last_name': 'Bulk', 'email': f'p{i}@example.com', 'phone': '1',
+                 'date_of_birth': '1990-01-01', 'insurance_id': 'INS', 'insurance_provider': 'Acme',
+                 'ai_analysis': '{"risk": "low"}'} for i in range(50)]
+        with QueryCounter(memory_db.engine) as counter:
+            ids = PatientService().create_patients(rows)
+        assert len([sql for sql in counter.statements if sql.startswith('INSERT INTO patients')]) == 1
+        assert memory_db.session.query(Patient).count() == 51
+        assert memory_db.session.get(Patient, ids[0]).get_ai_analysis() == {'risk': 'low'}
+        assert statistics.read_statistics()[statistics.PATIENTS_TOTAL] == 51
+        assert activity.window_totals(timedelta(hours=1))[activity.PATIENTS_REGISTERED] == 51
+        assert PatientService().existing_emails({'p3@example.com', 'new@example.com'}) == {'p3@example.com'}
+
+
+if __name__ == '__main__':
+    pytest.main([__file__])
@@ -0,0 +1,71 @@
+import pytest
+import json
+import os
+import sys
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from app.models import claim_decision_fields
+
+
+class TestClaimDecisionColumns:
+    def test_decision_fields_are_normalized(self):
+        """Test parsed analyses map onto lower-cased decision columns"""
+        fields = claim_decision_fields({
+            'validation': {'status': 'Valid'},
+            'coverageCheck': {'coverageDecision': 'Pending Review'},
+            'fraudRiskAssessment': {'riskLevel': ' High ', 'recommendation': 'Manual Review Required'}
+        })
+        assert fields == {
+            'validation_status': 'valid',
+            'coverage_decision': 'pending review',
+            'fraud_risk_level': 'high',
+            'ai_recommendation': 'manual review required',
+            'ai_parse_success': True
+        }
+
+    def test_unparsed_or_failed_analysis(self):
+        """Test missing and error analyses are flagged as parse failures"""
+        assert claim_decision_fields(None)['ai_parse_success'] is False
+        assert claim_decision_fields({'error': 'Batch analysis failed'})['ai_parse_success'] is False
+        assert claim_decision_fields({'validation': 'Valid'})['validation_status'] is None
+
+    def test_migration_backfills_in_batches(self, load_revision):
+        """Test the decision-column migration fills existing rows across several batches"""
+        import sqlalchemy as sa
+        migration = load_revision('0001_claim_decision_columns.py')
+
+        analysis = {'analysis': '<reasoning>r</reasoning>' + json.dumps({
+            'validation': {'status': 'Invalid'}, 'fraudRiskAssessment': {'riskLevel': 'Low'}})}
+        engine = sa.create_engine('sqlite://')
+        with engine.begin() as connection:
+            connection.execute(sa.text(
+                'CREATE TABLE claims (id TEXT PRIMARY KEY, ai_analysis TEXT, validation_status TEXT, '
+                'coverage_decision TEXT, fraud_risk_level TEXT, ai_recommendation TEXT, ai_parse_success BOOLEAN)'))
+            connection.execute(sa.text('INSERT INTO claims (id, ai_analysis) VALUES (:id, :a)'),
+                               [{'id': f'c{i}', 'a': json.dumps(analysis)} for i in range(5)] +
+                               [{'id': 'bad', 'a': '"not json'}, {'id': 'empty', 'a': None}])
+            migration.backfill(connection, batch_size=2)
+            rows = dict(connection.execute(sa.text(
+                'SELECT id, validation_status || "/" || fraud_risk_level || "/" || ai_parse_success FROM claims'
+            )).fetchall())
+            unparsed = connection.execute(sa.text(
+                "SELECT ai_parse_success FROM claims WHERE id IN ('bad', 'empty') ORDER BY id")).fetchall()
+        assert rows['c4'] == 'invalid/low/1'
+        assert unparsed == [(0,), (None,)]
+
+    def test_startup_upgrade_is_opt_in(self, monkeypatch):
+        """Test apply_migrations only upgrades when DB_AUTO_MIGRATE is set"""
+        from app import database
+        monkeypatch.delenv('DB_AUTO_MIGRATE', raising=False)
+        with patch.object(database, 'upgrade') as mock_upgrade:
+            database.apply_migrations()
+            mock_upgrade.assert_not_called()
+            monkeypatch.setenv('DB_AUTO_MIGRATE', 'true')
+            database.apply_migrations()
+            mock_upgrade.assert_called_once()
+
+
+if __name__ == '__main__':
+    pytest.main([__file__])
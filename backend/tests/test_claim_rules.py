@@ -0,0 +1,73 @@
+import pytest
+import os
+import sys
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from app.claim_rules import ClaimRule, ClaimRulesEngine
+from app.services import BedrockService
+
+
+class TestClaimRules:
+    def _engine(self):
+        return ClaimRulesEngine([
+            ClaimRule('non_positive_amount', 'deny', 'Amount must be positive', max_amount=0),
+            ClaimRule('unknown_patient', 'deny', 'Patient is not registered', unknown_patient=True),
+            ClaimRule('small_routine', 'approve', 'Routine', claim_types=['routine'], min_amount=0.01, max_amount=250)
+        ])
+
+    def test_first_matching_rule_decides(self):
+        """Test zero amounts, unknown patients and small routine claims are decided by rules"""
+        engine = self._engine()
+        known = lambda patient_id: patient_id == 'p-1'
+
+        zero = engine.evaluate({'patient_id': 'p-1', 'claim_amount': 0, 'claim_type': 'routine'}, known)
+        unknown = engine.evaluate({'patient_id': 'p-2', 'claim_amount': 50, 'claim_type': 'routine'}, known)
+        routine = engine.evaluate({'patient_id': 'p-1', 'claim_amount': 50, 'claim_type': 'routine'}, known)
+        major = engine.evaluate({'patient_id': 'p-1', 'claim_amount': 5000, 'claim_type': 'major_medical'}, known)
+
+        assert zero['ruleEngine']['rule'] == 'non_positive_amount'
+        assert unknown['ruleEngine']['rule'] == 'unknown_patient'
+        assert routine['ruleEngine']['decision'] == 'approve'
+        assert major is None
+        stats = engine.get_stats()
+        assert stats['evaluated'] == 4
+        assert stats['skip_rate'] == 75.0
+
+    def test_engine_and_auto_approval_are_opt_in(self):
+        """Test the engine is off by default and the default rules only deny unless auto-approval is set"""
+        with patch.dict(os.environ, {}, clear=False):
+            for name in ('CLAIM_RULES_ENABLED', 'CLAIM_RULES_AUTO_APPROVE', 'CLAIM_RULES_PATH'):
+                os.environ.pop(name, None)
+            default = ClaimRulesEngine.from_env()
+            os.environ['CLAIM_RULES_ENABLED'] = 'true'
+            deny_only = ClaimRulesEngine.from_env()
+            os.environ['CLAIM_RULES_AUTO_APPROVE'] = 'true'
+            auto_approve = ClaimRulesEngine.from_env()
+
+        routine = {'patient_id': 'p-1', 'claim_amount': 50, 'claim_type': 'routine'}
+        known = lambda patient_id: True
+        assert default.enabled is False
+        assert default.evaluate(routine, known) is None
+        assert {rule.decision for rule in deny_only.rules} == {'deny'}
+        assert deny_only.evaluate(routine, known) is None
+        assert auto_approve.evaluate(routine, known)['ruleEngine']['rule'] == 'small_routine_claim'
+
+    def test_rule_decision_skips_model_with_claim_analysis_shape(self):
+        """Test process_claim returns the usual result shape without calling Bedrock"""
+        service = BedrockService()
+        service.claim_rules = self._engine()
+        with patch.object(service, '_patient_exists', return_value=True), \
+                patch.object(service, '_invoke_bedrock') as mock_invoke:
+            approved = service.process_claim({'patient_id': 'p-1', 'claim_amount': 40, 'claim_type': 'routine'})
+            denied = service.process_claim({'patient_id': 'p-1', 'claim_amount': 0, 'claim_type': 'dental'})
+
+        mock_invoke.assert_not_called()
+        assert (approved['status'], approved['approval_required']) == ('approved', False)
+        assert denied['status'] == 'denied'
+        assert denied['ai_analysis']['validation']['issues'] == ['Amount must be positive']
+
+
+if __name__ == '__main__':
+    pytest.main([__file__])
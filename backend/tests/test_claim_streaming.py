@@ -0,0 +1,115 @@
+import pytest
+import json
+import os
+import sys
+from unittest.mock import patch, MagicMock
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from app.ai_cache import ResponseCache
+from app.ai_executor import AIExecutor
+from app.model_router import ModelRouter
+from app.claim_rules import ClaimRulesEngine
+from app.services import BedrockService
+
+
+class TestClaimStreaming:
+    DELTAS = [
+        '<reasoning>check', ' coverage</reasoning>',
+        '{"validation": {"status": "Valid"}, ',
+        '"coverageCheck": {"coverageDecision": "Approved"}, ',
+        '"fraudRiskAssessment": {"recommendation": "Approve"}}'
+    ]
+
+    def _service(self, deltas):
+        service = BedrockService()
+        service.router = ModelRouter({'fast': 'openai.gpt-oss-20b-1:0', 'standard': 'openai.gpt-oss-120b-1:0'})
+        service.claim_rules = ClaimRulesEngine([], enabled=False)
+        service.response_cache = ResponseCache(max_entries=10, ttl_seconds=60)
+        stream = [
+            {'chunk': {'bytes': json.dumps({'choices': [{'delta': {'content': d}}]}).encode('utf-8')}}
+            for d in deltas
+        ]
+        service.bedrock_client = MagicMock()
+        service.bedrock_client.invoke_model_with_response_stream.return_value = {'body': stream}
+        return service
+
+    def test_stream_reports_reasoning_json_and_decision(self):
+        """Test process_claim_stream emits progress events from stream deltas"""
+        service = self._service(self.DELTAS)
+
+        events = list(service.process_claim_stream({'patient_id': 'p-1', 'claim_amount': 10}))
+
+        assert [e for e, _ in events] == ['started', 'reasoning_started', 'json_started', 'decision']
+        assert events[-1][1]['status'] == 'approved'
+        assert events[-1][1]['approval_required'] is False
+
+    def test_markers_split_across_deltas(self):
+        """Test markers and the JSON start are found when every delta is a single character"""
+        text = ''.join(self.DELTAS)
+        service = self._service(list(text))
+        events = dict(service.process_claim_stream({'patient_id': 'p-1', 'claim_amount': 10}))
+        assert events['reasoning_started'] == {'received_chars': len('<reasoning>')}
+        assert events['json_started'] == {'received_chars': text.index('{') + 1}
+        assert events['decision']['status'] == 'approved'
+
+    def test_batch_packs_claims_and_maps_results(self):
+        """Test process_claims_batch sends one call per pack and maps results by index"""
+        service = BedrockService()
+        service.batch_pack_size = 2
+        service.claim_rules = ClaimRulesEngine([], enabled=False)
+        service.executor = AIExecutor(max_concurrency=2, per_model_concurrency=2)
+        approve = {'validation': {'status': 'Valid'}, 'coverageCheck': {'coverageDecision': 'Approved'},
+                   'fraudRiskAssessment': {'recommendation': 'Approve'}}
+        deny = {'validation': {'status': 'Invalid', 'issues': ['Duplicate']}}
+        first_pack = {'analysis': '<reasoning>x</reasoning>' + json.dumps({'results': [dict(approve, index=0), dict(deny, index=1)]})}
+
+        def respond(prompt, task):
+            return first_pack if 'p-0' in prompt else {'results': []}
+
+        claims = [{'patient_id': f'p-{i}', 'claim_amount': 10, 'claim_type': 'dental', 'description': 'x'} for i in range(3)]
+
+        with patch.object(service, '_invoke_bedrock', side_effect=respond) as mock_invoke:
+            results = service.process_claims_batch(claims)
+
+        assert mock_invoke.call_count == 2
+        assert [r['status'] for r in results] == ['approved', 'denied', 'pending_approval']
+        assert 'error' in results[2]['ai_analysis']
+        service.executor.shutdown()
+
+    def test_batch_pack_size_fits_max_tokens(self):
+        """Test the configured pack size is clamped so each packed response fits in max_tokens"""
+        service = BedrockService()
+        service.claim_rules = ClaimRulesEngine([], enabled=False)
+        service.executor = AIExecutor(max_concurrency=2, per_model_concurrency=2)
+        service.generation_params = dict(service.generation_params, max_tokens=1000)
+        service.batch_pack_size = 10
+        assert service.max_batch_pack_size() == 3
+        claims = [{'patient_id': f'p-{i}', 'claim_amount': 10, 'claim_type': 'dental', 'description': 'x'} for i in range(7)]
+
+        with patch.object(service, '_invoke_bedrock', return_value={'results': []}) as mock_invoke:
+            service.process_claims_batch(claims)
+
+        assert mock_invoke.call_count == 3
+        service.executor.shutdown()
+
+    def test_batch_maps_string_indexes(self):
+        """Test results whose index the model returned as a string still reach their claim"""
+        service = BedrockService()
+        service.claim_rules = ClaimRulesEngine([], enabled=False)
+        service.executor = AIExecutor(max_concurrency=2, per_model_concurrency=2)
+        approve = {'validation': {'status': 'Valid'}, 'coverageCheck': {'coverageDecision': 'Approved'},
+                   'fraudRiskAssessment': {'recommendation': 'Approve'}}
+        deny = {'validation': {'status': 'Invalid', 'issues': ['Duplicate']}}
+        response = {'results': [dict(deny, index='1'), dict(approve, index='0')]}
+        claims = [{'patient_id': f'p-{i}', 'claim_amount': 10, 'claim_type': 'dental', 'description': 'x'} for i in range(2)]
+
+        with patch.object(service, '_invoke_bedrock', return_value=response):
+            results = service.process_claims_batch(claims)
+
+        assert [r['status'] for r in results] == ['approved', 'denied']
+        service.executor.shutdown()
+
+
+if __name__ == '__main__':
+    pytest.main([__file__])
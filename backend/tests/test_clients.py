@@ -0,0 +1,55 @@
+import pytest
+import os
+import sys
+import threading
+from unittest.mock import patch, MagicMock
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from app.clients import ClientRegistry
+from app.resilience import ResilienceRegistry
+from app.services import BedrockService
+
+
+class TestAWSClientRegistry:
+    def test_clients_are_built_once_with_tuned_config(self):
+        """Test the registry reuses one client per service and region"""
+        registry = ClientRegistry(max_pool_connections=32, connect_timeout=2, read_timeout=20)
+        with patch('app.clients.boto3.client', side_effect=lambda *a, **k: MagicMock()) as mock_client:
+            first = registry.get('bedrock-runtime', 'us-east-1')
+            assert registry.get('bedrock-runtime', 'us-east-1') is first
+            assert registry.get('bedrock-runtime', 'us-west-2') is not first
+
+        assert mock_client.call_count == 2
+        config = mock_client.call_args.kwargs['config']
+        assert config.max_pool_connections == 32
+        assert config.connect_timeout == 2
+        assert config.tcp_keepalive is True
+        stats = registry.get_stats()
+        assert stats['created'] == 2
+        assert stats['reused'] == 1
+
+    def test_concurrent_first_use_builds_one_client(self):
+        """Test threads racing on first use share a single client"""
+        registry = ClientRegistry()
+        with patch('app.clients.boto3.client', side_effect=lambda *a, **k: MagicMock()) as mock_client:
+            threads = [threading.Thread(target=registry.get, args=('lambda', 'us-east-1')) for _ in range(8)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        assert mock_client.call_count == 1
+
+    def test_services_share_clients(self):
+        """Test BedrockService instances and the Lambda fallback reuse registry clients"""
+        first, second = BedrockService(), BedrockService()
+        assert first.bedrock_client is second.bedrock_client
+        with patch('app.services.get_aws_client') as mock_get:
+            mock_get.return_value.invoke.side_effect = RuntimeError('offline')
+            first.resilience = ResilienceRegistry(sleep=lambda s: None)
+            first._call_lambda_boto3('hello')
+        mock_get.assert_called_once_with('lambda')
+
+
+if __name__ == '__main__':
+    pytest.main([__file__])
@@ -0,0 +1,64 @@
+import pytest
+import os
+import sys
+import time
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from app.db_profiles import PostgresProfile, SQLiteProfile, select_profile
+
+
+class TestEngineProfiles:
+    def test_profile_selection(self):
+        """Test the profile follows the database URL unless disabled or overridden"""
+        assert isinstance(select_profile('sqlite:///app.db'), SQLiteProfile)
+        assert isinstance(select_profile('postgresql://u@db/app'), PostgresProfile)
+        assert select_profile('sqlite:///app.db', 'none') is None
+        assert select_profile('mysql://u@db/app') is None
+        with pytest.raises(ValueError):
+            select_profile('sqlite:///app.db', 'postgresql')
+        with pytest.raises(ValueError):
+            select_profile('sqlite:///app.db', 'turbo')
+
+    def test_postgres_engine_options(self):
+        """Test Postgres pool sizing and server-side timeouts come from the environment"""
+        with patch.dict(os.environ, {'DB_POOL_SIZE': '4', 'DB_STATEMENT_TIMEOUT_MS': '1500'}):
+            options = PostgresProfile.from_env().engine_options()
+        assert options['pool_size'] == 4 and options['max_overflow'] == 20 and options['pool_pre_ping'] is True
+        assert '-c statement_timeout=1500' in options['connect_args']['options']
+        assert '-c lock_timeout=5000' in options['connect_args']['options']
+
+    def test_sqlite_pragmas_and_concurrent_writers(self, tmp_path, capsys):
+        """Test init_db applies the SQLite PRAGMAs and concurrent writers wait instead of failing"""
+        from concurrent.futures import ThreadPoolExecutor
+        from flask import Flask
+        import sqlalchemy as sa
+        from app.database import db, init_db
+        app = Flask(__name__)
+        with patch.dict(os.environ, {'DATABASE_URL': f"sqlite:///{tmp_path / 'profile.db'}"}):
+            init_db(app)
+        assert "Database engine profile 'sqlite'" in capsys.readouterr().out
+        with app.app_context():
+            engine = db.engine
+        with engine.connect() as connection:
+            settings = SQLiteProfile().effective_settings(connection)
+            connection.execute(sa.text('CREATE TABLE counters (id INTEGER PRIMARY KEY, value INTEGER)'))
+            connection.commit()
+        assert settings['journal_mode'] == 'wal'
+        assert settings['synchronous'] == 1 and settings['busy_timeout'] == 5000
+
+        def write(i):
+            with engine.begin() as connection:
+                connection.execute(sa.text('INSERT INTO counters (value) VALUES (:v)'), {'v': i})
+                time.sleep(0.01)
+
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            list(pool.map(write, range(40)))
+        with engine.connect() as connection:
+            assert connection.execute(sa.text('SELECT COUNT(*) FROM counters')).scalar() == 40
+        engine.dispose()
+
+
+if __name__ == '__main__':
+    pytest.main([__file__])
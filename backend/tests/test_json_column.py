@@ -0,0 +1,90 @@
+import pytest
+import json
+import os
+import sys
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from app.services import BedrockService
+from app.models import Patient, Claim, EOB
+from app.json_column import JSONText, json_field
+
+
+class TestJSONColumns:
+    def test_decode_is_cached_until_the_text_changes(self):
+        """Test documents are decoded once per stored value and re-decoded after set or assignment"""
+        claim = Claim(patient_id='p1', claim_amount=1.0, claim_type='routine', description='d',
+                      ai_analysis={'status': 'success'})
+        with patch('app.json_column.json.loads', wraps=json.loads) as mock_loads:
+            assert claim.get_ai_analysis() is claim.get_ai_analysis()
+            assert mock_loads.call_count == 1
+            claim.set_ai_analysis({'status': 'error'})
+            assert claim.get_ai_analysis() == {'status': 'error'}
+            claim.ai_analysis = json.dumps({'status': 'retry'})
+            assert claim.get_ai_analysis() == {'status': 'retry'}
+            assert mock_loads.call_count == 3
+        claim.set_ai_analysis({})
+        assert claim.ai_analysis is None and claim.get_ai_analysis() == {}
+        assert claim.get_ai_suggestions() == {}
+
+    def test_reload_invalidates_cache(self, memory_db):
+        """Test a refresh from the database replaces the cached document"""
+        claim = memory_db.session.get(Claim, 'claim-1')
+        assert claim.get_ai_analysis() == {'analysis': 'x' * 100}
+        memory_db.session.execute(
+            Claim.__table__.update().where(Claim.id == 'claim-1').values(ai_analysis='{"analysis": "new"}'))
+        memory_db.session.refresh(claim)
+        assert claim.get_ai_analysis() == {'analysis': 'new'}
+
+    def test_json_field_filters_in_sql(self, memory_db):
+        """Test json_field reads keys inside stored documents with the SQLite JSON1 functions"""
+        eob = memory_db.session.get(EOB, 'eob-2')
+        eob.set_ai_analysis({'coverage': {'decision': 'partial'}})
+        memory_db.session.commit()
+        matches = EOB.query.filter(json_field(EOB.ai_analysis, 'coverage', 'decision') == 'partial').all()
+        assert [match.id for match in matches] == ['eob-2']
+        assert Claim.query.filter(json_field(Claim.ai_analysis, 'analysis').isnot(None)).count() == 7
+        with pytest.raises(ValueError):
+            json_field(Claim.ai_analysis)
+
+    def test_agent_status_counts_patient_errors_in_sql(self, memory_db):
+        """Test the patient agent success rate comes from one SQL aggregate over the stored documents"""
+        patient = Patient(first_name='Err', last_name='Patient', email='e@example.com', phone='2',
+                          date_of_birth='1980-01-01', insurance_id='INS2', insurance_provider='Acme',
+                          ai_analysis={'error': 'Bedrock unavailable'})
+        memory_db.session.add(patient)
+        memory_db.session.get(Patient, 'patient-1').set_ai_analysis({'riskScore': 10})
+        memory_db.session.commit()
+        status = BedrockService().get_agent_status()
+        assert status['patient_registration_agent']['success_rate'] == '50.0%'
+
+    def test_postgres_mapping(self):
+        """Test the column is JSONB on Postgres and attributes stay JSON text"""
+        from sqlalchemy.dialects import postgresql
+        from sqlalchemy.dialects.postgresql import JSONB
+        dialect = postgresql.dialect()
+        column = JSONText()
+        assert isinstance(column.load_dialect_impl(dialect), JSONB)
+        assert column.process_bind_param('{"a": [1]}', dialect) == {'a': [1]}
+        assert json.loads(column.process_result_value({'a': [1]}, dialect)) == {'a': [1]}
+        import sqlalchemy as sa
+        statement = sa.select(EOB.id).where(json_field(EOB.ai_analysis, 'coverage', 'decision') == 'partial')
+        sql = str(statement.compile(dialect=dialect))
+        assert 'jsonb_extract_path_text(eobs.ai_analysis, %(param_1)s::VARCHAR, %(param_2)s::VARCHAR)' in sql
+        assert 'json_extract' not in sql
+
+    def test_postgres_selects_documents_as_text(self):
+        """Test JSONB documents are read as text on Postgres so the driver never decodes them"""
+        import sqlalchemy as sa
+        from sqlalchemy.dialects import postgresql, sqlite
+        statement = sa.select(Claim).where(json_field(Claim.ai_analysis, 'validation', 'status') == 'valid')
+        sql = str(statement.compile(dialect=postgresql.dialect()))
+        assert 'CAST(claims.ai_analysis AS TEXT) AS ai_analysis' in sql
+        assert 'CAST(claims.ai_suggestions AS TEXT) AS ai_suggestions' in sql
+        assert 'jsonb_extract_path_text(claims.ai_analysis,' in sql
+        assert 'CAST' not in str(statement.compile(dialect=sqlite.dialect()))
+
+
+if __name__ == '__main__':
+    pytest.main([__file__])
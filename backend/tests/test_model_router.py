@@ -0,0 +1,44 @@
+import pytest
+import os
+import sys
+from unittest.mock import MagicMock
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from app.ai_cache import ResponseCache
+from app.resilience import ResilienceRegistry, RetryPolicy
+from app.model_router import ModelRouter
+from app.services import BedrockService
+from tests.bedrock_stubs import bedrock_body, throttle_error
+
+
+class TestModelRouter:
+    def test_tasks_route_to_their_tier(self):
+        """Test cheap tasks go to the fast tier and adjudication to the standard tier"""
+        router = ModelRouter({'fast': 'small', 'standard': 'large'}, task_tiers={'suggestions': 'standard'},
+                             fallback_model_id='backup')
+        assert router.route('patient_registration') == ['small', 'backup']
+        assert router.route('claim_processing') == ['large', 'backup']
+        assert router.route('suggestions') == ['large', 'backup']
+        assert router.route('unknown_task') == ['large', 'backup']
+
+    def test_throttled_primary_falls_back(self):
+        """Test a throttled primary model is retried on the fallback model and latency recorded"""
+        service = BedrockService()
+        service.response_cache = ResponseCache(max_entries=10, ttl_seconds=60)
+        service.router = ModelRouter({'fast': 'openai.gpt-oss-20b-1:0', 'standard': 'openai.gpt-oss-120b-1:0'},
+                                     fallback_model_id='openai.gpt-oss-backup')
+        service.resilience = ResilienceRegistry(retry_policy=RetryPolicy(max_attempts=1), sleep=lambda s: None)
+        service.bedrock_client = MagicMock()
+        service.bedrock_client.invoke_model.side_effect = [throttle_error(), bedrock_body('{"ok": true}')]
+
+        assert service._invoke_bedrock('prompt', task='patient_registration') == {'ok': True}
+        called = [c.kwargs['modelId'] for c in service.bedrock_client.invoke_model.call_args_list]
+        assert called == ['openai.gpt-oss-20b-1:0', 'openai.gpt-oss-backup']
+        routes = service.router.get_stats()['routes']
+        assert routes['patient_registration->openai.gpt-oss-20b-1:0']['errors'] == 1
+        assert routes['patient_registration->openai.gpt-oss-backup']['fallbacks'] == 1
+
+
+if __name__ == '__main__':
+    pytest.main([__file__])
@@ -0,0 +1,83 @@
+import pytest
+import os
+import sys
+from datetime import datetime
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from app.services import ClaimService, EOBService
+from app.models import EOB
+from app.pagination import ListQueryError, decode_cursor
+from tests.query_counter import QueryCounter, assert_max_queries
+
+
+class TestListPagination:
+    def test_pages_cover_every_row_once(self, memory_db):
+        """Test following cursors visits every claim exactly once, newest first"""
+        service = ClaimService()
+        seen, cursor = [], None
+        while True:
+            claims, cursor = service.list_claims(cursor=cursor, limit=3)
+            seen.extend(claim.id for claim in claims)
+            if not cursor:
+                break
+        assert seen == ['claim-6', 'claim-5', 'claim-4', 'claim-3', 'claim-2', 'claim-1', 'claim-0']
+        all_claims, next_cursor = service.list_claims()
+        assert [claim.id for claim in all_claims] == seen and next_cursor is None
+
+    def test_filters_and_date_range(self, memory_db):
+        """Test column filters and the created_at range combine with paging"""
+        claims, _ = ClaimService().list_claims({'claim_type': 'vision', 'status': 'approved'},
+                                               created_after=datetime(2025, 1, 2),
+                                               created_before=datetime(2025, 1, 6))
+        assert [claim.id for claim in claims] == ['claim-1']
+
+    def test_projection_defers_blobs(self, memory_db):
+        """Test unrequested large columns are not loaded and not serialized"""
+        from sqlalchemy import inspect
+        claims, _ = ClaimService().list_claims(limit=1, fields={'id', 'status'})
+        assert 'ai_analysis' in inspect(claims[0]).unloaded
+        assert claims[0].to_dict({'id', 'status'}) == {'id': 'claim-6', 'status': 'denied'}
+
+    def test_invalid_cursor(self):
+        """Test malformed cursors raise ListQueryError"""
+        with pytest.raises(ListQueryError):
+            decode_cursor('not-a-cursor')
+
+
+class TestEOBQueries:
+    def test_list_serializes_in_one_query(self, memory_db):
+        """Test listing and serializing EOBs loads patient names and claim amounts without N+1 queries"""
+        with assert_max_queries(memory_db.engine, 1):
+            eobs, _ = EOBService().list_eobs()
+            data = [eob.to_dict() for eob in eobs]
+        assert len(data) == 7
+        assert data[0]['patient_name'] == 'Test Patient'
+        assert data[0]['claim_amount'] == 106.0
+
+    def test_projection_skips_joins(self, memory_db):
+        """Test lists that do not ask for related fields do not join patients or claims"""
+        with QueryCounter(memory_db.engine) as counter:
+            eobs, _ = EOBService().list_eobs(limit=3, fields={'id', 'eob_amount'})
+            [eob.to_dict({'id', 'eob_amount'}) for eob in eobs]
+        assert counter.count == 1
+        assert 'JOIN' not in counter.statements[0].upper()
+
+    def test_detail_serializes_in_one_query(self, memory_db):
+        """Test the detail path used by analyze, refile and PDF loads everything in one query"""
+        with assert_max_queries(memory_db.engine, 1):
+            eob = EOBService().get_eob('eob-3')
+            data = eob.to_dict()
+        assert data['patient_name'] == 'Test Patient'
+        assert data['claim_amount'] == 103.0
+        assert EOBService().get_eob('missing') is None
+
+    def test_query_counter_catches_lazy_loads(self, memory_db):
+        """Test the query-count helper fails when relationships are lazy loaded per row"""
+        with pytest.raises(AssertionError, match='Expected at most 1 queries'):
+            with assert_max_queries(memory_db.engine, 1):
+                [eob.to_dict() for eob in EOB.query.all()]
+
+
+if __name__ == '__main__':
+    pytest.main([__file__])
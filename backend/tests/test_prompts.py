@@ -0,0 +1,39 @@
+import pytest
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from app.prompts import PromptTemplate, prompts, estimate_tokens
+
+
+class TestPromptTemplates:
+    def test_compile_strips_indentation_and_blank_lines(self):
+        """Test templates are whitespace-minimized once at compile time"""
+        template = PromptTemplate('demo', """
+            Line one {value}
+
+            {{"key": "literal"}}
+        """)
+        assert template.text == 'Line one {value}\n{{"key": "literal"}}'
+        assert template.render(value='x') == 'Line one x\n{"key": "literal"}'
+        assert template.fields == ['value']
+        assert template.token_count == estimate_tokens('Line one \n{"key": "literal"}')
+
+    def test_budgeted_fields_are_truncated(self):
+        """Test long embedded context is cut to the field budget"""
+        template = PromptTemplate('demo', 'Context: {context}', budgets={'context': 10})
+        rendered = template.render(context='x' * 1000)
+        assert rendered.endswith('...[truncated]')
+        assert estimate_tokens(rendered) <= 10 + estimate_tokens('Context: ')
+
+    def test_every_service_prompt_is_registered(self):
+        """Test the registry reports token counts for all BedrockService prompts"""
+        described = prompts.describe()
+        for name in ['patient_registration', 'claim_processing', 'claim_batch', 'denial_analysis',
+                     'claim_suggestions', 'chatbot', 'eob_generation', 'eob_analysis', 'claim_refile']:
+            assert described[name]['tokens'] > 0
+
+
+if __name__ == '__main__':
+    pytest.main([__file__])
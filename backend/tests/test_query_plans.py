@@ -0,0 +1,190 @@
+import pytest
+import json
+import os
+import sys
+import uuid
+from datetime import datetime, timedelta
+
+import sqlalchemy as sa
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from app.models import Patient, Claim, EOB
+
+# The hot-query dataset size; set QUERY_PLAN_TEST_ROWS=1000000 for the full-volume check
+ROWS = int(os.getenv('QUERY_PLAN_TEST_ROWS', '20000'))
+POSTGRES_URL = os.getenv('TEST_POSTGRES_URL')
+TABLES = [Patient.__table__, Claim.__table__, EOB.__table__]
+NOW = datetime(2025, 6, 1, 12, 0, 0)
+
+
+def hot_queries():
+    """Query shapes issued by main.py and services.py, keyed by name
+
+    Returns {name: (statement, whole_table)}. Whole-table aggregates must use a
+    covering index on SQLite; Postgres may still choose a sequential scan for
+    them, which is the right plan when every row is read anyway.
+    """
+    patients, claims, eobs = TABLES
+    hour_ago = NOW - timedelta(hours=1)
+    return {
+        'total_patients': (sa.select(sa.func.count()).select_from(patients), True),
+        'claim_status_counts': (
+            sa.select(claims.c.status, sa.func.count()).group_by(claims.c.status), True),
+        'claim_parse_success_counts': (
+            sa.select(claims.c.ai_parse_success, sa.func.count())
+            .where(claims.c.ai_parse_success.isnot(None)).group_by(claims.c.ai_parse_success), True),
+        'approval_times': (
+            sa.select(claims.c.created_at, claims.c.approved_at)
+            .where(claims.c.status == 'approved', claims.c.approved_at.isnot(None)), False),
+        'recent_claim_failures': (
+            sa.select(sa.func.count(claims.c.id),
+                      sa.func.count(claims.c.id).filter(claims.c.ai_parse_success.isnot(True)))
+            .where(claims.c.created_at >= hour_ago), False),
+        'recent_claims_count': (
+            sa.select(sa.func.count()).select_from(claims).where(claims.c.created_at >= hour_ago), False),
+        'recent_patients_count': (
+            sa.select(sa.func.count()).select_from(patients).where(patients.c.created_at >= hour_ago), False),
+        'latest_claims': (sa.select(claims).order_by(claims.c.created_at.desc()).limit(5), False),
+        'latest_patients': (sa.select(patients).order_by(patients.c.created_at.desc()).limit(5), False),
+        'last_updated_claim': (sa.select(claims).order_by(claims.c.updated_at.desc()).limit(1), False),
+        'last_updated_patient': (sa.select(patients).order_by(patients.c.updated_at.desc()).limit(1), False),
+        'claims_by_status': (
+            sa.select(claims).where(claims.c.status == 'denied')
+            .order_by(claims.c.created_at.desc()).limit(50), False),
+        'claims_by_fraud_risk': (sa.select(claims).where(claims.c.fraud_risk_level == 'high'), False),
+        'patient_claims': (sa.select(claims).where(claims.c.patient_id == 'patient-1'), False),
+        'claim_eobs': (sa.select(eobs).where(eobs.c.claim_id == 'claim-1'), False),
+        'patient_eobs': (sa.select(eobs).where(eobs.c.patient_id == 'patient-1'), False),
+        'latest_eobs': (sa.select(eobs).order_by(eobs.c.created_at.desc()).limit(50), False),
+        'claims_keyset_page': (_keyset(claims), False),
+        'patients_keyset_page': (_keyset(patients), False),
+        'eobs_keyset_page': (_keyset(eobs), False),
+        'claims_by_type_keyset_page': (_keyset(claims).where(claims.c.claim_type == 'routine'), False),
+        'patient_claims_keyset_page': (_keyset(claims).where(claims.c.patient_id == 'patient-1'), False)
+    }
+
+
+def _keyset(table):
+    """The page-after-cursor query built by pagination.keyset_page"""
+    cursor = (NOW - timedelta(days=30), 'claim-5000')
+    return (sa.select(table).where(sa.tuple_(table.c.created_at, table.c.id) < sa.tuple_(*cursor))
+            .order_by(table.c.created_at.desc(), table.c.id.desc()).limit(51))
+
+
+def _synthetic_rows(rows):
+    """Claims spread over a year, with one patient per 10 claims and one EOB per 5"""
+    patient_count = max(1, rows // 10)
+    patients = [{
+        'id': f'patient-{i}', 'first_name': 'Test', 'last_name': f'Patient{i}', 'email': f'p{i}@example.com',
+        'phone': '+10000000000', 'date_of_birth': '1980-01-01', 'insurance_id': f'INS{i}',
+        'insurance_provider': 'Acme', 'created_at': NOW - timedelta(minutes=i * 50),
+        'updated_at': NOW - timedelta(minutes=i * 50)
+    } for i in range(patient_count)]
+    statuses = ['approved', 'denied', 'pending_approval', 'pending']
+    risks = ['low', 'medium', 'high']
+    claims = []
+    for i in range(rows):
+        created_at = NOW - timedelta(minutes=i * 5)
+        status = statuses[i % len(statuses)]
+        claims.append({
+            'id': f'claim-{i}', 'patient_id': f'patient-{i % patient_count}', 'claim_amount': 100.0 + i % 900,
+            'claim_type': 'routine', 'description': 'Synthetic claim', 'status': status,
+            'ai_analysis': '{}', 'approval_required': False, 'created_at': created_at, 'updated_at': created_at,
+            'approved_at': created_at + timedelta(hours=2) if status == 'approved' else None,
+            'fraud_risk_level': risks[i % len(risks)], 'ai_parse_success': i % 7 != 0
+        })
+    eobs = [{
+        'id': str(uuid.uuid4()), 'claim_id': f'claim-{i}', 'patient_id': f'patient-{i % patient_count}',
+        'eob_amount': 50.0, 'status': 'approved', 'eob_date': NOW.date(), 'insurance_company': 'Acme',
+        'refile_required': False, 'created_at': NOW - timedelta(minutes=i * 5),
+        'updated_at': NOW - timedelta(minutes=i * 5)
+    } for i in range(0, rows, 5)]
+    return patients, claims, eobs
+
+
+def _load(engine):
+    patients_table, claims_table, eobs_table = TABLES
+    Claim.metadata.drop_all(engine, tables=list(reversed(TABLES)))
+    Claim.metadata.create_all(engine, tables=TABLES)
+    patients, claims, eobs = _synthetic_rows(ROWS)
+    with engine.begin() as connection:
+        for table, rows in ((patients_table, patients), (claims_table, claims), (eobs_table, eobs)):
+            for start in range(0, len(rows), 10000):
+                connection.execute(table.insert(), rows[start:start + 10000])
+        connection.execute(sa.text('ANALYZE'))
+
+
+def _sqlite_full_scans(connection, statement):
+    sql = str(statement.compile(connection, compile_kwargs={'literal_binds': True}))
+    plan = [row[3] for row in connection.execute(sa.text(f'EXPLAIN QUERY PLAN {sql}'))]
+    # "SCAN claims" walks the table; "SCAN claims USING [COVERING] INDEX ..." walks an index
+    return [detail for detail in plan if detail.startswith('SCAN ') and ' USING ' not in detail], plan
+
+
+def _postgres_full_scans(connection, statement):
+    sql = str(statement.compile(connection, compile_kwargs={'literal_binds': True}))
+    plan = connection.execute(sa.text(f'EXPLAIN (FORMAT JSON) {sql}')).scalar()
+    plan = json.loads(plan) if isinstance(plan, str) else plan
+    scans = []
+
+    def walk(node):
+        if node.get('Node Type') == 'Seq Scan':
+            scans.append(f"Seq Scan on {node.get('Relation Name')}")
+        for child in node.get('Plans', []):
+            walk(child)
+
+    walk(plan[0]['Plan'])
+    return scans, plan
+
+
+@pytest.fixture(scope='module', params=['sqlite', 'postgres'])
+def loaded_engine(request):
+    if request.param == 'postgres':
+        if not POSTGRES_URL:
+            pytest.skip('TEST_POSTGRES_URL not set')
+        engine = sa.create_engine(POSTGRES_URL)
+    else:
+        engine = sa.create_engine('sqlite://')
+    _load(engine)
+    yield request.param, engine
+    if request.param == 'postgres':
+        Claim.metadata.drop_all(engine, tables=list(reversed(TABLES)))
+    engine.dispose()
+
+
+class TestHotQueryPlans:
+    @pytest.mark.parametrize('name', sorted(hot_queries()))
+    def test_hot_query_avoids_table_scan(self, loaded_engine, name):
+        """Test each hot query is answered from an index rather than a full table scan"""
+        dialect, engine = loaded_engine
+        statement, whole_table = hot_queries()[name]
+        if dialect == 'postgres' and whole_table:
+            pytest.skip('Postgres may sequentially scan whole-table aggregates')
+        with engine.connect() as connection:
+            if dialect == 'sqlite':
+                scans, plan = _sqlite_full_scans(connection, statement)
+            else:
+                scans, plan = _postgres_full_scans(connection, statement)
+        assert not scans, f'{name} does a full table scan: {plan}'
+
+
+class TestIndexMigration:
+    def test_migration_matches_model_indexes(self, load_revision):
+        """Test the index migration creates exactly the indexes declared on the models"""
+        migration = load_revision('0002_hot_query_indexes.py')
+
+        for table in TABLES:
+            declared = {
+                (index.name, tuple(column.name for column in index.columns))
+                for index in table.indexes
+                # Single-column indexes from Column(index=True) belong to earlier revisions
+                if not (len(index.columns) == 1 and index.name == f'ix_{table.name}_{list(index.columns)[0].name}'
+                        and list(index.columns)[0].index)
+            }
+            migrated = {(name, tuple(columns)) for name, columns in migration.INDEXES[table.name]}
+            assert declared == migrated
+
+
+if __name__ == '__main__':
+    pytest.main([__file__])
@@ -0,0 +1,97 @@
+import pytest
+import os
+import sys
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from sqlalchemy import exc as sa_exc
+from app.models import Claim
+from app import replicas
+
+
+class TestReadReplica:
+    def test_routed_views_read_from_replica(self, replica_app):
+        """Test opted-in views read the replica while other reads stay on the primary"""
+        app, router, db = replica_app
+        assert app.test_client().get('/claims').get_json() == ['claim-replica']
+        with app.app_context():
+            assert [claim.id for claim in Claim.query] == ['claim-primary']
+        assert router.get_stats()['replica_reads'] == 1
+
+    def test_client_reads_its_own_writes(self, replica_app):
+        """Test a write sets the sticky cookie and the client's next reads go to the primary"""
+        app, router, db = replica_app
+        client = app.test_client()
+        response = client.post('/claims')
+        assert replicas.STICKY_COOKIE in response.headers['Set-Cookie']
+        assert client.get('/claims').get_json() == ['claim-new', 'claim-primary']
+        assert app.test_client().get('/claims').get_json() == ['claim-replica']
+
+    def test_bulk_insert_sets_sticky_cookie(self, replica_app):
+        """Test executemany inserts, which never flush, still count as a write for the client"""
+        app, router, db = replica_app
+        client = app.test_client()
+        response = client.post('/patients/bulk')
+        assert response.status_code == 201
+        assert replicas.STICKY_COOKIE in response.headers['Set-Cookie']
+
+    def test_session_reads_after_flush_use_primary(self, replica_app):
+        """Test a session that has written reads from the primary for the rest of the request"""
+        app, router, db = replica_app
+        with app.test_request_context('/claims'):
+            db.session.info[replicas.READ_REPLICA] = True
+            assert [claim.id for claim in Claim.query] == ['claim-replica']
+            claim = Claim(patient_id='patient-1', claim_amount=1.0, claim_type='routine', description='New')
+            claim.id = 'claim-new'
+            db.session.add(claim)
+            db.session.flush()
+            assert [claim.id for claim in Claim.query.order_by(Claim.id)] == ['claim-new', 'claim-primary']
+
+    def test_lagging_replica_falls_back_to_primary(self, replica_app):
+        """Test reads go to the primary while the replica lags beyond the staleness bound"""
+        app, router, db = replica_app
+        with patch.object(router, 'lag_seconds', return_value=30.0):
+            assert app.test_client().get('/claims').get_json() == ['claim-primary']
+        assert app.test_client().get('/claims').get_json() == ['claim-replica']
+
+    def test_unreachable_replica_falls_back_to_primary(self, replica_app, capsys):
+        """Test a replica that cannot be reached is skipped for the retry period"""
+        app, router, db = replica_app
+        with patch.object(router, 'lag_seconds', side_effect=sa_exc.OperationalError('SELECT 1', {}, Exception('gone'))):
+            assert app.test_client().get('/claims').get_json() == ['claim-primary']
+        # Still inside the retry period, so the replica is not tried again
+        assert app.test_client().get('/claims').get_json() == ['claim-primary']
+        stats = router.get_stats()
+        assert stats['failures'] == 1 and stats['usable'] is False
+        assert 'Read replica unavailable' in capsys.readouterr().out
+
+
+    def test_failed_replica_read_is_retried_on_primary(self, replica_app, capsys):
+        """Test a read that fails on the replica is served from the primary, including views that catch errors"""
+        from flask import jsonify
+        app, router, db = replica_app
+
+        @app.route('/claims/safe')
+        @router.route_reads
+        def list_claims_safe():
+            try:
+                return jsonify([claim.id for claim in Claim.query.order_by(Claim.id)]), 200
+            except Exception as e:
+                return jsonify({'error': str(e)}), 500
+
+        with app.app_context():
+            with db.engines[replicas.REPLICA_BIND].begin() as connection:
+                connection.exec_driver_sql('DROP TABLE claims')
+
+        response = app.test_client().get('/claims/safe')
+        assert (response.status_code, response.get_json()) == (200, ['claim-primary'])
+        router._down_until = 0.0
+        assert app.test_client().get('/claims').get_json() == ['claim-primary']
+        stats = router.get_stats()
+        assert stats['primary_retries'] == 2 and stats['failures'] == 2
+        assert 'retrying on primary' in capsys.readouterr().out
+
+
+if __name__ == '__main__':
+    pytest.main([__file__])
@@ -0,0 +1,176 @@
+import pytest
+import os
+import sys
+import threading
+import time
+from unittest.mock import patch, MagicMock
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from app.clients import get_http_session
+from app.resilience import (ResilienceRegistry, RetryPolicy, CircuitOpenError, LatencyHedge, RetryableHTTPError,
+                            is_throttling_error)
+import requests
+from botocore.exceptions import ClientError, EndpointConnectionError
+from app.services import BedrockService
+from tests.bedrock_stubs import throttle_error
+
+
+class TestResilience:
+    def test_throttling_is_retried_with_backoff(self):
+        """Test throttling errors are retried until the call succeeds"""
+        delays = []
+        registry = ResilienceRegistry(retry_policy=RetryPolicy(max_attempts=3, base_delay=0.1), sleep=delays.append)
+        fn = MagicMock(side_effect=[throttle_error(), throttle_error(), 'ok'])
+
+        assert registry.call('bedrock:test', fn) == 'ok'
+        assert fn.call_count == 3
+        assert len(delays) == 2
+        assert all(0 <= d <= 0.2 for d in delays)
+        assert registry.get_stats()['retries'] == 2
+
+    def test_non_throttling_errors_are_not_retried(self):
+        """Test other errors propagate after a single attempt"""
+        registry = ResilienceRegistry(sleep=lambda s: None)
+        fn = MagicMock(side_effect=ValueError('bad request'))
+
+        with pytest.raises(ValueError):
+            registry.call('bedrock:test', fn)
+        assert fn.call_count == 1
+
+    def test_connection_failures_are_not_retried(self):
+        """Test unreachable endpoints fail after one attempt instead of paying the backoff"""
+        delays = []
+        registry = ResilienceRegistry(retry_policy=RetryPolicy(max_attempts=3), sleep=delays.append)
+        for error in (requests.exceptions.ConnectionError('dns'), EndpointConnectionError(endpoint_url='https://x'),
+                      RetryableHTTPError(500)):
+            fn = MagicMock(side_effect=error)
+            with pytest.raises(type(error)):
+                registry.call('lambda-http', fn)
+            assert fn.call_count == 1
+        assert delays == []
+        assert is_throttling_error(RetryableHTTPError(429)) and is_throttling_error(RetryableHTTPError(503))
+
+    def test_breaker_opens_then_recovers(self):
+        """Test the breaker fails fast while open and closes after a successful probe"""
+        registry = ResilienceRegistry(retry_policy=RetryPolicy(max_attempts=1), failure_threshold=2,
+                                      recovery_timeout=60, sleep=lambda s: None)
+        failing = MagicMock(side_effect=throttle_error())
+        for _ in range(2):
+            with pytest.raises(ClientError):
+                registry.call('lambda-http', failing)
+
+        with pytest.raises(CircuitOpenError):
+            registry.call('lambda-http', failing)
+        assert failing.call_count == 2
+
+        breaker = registry.breaker('lambda-http')
+        breaker.opened_at -= 61
+        assert registry.call('lambda-http', lambda: 'ok') == 'ok'
+        stats = registry.get_stats()
+        assert stats['breakers']['lambda-http']['state'] == 'closed'
+        assert [c['to'] for c in stats['recent_state_changes']] == ['open', 'half_open', 'closed']
+
+    def test_client_errors_do_not_open_the_breaker(self):
+        """Test bad-request errors leave the breaker closed while transport failures open it"""
+        registry = ResilienceRegistry(retry_policy=RetryPolicy(max_attempts=1), failure_threshold=2,
+                                      sleep=lambda s: None)
+        invalid = ClientError({'Error': {'Code': 'ValidationException', 'Message': 'bad prompt'},
+                               'ResponseMetadata': {'HTTPStatusCode': 400}}, 'InvokeModel')
+        for _ in range(5):
+            with pytest.raises(ClientError):
+                registry.call('bedrock:test', MagicMock(side_effect=invalid))
+        assert registry.breaker('bedrock:test').state == 'closed'
+
+        unreachable = MagicMock(side_effect=requests.exceptions.ConnectionError('refused'))
+        for _ in range(2):
+            with pytest.raises(requests.exceptions.ConnectionError):
+                registry.call('lambda-http', unreachable)
+        with pytest.raises(CircuitOpenError):
+            registry.call('lambda-http', unreachable)
+
+    def test_open_http_breaker_falls_back_to_boto3(self):
+        """Test _call_lambda_ai skips HTTP entirely while its breaker is open"""
+        service = BedrockService()
+        service.resilience = ResilienceRegistry(retry_policy=RetryPolicy(max_attempts=1), failure_threshold=1,
+                                                sleep=lambda s: None)
+        service.resilience.breaker('lambda-http').record_failure()
+
+        with patch.object(service.http_session, 'post') as mock_post, \
+                patch.object(service, '_call_lambda_boto3', return_value={'response': 'fallback'}) as mock_boto3:
+            assert service._call_lambda_ai('prompt') == {'response': 'fallback'}
+        mock_post.assert_not_called()
+        mock_boto3.assert_called_once()
+
+
+class TestLambdaHedging:
+    def test_fast_primary_is_not_hedged(self):
+        """Test a primary that beats the hedge delay never starts the hedge"""
+        hedge = LatencyHedge(enabled=True, initial_delay=1.0)
+        secondary = MagicMock()
+        assert hedge.run(lambda: 'http', secondary) == ('http', 'primary')
+        secondary.assert_not_called()
+        assert hedge.get_stats()['hedged'] == 0
+
+    def test_slow_primary_loses_to_hedge(self):
+        """Test the hedge result is used when the primary stalls"""
+        hedge = LatencyHedge(enabled=True, initial_delay=0.01)
+        release = threading.Event()
+        result = hedge.run(lambda: release.wait(5) and 'http', lambda: {'response': 'boto3'})
+        release.set()
+        assert result == ({'response': 'boto3'}, 'hedge')
+        assert hedge.get_stats()['hedge_wins'] == 1
+
+    def test_hedges_run_while_primaries_saturate_the_pool(self):
+        """Test a hedge still starts when stalled primaries occupy every primary worker"""
+        hedge = LatencyHedge(enabled=True, initial_delay=0.01, max_workers=2)
+        release = threading.Event()
+        started = time.monotonic()
+        results = [hedge.run(lambda: release.wait(5) and 'http', lambda: {'response': 'boto3'}) for _ in range(4)]
+        elapsed = time.monotonic() - started
+        release.set()
+        assert results == [({'response': 'boto3'}, 'hedge')] * 4
+        assert elapsed < 1
+
+    def test_rejected_hedge_waits_for_primary(self):
+        """Test an unacceptable hedge result does not beat a primary that succeeds"""
+        hedge = LatencyHedge(enabled=True, initial_delay=0.01)
+        result = hedge.run(lambda: time.sleep(0.1) or 'http', lambda: {'error': 'offline'},
+                           accept=lambda r: 'error' not in r)
+        assert result == ('http', 'primary')
+
+    def test_early_primary_failure_is_raised(self):
+        """Test a primary failing before the delay raises so the caller falls back"""
+        hedge = LatencyHedge(enabled=True, initial_delay=1.0)
+        with pytest.raises(RuntimeError):
+            hedge.run(MagicMock(side_effect=RuntimeError('boom')), MagicMock())
+
+    def test_delay_tracks_latency_percentile(self):
+        """Test the hedge delay follows observed primary latency once warmed up"""
+        hedge = LatencyHedge(percentile=50, initial_delay=9.0, min_samples=3)
+        assert hedge.delay() == 9.0
+        hedge._latencies.extend([0.1, 0.2, 0.3])
+        assert hedge.delay() == 0.2
+
+    def test_lambda_call_uses_pooled_session_and_hedge(self):
+        """Test _call_lambda_ai posts on the shared session and hedges to boto3"""
+        service = BedrockService()
+        assert service.http_session is get_http_session()
+        service.resilience = ResilienceRegistry(sleep=lambda s: None)
+        service.lambda_hedge = LatencyHedge(enabled=True, initial_delay=0.01)
+        release = threading.Event()
+
+        def slow_post(*args, **kwargs):
+            release.wait(5)
+            raise RuntimeError('late')
+
+        with patch.object(service.http_session, 'post', side_effect=slow_post) as mock_post, \
+                patch.object(service, '_call_lambda_boto3', return_value={'response': 'boto3'}):
+            assert service._call_lambda_ai('prompt') == {'response': 'boto3'}
+        release.set()
+        assert mock_post.call_args.kwargs['timeout'] == (service.lambda_connect_timeout,
+                                                          service.lambda_http_timeout)
+
+
+if __name__ == '__main__':
+    pytest.main([__file__])
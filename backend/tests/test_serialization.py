@@ -0,0 +1,98 @@
+import pytest
+import json
+import os
+import sys
+from datetime import datetime
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from app.services import ClaimService, EOBService
+from app.models import Patient, Claim, EOB
+from app.pagination import ListQueryError, decode_cursor
+from app.serialization import JSONSerializer, ENCODERS
+from tests.query_counter import QueryCounter, assert_max_queries
+
+
+class TestFastSerialization:
+    @pytest.mark.parametrize('encoder', sorted(ENCODERS))
+    def test_rows_match_to_dict(self, memory_db, encoder):
+        """Test the ORM-free list path produces the same JSON as to_dict for every model"""
+        from app.services import PatientService
+        serializer = JSONSerializer(encoder)
+        claim = memory_db.session.get(Claim, 'claim-2')
+        claim.set_ai_suggestions({'suggestions': ['Add modifier']})
+        memory_db.session.commit()
+        for model, list_fn in ((Claim, ClaimService().list_claims), (Patient, PatientService().list_patients),
+                               (EOB, EOBService().list_eobs)):
+            rows, _ = list_fn(as_rows=True)
+            objects, _ = list_fn()
+            assert json.loads(serializer.encode_rows(rows, model.JSON_FIELDS)) == [obj.to_dict() for obj in objects]
+
+    def test_projected_rows(self, memory_db):
+        """Test projected rows keep only the requested fields, including spliced JSON columns"""
+        rows, cursor = ClaimService().list_claims(limit=2, fields={'status', 'ai_analysis'}, as_rows=True)
+        body = JSONSerializer('stdlib').encode_rows(rows, Claim.JSON_FIELDS)
+        assert json.loads(body) == [{'status': status, 'ai_analysis': {'analysis': 'x' * 100}}
+                                    for status in ('denied', 'approved')]
+        assert decode_cursor(cursor) == (datetime(2025, 1, 6), 'claim-5')
+
+        rows, _ = EOBService().list_eobs(limit=1, fields={'patient_name'}, as_rows=True)
+        assert rows == [{'patient_name': 'Test Patient'}]
+
+    def test_rows_skip_orm_and_json_decoding(self, memory_db):
+        """Test the fast path issues one query and never decodes the stored JSON"""
+        with assert_max_queries(memory_db.engine, 1), patch('app.json_column.json.loads') as mock_loads:
+            rows, _ = EOBService().list_eobs(as_rows=True)
+            JSONSerializer().encode_rows(rows, EOB.JSON_FIELDS)
+        mock_loads.assert_not_called()
+        assert isinstance(rows[0], dict)
+
+    def test_encoder_selection(self):
+        """Test unknown encoders fall back to the stdlib and custom callables are accepted"""
+        assert JSONSerializer('missing').name == 'stdlib'
+        custom = JSONSerializer(lambda obj: b'"custom"')
+        assert custom.encode_rows([{'a': 1}], {'b': '{}'}) == b'["custom"]'
+        assert JSONSerializer('stdlib').encode_row({'b': None}, {'b': '[]'}) == b'{"b":[]}'
+
+
+class TestStreamedLists:
+    def test_iter_matches_list(self, memory_db):
+        """Test streaming every row yields the same rows as the unpaginated list"""
+        from app.services import PatientService
+        for iter_fn, list_fn in ((ClaimService().iter_claims, ClaimService().list_claims),
+                                 (PatientService().iter_patients, PatientService().list_patients),
+                                 (EOBService().iter_eobs, EOBService().list_eobs)):
+            assert list(iter_fn(batch_size=2)) == list_fn(as_rows=True)[0]
+
+    def test_iter_is_lazy_and_resumable(self, memory_db):
+        """Test rows are fetched only when iterated and a cursor resumes the stream"""
+        with QueryCounter(memory_db.engine) as counter:
+            rows = ClaimService().iter_claims({'status': 'approved'}, fields={'id'})
+            assert counter.count == 0
+            first = next(rows)
+        assert first == {'id': 'claim-5'}
+        _, cursor = ClaimService().list_claims(limit=2)
+        assert [row['id'] for row in ClaimService().iter_claims(cursor=cursor, fields={'id'})] == \
+            ['claim-4', 'claim-3', 'claim-2', 'claim-1', 'claim-0']
+
+    def test_invalid_cursor_fails_before_streaming(self, memory_db):
+        """Test a bad cursor raises when the stream is created, before any response is sent"""
+        with pytest.raises(ListQueryError):
+            ClaimService().iter_claims(cursor='not-a-cursor')
+
+    def test_chunked_encoding(self):
+        """Test streamed encoders batch rows into chunks and produce valid output"""
+        serializer = JSONSerializer('stdlib')
+        rows = [{'id': i, 'blob': '{"x":' + str(i) + '}'} for i in range(1000)]
+        with patch('app.serialization.STREAM_CHUNK_BYTES', 1024):
+            chunks = list(serializer.iter_array(rows, {'blob': '{}'}))
+            lines = b''.join(serializer.iter_ndjson(rows, {'blob': '{}'})).splitlines()
+        assert 1 < len(chunks) < len(rows)
+        assert json.loads(b''.join(chunks)) == [{'id': i, 'blob': {'x': i}} for i in range(1000)]
+        assert json.loads(lines[-1]) == {'id': 999, 'blob': {'x': 999}}
+        assert b''.join(serializer.iter_array([])) == b'[]'
+
+
+if __name__ == '__main__':
+    pytest.main([__file__])
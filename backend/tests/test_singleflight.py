@@ -0,0 +1,96 @@
+import pytest
+import os
+import sys
+import threading
+import time
+from unittest.mock import patch, MagicMock
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from app.ai_cache import ResponseCache
+from app.singleflight import SingleFlight
+from app.services import BedrockService
+
+
+def _wait_for(condition, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, 'condition not reached'
+        time.sleep(0.005)
+
+
+class TestSingleFlight:
+    def test_concurrent_callers_share_one_call(self):
+        """Test overlapping calls with one key execute once and all get the result"""
+        flight = SingleFlight()
+        release = threading.Event()
+        fn = MagicMock(side_effect=lambda: release.wait(5) and {'v': 1})
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(flight.do('k', fn))) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        _wait_for(lambda: flight.get_stats()['calls'] == 4)
+        release.set()
+        for thread in threads:
+            thread.join()
+
+        assert fn.call_count == 1
+        assert results == [{'v': 1}] * 4
+        stats = flight.get_stats()
+        assert stats['coalesced'] == 3
+        assert stats['in_flight'] == 0
+
+    def test_errors_reach_every_waiter_and_are_not_kept(self):
+        """Test a failed call raises for all waiters and the next call runs again"""
+        flight = SingleFlight()
+        release = threading.Event()
+        errors = []
+
+        def failing():
+            release.wait(5)
+            raise RuntimeError('boom')
+
+        def call():
+            try:
+                flight.do('k', failing)
+            except RuntimeError as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=call) for _ in range(3)]
+        for thread in threads:
+            thread.start()
+        _wait_for(lambda: flight.get_stats()['calls'] == 3)
+        release.set()
+        for thread in threads:
+            thread.join()
+
+        assert len(errors) == 3
+        assert flight.do('k', lambda: 'fresh') == 'fresh'
+
+    def test_identical_bedrock_prompts_coalesce(self):
+        """Test concurrent identical prompts make one Bedrock call and get separate copies"""
+        service = BedrockService()
+        service.response_cache = ResponseCache(enabled=False)
+        service.singleflight = SingleFlight()
+        release = threading.Event()
+        results = []
+
+        with patch.object(service, '_invoke_model',
+                          side_effect=lambda model_id, prompt: release.wait(5) and {'analysis': 'ok'}) as mock_invoke:
+            threads = [threading.Thread(target=lambda: results.append(service._invoke_bedrock('same', 'suggestions')))
+                       for _ in range(3)]
+            for thread in threads:
+                thread.start()
+            _wait_for(lambda: service.singleflight.get_stats()['calls'] == 3)
+            release.set()
+            for thread in threads:
+                thread.join()
+
+        assert mock_invoke.call_count == 1
+        assert results == [{'analysis': 'ok'}] * 3
+        assert results[0] is not results[1]
+        assert service.get_runtime_stats()['singleflight']['coalesced'] == 2
+
+
+if __name__ == '__main__':
+    pytest.main([__file__])
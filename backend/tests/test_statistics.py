@@ -0,0 +1,109 @@
+import pytest
+import os
+import sys
+from datetime import timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from app.services import BedrockService, EOBService
+from app.models import Claim, EOB
+from app import statistics
+from tests.query_counter import assert_max_queries
+
+
+class TestPlatformStatistics:
+    def _stats(self):
+        return {name: value for name, value in statistics.read_statistics().items() if value}
+
+    def test_counters_follow_inserts(self, memory_db):
+        """Test the fixture's inserts are counted by status and parse result"""
+        stats = self._stats()
+        assert stats[statistics.PATIENTS_TOTAL] == 1 and stats[statistics.CLAIMS_TOTAL] == 7
+        assert stats['claims_status:approved'] == 4 and stats['claims_status:denied'] == 3
+        assert statistics.AI_PARSED not in stats
+
+    def test_status_changes_move_counts(self, memory_db):
+        """Test approving, denying and deleting claims adjust the counters by their difference"""
+        claim = memory_db.session.get(Claim, 'claim-0')
+        claim.status = 'approved'
+        claim.approved_at = claim.created_at + timedelta(days=2)
+        memory_db.session.commit()
+        stats = self._stats()
+        assert stats['claims_status:approved'] == 5 and stats['claims_status:denied'] == 2
+        assert stats[statistics.APPROVED_TIMED] == 1 and stats[statistics.APPROVED_SECONDS] == 2 * 86400
+
+        # Expired attributes are reloaded for the history, so the old state is still subtracted
+        memory_db.session.expire(claim)
+        claim.status = 'pending_approval'
+        memory_db.session.commit()
+        memory_db.session.delete(memory_db.session.get(EOB, 'eob-1'))
+        memory_db.session.delete(memory_db.session.get(Claim, 'claim-1'))
+        memory_db.session.commit()
+        stats = self._stats()
+        assert stats['claims_status:approved'] == 3 and stats['claims_status:pending_approval'] == 1
+        assert stats[statistics.CLAIMS_TOTAL] == 6 and statistics.APPROVED_TIMED not in stats
+
+    def test_rollback_discards_deltas(self, memory_db):
+        """Test counters written during a flush roll back with the rows"""
+        before = self._stats()
+        claim = memory_db.session.get(Claim, 'claim-2')
+        claim.status = 'denied'
+        memory_db.session.flush()
+        assert self._stats()['claims_status:denied'] == 4
+        memory_db.session.rollback()
+        assert self._stats() == before
+
+    def test_rebuild_matches_incremental_counters(self, memory_db):
+        """Test rebuild recomputes the same values the listeners maintained"""
+        claim = memory_db.session.get(Claim, 'claim-4')
+        claim.approved_at = claim.created_at + timedelta(hours=12)
+        claim.set_decision_fields({'error': 'unparseable'})
+        memory_db.session.get(Claim, 'claim-5').set_decision_fields({'validation': {'status': 'Valid'}})
+        memory_db.session.commit()
+        incremental = self._stats()
+        assert incremental[statistics.AI_PARSED] == 2 and incremental[statistics.AI_PARSE_SUCCESS] == 1
+        statistics.rebuild(memory_db.session.connection())
+        memory_db.session.commit()
+        assert self._stats() == pytest.approx(incremental)
+
+    def test_refile_with_partially_loaded_claim_matches_rebuild(self, memory_db):
+        """Test changing a claim loaded with only some columns does not count it again"""
+        claim = memory_db.session.get(Claim, 'claim-1')
+        claim.set_decision_fields({'validation': {'status': 'Valid'}})
+        memory_db.session.commit()
+        memory_db.session.expunge_all()
+        # The refile path: the claim comes from EOBService's joinedload with load_only(claim_amount)
+        eob = EOBService().get_eob('eob-1')
+        eob.claim.status = 'refiled'
+        eob.claim.denial_reason = 'Missing codes'
+        memory_db.session.commit()
+        incremental = self._stats()
+        assert incremental[statistics.AI_PARSED] == 1 and incremental[statistics.AI_PARSE_SUCCESS] == 1
+        statistics.rebuild(memory_db.session.connection())
+        memory_db.session.commit()
+        assert self._stats() == pytest.approx(incremental)
+
+    def test_migration_rebuild_matches_app_rebuild(self, memory_db, load_revision):
+        """Test revision 0004's frozen recount gives the same counters as statistics.rebuild"""
+        migration = load_revision('0004_platform_statistics.py')
+        claim = memory_db.session.get(Claim, 'claim-1')
+        claim.approved_at = claim.created_at + timedelta(hours=2)
+        claim.set_decision_fields({'validation': {'status': 'Valid'}})
+        memory_db.session.commit()
+
+        migration.rebuild(memory_db.session.connection())
+        migrated = self._stats()
+        statistics.rebuild(memory_db.session.connection())
+        assert migrated == self._stats()
+        assert migrated[statistics.APPROVED_SECONDS] == 7200
+
+    def test_metrics_read_counters_in_one_query(self, memory_db):
+        """Test the metrics endpoint is a single counter read however many claims exist"""
+        with assert_max_queries(memory_db.engine, 1):
+            metrics = BedrockService().get_observability_metrics()
+        assert metrics['total_claims'] == 7 and metrics['approved_claims'] == 4
+        assert metrics['denied_claims'] == 3 and metrics['ai_accuracy_rate'] == '0%'
+
+
+if __name__ == '__main__':
+    pytest.main([__file__])
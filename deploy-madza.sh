@@ -230,6 +230,9 @@ with app.app_context():
     print(\"Database schema initialized\")
 "'
     
+    # Apply schema migrations
+    ssh -i ~/.ssh/$KEY_PAIR_NAME.pem -o StrictHostKeyChecking=no ec2-user@$BACKEND_IP 'cd /opt/madza/backend && FLASK_APP=app.main flask db upgrade'
+    
     # Restart backend service
     ssh -i ~/.ssh/$KEY_PAIR_NAME.pem -o StrictHostKeyChecking=no ec2-user@$BACKEND_IP 'sudo systemctl restart madza-backend'
     